@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+TTL response cache for MCP tool calls.
+
+Supplier lookups repeat the same calls (the same DigiKey keyword search, the
+same LCSC product page) many times during a session. CachedClient wraps
+anything with call_tool() - fastmcp.Client, or the pool and daemon clients
+in mcp_pool.py - and answers repeated read-only calls from a size-bounded
+SQLite store:
+
+- Key: sha256 of the canonical JSON of the tool name and arguments
+- TTL per tool, from the first matching pattern in the TTL table; tools
+  without a TTL (browser tools, unknown tools) are never cached
+- Mutating tools (add/update/delete/...) always go to the server, and on
+  success drop every cached entry of the same server
+- Least recently used entries are evicted once the store exceeds max_bytes
+- Identical concurrent misses share one server call
+- Results with non-text content (images, resources) are never cached
+
+Usage:
+    async with Client(config) as client:
+        cached = CachedClient(client)
+        result = await cached.call_tool("digikey_keyword_search", {"keywords": "LM358"})
+        print(cached.stats)
+
+    python mcp_cache.py stats
+    python mcp_cache.py clear --tool "digikey_*"
+"""
+
+import argparse
+import asyncio
+import fnmatch
+import hashlib
+import json
+import re
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from mcp_pool import RemoteToolResult, result_to_dict
+
+DEFAULT_CACHE = "/workspace/temp/mcp-cache.sqlite"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# (pattern on the prefixed tool name, TTL in seconds); first match wins, None = never cache
+DEFAULT_TTLS: List[Tuple[str, Optional[float]]] = [
+    ("playwright*", None),        # results depend on live browser state
+    ("partsbox_*", 60),           # our own inventory changes as we work
+    ("digikey_*", 3600),
+    ("mouser_*", 3600),
+    ("farnell*", 3600),
+    ("lcsc*", 3600),
+    ("google-docs_*", 300),
+]
+
+MUTATING_VERBS = {
+    "add", "create", "update", "delete", "remove", "set", "edit", "move",
+    "insert", "upload", "write", "put", "post", "order", "replace", "clear"
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    server TEXT NOT NULL,
+    tool TEXT NOT NULL,
+    expires REAL NOT NULL,
+    last_used REAL NOT NULL,
+    size INTEGER NOT NULL,
+    value TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_lru ON entries (last_used);
+CREATE INDEX IF NOT EXISTS entries_server ON entries (server);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+STAT_NAMES = ["hits", "misses", "expired", "bypassed", "invalidations", "evictions"]
+
+
+def cache_key(tool: str, arguments: Optional[Dict]) -> str:
+    """sha256 of the canonical JSON of a call, independent of argument order."""
+    canonical = json.dumps({"tool": tool, "arguments": arguments or {}},
+                           sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def server_of(tool: str) -> str:
+    """Server prefix of a "<server>_<tool>" name (server names use '-', not '_')."""
+    return tool.split("_", 1)[0]
+
+
+def is_mutating(tool: str) -> bool:
+    """True if any word of the bare tool name is a mutating verb (e.g. lcsc_add_to_cart)."""
+    bare = tool.split("_", 1)[1] if "_" in tool else tool
+    return any(word in MUTATING_VERBS for word in re.split(r"[_/\-]", bare.lower()))
+
+
+class ResponseCache:
+    """SQLite-backed, LRU-evicted store of serialized tool results."""
+
+    def __init__(self, path: str = DEFAULT_CACHE, max_bytes: int = DEFAULT_MAX_BYTES):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+        self.total_bytes = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def get(self, key: str, now: float) -> Tuple[Optional[Dict], bool]:
+        """Return (value, expired). An expired entry is deleted."""
+        row = self.db.execute("SELECT expires, size, value FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None, False
+        expires, size, value = row
+        if expires <= now:
+            self.db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self.db.commit()
+            self.total_bytes -= size
+            return None, True
+        self.db.execute("UPDATE entries SET last_used = ? WHERE key = ?", (now, key))
+        self.db.commit()
+        return json.loads(value), False
+
+    def put(self, key: str, tool: str, value: Dict, ttl: float, now: float) -> int:
+        """Store a value and evict LRU entries over max_bytes. Returns entries evicted."""
+        encoded = json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+        size = len(encoded.encode("utf-8"))
+        if size > self.max_bytes:
+            return 0
+
+        old = self.db.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+        self.db.execute(
+            "INSERT OR REPLACE INTO entries (key, server, tool, expires, last_used, size, value) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, server_of(tool), tool, now + ttl, now, size, encoded)
+        )
+        self.total_bytes += size - (old[0] if old else 0)
+
+        evicted = 0
+        while self.total_bytes > self.max_bytes:
+            victims = self.db.execute(
+                "SELECT key, size FROM entries ORDER BY last_used LIMIT 64").fetchall()
+            if not victims:
+                break
+            for victim_key, victim_size in victims:
+                if self.total_bytes <= self.max_bytes:
+                    break
+                self.db.execute("DELETE FROM entries WHERE key = ?", (victim_key,))
+                self.total_bytes -= victim_size
+                evicted += 1
+        self.db.commit()
+        return evicted
+
+    def invalidate(self, server: Optional[str] = None, pattern: Optional[str] = None) -> int:
+        """Delete entries of a server and/or whose tool matches a glob. Returns entries removed."""
+        clauses, params = [], []
+        if server is not None:
+            clauses.append("server = ?")
+            params.append(server)
+        if pattern is not None:
+            clauses.append("tool GLOB ?")
+            params.append(pattern)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        removed, size = self.db.execute(
+            f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries{where}", params).fetchone()
+        self.db.execute(f"DELETE FROM entries{where}", params)
+        self.db.commit()
+        self.total_bytes -= size
+        return removed
+
+    def purge_expired(self, now: float) -> int:
+        removed, size = self.db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries WHERE expires <= ?", (now,)).fetchone()
+        self.db.execute("DELETE FROM entries WHERE expires <= ?", (now,))
+        self.db.commit()
+        self.total_bytes -= size
+        return removed
+
+    def add_counters(self, counts: Dict[str, int]) -> None:
+        """Accumulate session statistics into the store."""
+        self.db.executemany(
+            "INSERT INTO counters (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            [(name, value) for name, value in counts.items() if value]
+        )
+        self.db.commit()
+
+    def summary(self) -> Dict:
+        entries = self.db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        by_server = dict(self.db.execute(
+            "SELECT server, COUNT(*) FROM entries GROUP BY server ORDER BY server").fetchall())
+        counters = dict(self.db.execute("SELECT name, value FROM counters").fetchall())
+        return {
+            "path": self.path,
+            "entries": entries,
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "entries_by_server": by_server,
+            "lifetime": {name: counters.get(name, 0) for name in STAT_NAMES}
+        }
+
+    def close(self) -> None:
+        self.db.close()
+
+
+def _uniform(result: Any) -> Tuple[Any, Optional[Dict]]:
+    """
+    (RemoteToolResult, serialized value) for a text-only result, or
+    (result unchanged, None) if any content item has no text.
+    """
+    value = result_to_dict(result)
+    if any(item is None for item in value["content"]):
+        return result, None
+    return RemoteToolResult(value), value
+
+
+class CachedClient:
+    """
+    call_tool() front for an MCP client, answering cacheable calls from a ResponseCache.
+
+    Every text-only result is returned as an mcp_pool.RemoteToolResult
+    (.data, .content, .is_error), whether it is a hit, a miss, a waiter on
+    an identical in-flight call or a bypassed call, so callers see the same
+    type either way. Results with non-text content cannot be serialized
+    faithfully; they are returned unchanged and never cached. Error results
+    are never cached either.
+    """
+
+    def __init__(self, client: Any, cache: Optional[ResponseCache] = None,
+                 ttls: Optional[List[Tuple[str, Optional[float]]]] = None):
+        self.client = client
+        self.cache = cache or ResponseCache()
+        self.ttls = ttls if ttls is not None else DEFAULT_TTLS
+        self.stats = {name: 0 for name in STAT_NAMES}
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+    def ttl_for(self, tool: str) -> Optional[float]:
+        """TTL of a read-only tool, or None if it must not be cached."""
+        if is_mutating(tool):
+            return None
+        for pattern, ttl in self.ttls:
+            if fnmatch.fnmatchcase(tool, pattern):
+                return ttl or None
+        return None
+
+    async def call_tool(self, tool: str, arguments: Optional[Dict] = None) -> Any:
+        ttl = self.ttl_for(tool)
+        if ttl is None:
+            self.stats["bypassed"] += 1
+            result = await self.client.call_tool(tool, arguments or {})
+            if is_mutating(tool) and not result.is_error:
+                self.stats["invalidations"] += self.cache.invalidate(server=server_of(tool))
+            return _uniform(result)[0]
+
+        key = cache_key(tool, arguments)
+        value, expired = self.cache.get(key, time.time())
+        if value is not None and "data" not in value:
+            value = None  # stored before results carried .data; refetch
+        if value is not None:
+            self.stats["hits"] += 1
+            return RemoteToolResult(value)
+        self.stats["expired" if expired else "misses"] += 1
+
+        # Share one server call between identical concurrent misses
+        if key in self._in_flight:
+            return await asyncio.shield(self._in_flight[key])
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            result, value = _uniform(await self.client.call_tool(tool, arguments or {}))
+            if value is not None and not result.is_error:
+                self.stats["evictions"] += self.cache.put(key, tool, value, ttl, time.time())
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            # Waiters observe the error; retrieve it here so it is not reported as unhandled
+            future.exception()
+            raise
+        finally:
+            del self._in_flight[key]
+
+    async def gather(self, calls) -> List[Any]:
+        """Run calls concurrently. Failed calls return their exception in place."""
+        return await asyncio.gather(
+            *(self.call_tool(tool, arguments) for tool, arguments in calls),
+            return_exceptions=True
+        )
+
+    def hit_rate(self) -> float:
+        lookups = self.stats["hits"] + self.stats["misses"] + self.stats["expired"]
+        return self.stats["hits"] / lookups if lookups else 0.0
+
+    def close(self) -> None:
+        """Persist this session's statistics and close the store."""
+        self.cache.add_counters(self.stats)
+        self.stats = {name: 0 for name in STAT_NAMES}
+        self.cache.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Inspect or clear the MCP tool response cache",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Entries, size and lifetime hit/miss counts
+  %(prog)s stats
+
+  # Drop cached DigiKey results, or everything
+  %(prog)s clear --tool "digikey_*"
+  %(prog)s clear
+
+  # Remove expired entries
+  %(prog)s purge
+        """
+    )
+    parser.add_argument("command", choices=["stats", "clear", "purge"])
+    parser.add_argument("--cache", default=DEFAULT_CACHE, help=f"Cache database (default: {DEFAULT_CACHE})")
+    parser.add_argument("--tool", help="Glob on prefixed tool names for 'clear'")
+    args = parser.parse_args()
+
+    try:
+        cache = ResponseCache(args.cache)
+    except sqlite3.Error as e:
+        print(f"ERROR: Could not open cache {args.cache}: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.command == "stats":
+        summary = cache.summary()
+        lifetime = summary["lifetime"]
+        lookups = lifetime["hits"] + lifetime["misses"] + lifetime["expired"]
+        summary["lifetime"]["hit_rate"] = round(lifetime["hits"] / lookups, 3) if lookups else 0.0
+        print(json.dumps(summary, indent=2))
+    elif args.command == "clear":
+        print(f"Removed {cache.invalidate(pattern=args.tool)} entries", file=sys.stderr)
+    else:
+        print(f"Removed {cache.purge_expired(time.time())} expired entries", file=sys.stderr)
+    cache.close()
+
+
+if __name__ == "__main__":
+    main()
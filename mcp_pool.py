@@ -0,0 +1,531 @@
+#!/usr/bin/env python3
+"""
+Long-lived, pooled FastMCP client sessions with concurrent tool-call fan-out.
+
+playwright_example.py opens a fresh Client for every run, which pays the
+docker/stdio startup of every MCP server each time. This module keeps one
+connected Client per server alive and routes "<server>_<tool>" calls to
+it, with a per-server concurrency limit so independent servers (digikey,
+partsbox, ...) run in parallel while stateful ones (a single Playwright
+browser) are serialized.
+
+It can be used in-process (MCPClientPool) or through a local daemon that
+keeps the servers warm across script invocations (serve / DaemonClient).
+
+Usage:
+    python mcp_pool.py serve                      # start the daemon in the foreground
+    python mcp_pool.py call digikey_keyword_search '{"keywords": "LM358"}'
+    python mcp_pool.py gather calls.json          # [{"tool": ..., "arguments": {...}}, ...]
+    python mcp_pool.py status
+    python mcp_pool.py stop
+
+In Python:
+    async with DaemonClient() as pool:
+        results = await pool.gather([
+            ("digikey_keyword_search", {"keywords": "LM358"}),
+            ("partsbox_search_parts", {"query": "LM358"}),
+        ])
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import stat
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from fastmcp import Client
+from fastmcp.exceptions import ToolError
+from pydantic_core import to_jsonable_python
+
+DEFAULT_CONFIG = Path(__file__).parent / ".mcp.json"
+DEFAULT_LIMIT = 4
+DEFAULT_IDLE_TIMEOUT = 30 * 60
+
+
+def default_socket() -> str:
+    """$XDG_RUNTIME_DIR/mcp-pool.sock, or the same name in a per-user directory under /tmp."""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir and os.path.isdir(runtime_dir):
+        return os.path.join(runtime_dir, "mcp-pool.sock")
+    return f"/tmp/mcp-pool-{os.getuid()}/mcp-pool.sock"
+
+
+DEFAULT_SOCKET = default_socket()
+
+
+def secure_socket_dir(socket_path: str) -> None:
+    """
+    Create the socket's directory (0700) if needed and refuse one another user controls.
+
+    The pooled servers hold supplier and PartsBox credentials, so only the
+    owner may reach the socket. A shared sticky directory such as /tmp is
+    accepted for an explicit --socket; the socket itself is created 0600.
+    """
+    directory = os.path.dirname(os.path.abspath(socket_path))
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    info = os.stat(directory)
+    if info.st_mode & stat.S_ISVTX:
+        return
+    if info.st_uid != os.getuid() or info.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        raise PermissionError(f"Socket directory {directory} must be owned by you and not writable by others")
+
+
+def default_limit(server: str) -> int:
+    """Browser servers drive a single page, so their calls must not overlap."""
+    return 1 if "playwright" in server else DEFAULT_LIMIT
+
+
+def result_to_dict(result: Any) -> Dict:
+    """
+    JSON-serializable form of a CallToolResult (or of a RemoteToolResult).
+
+    "data" is the client's hydrated .data as JSON, so fastmcp's unwrapping of
+    {"result": ...} for non-object return types carries over. Content items
+    without text (images, resources) become None.
+    """
+    return {
+        "is_error": result.is_error,
+        "structured_content": result.structured_content,
+        "data": to_jsonable_python(result.data),
+        "content": [item if isinstance(item, str) else getattr(item, "text", None)
+                    for item in result.content]
+    }
+
+
+class MCPClientPool:
+    """
+    One lazily connected Client per configured MCP server.
+
+    Tool names keep the "<server>_<tool>" prefix used by config-based
+    clients; the pool strips it and sends the call to that server's own
+    session. A server whose session fails with anything other than a tool
+    error is reconnected on its next call.
+    """
+
+    def __init__(self, config: Dict, limits: Optional[Dict[str, int]] = None):
+        self.servers: Dict[str, Dict] = config["mcpServers"]
+        limits = limits or {}
+        self._limits = {name: limits.get(name, default_limit(name)) for name in self.servers}
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._connect_locks: Dict[str, asyncio.Lock] = {}
+        self._clients: Dict[str, Client] = {}
+        # Longest server names first so "playwright-mcp-server" wins over "playwright"
+        self._by_length = sorted(self.servers, key=len, reverse=True)
+
+    @classmethod
+    def from_file(cls, path: str, limits: Optional[Dict[str, int]] = None) -> "MCPClientPool":
+        with open(path) as f:
+            return cls(json.load(f), limits)
+
+    def resolve(self, tool: str) -> Tuple[str, str]:
+        """Split a prefixed tool name into (server, tool)."""
+        for server in self._by_length:
+            if tool.startswith(server + "_"):
+                return server, tool[len(server) + 1:]
+        raise ValueError(f"No configured MCP server matches tool {tool!r}")
+
+    async def _client(self, server: str) -> Client:
+        lock = self._connect_locks.setdefault(server, asyncio.Lock())
+        async with lock:
+            if server not in self._clients:
+                client = Client({"mcpServers": {server: self.servers[server]}})
+                await client.__aenter__()
+                self._clients[server] = client
+        return self._clients[server]
+
+    async def _drop(self, server: str) -> None:
+        client = self._clients.pop(server, None)
+        if client is not None:
+            try:
+                await client.__aexit__(None, None, None)
+            except Exception:
+                pass
+
+    async def call_tool(self, tool: str, arguments: Optional[Dict] = None) -> Any:
+        """Call a prefixed tool on its server, waiting for a free slot on that server."""
+        server, name = self.resolve(tool)
+        semaphore = self._semaphores.setdefault(server, asyncio.Semaphore(self._limits[server]))
+        async with semaphore:
+            client = await self._client(server)
+            try:
+                return await client.call_tool(name, arguments or {})
+            except ToolError:
+                raise
+            except Exception:
+                await self._drop(server)
+                raise
+
+    async def gather(self, calls: Iterable[Tuple[str, Optional[Dict]]]) -> List[Any]:
+        """Run calls concurrently. Failed calls return their exception in place."""
+        return await asyncio.gather(
+            *(self.call_tool(tool, arguments) for tool, arguments in calls),
+            return_exceptions=True
+        )
+
+    async def close(self) -> None:
+        for server in list(self._clients):
+            await self._drop(server)
+
+    async def __aenter__(self) -> "MCPClientPool":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+
+async def serve(config_path: str, socket_path: str, limits: Optional[Dict[str, int]] = None,
+                idle_timeout: float = DEFAULT_IDLE_TIMEOUT, cache_path: Optional[str] = None) -> None:
+    """
+    Serve the pool over a unix socket until stopped or idle for idle_timeout seconds.
+
+    Protocol: newline-delimited JSON. Requests are {"id", "tool", "arguments"}
+    (or {"id", "op": "status"|"stop"}); each connection may have many requests
+    in flight and responses {"id", "result"|"error"} arrive as calls finish.
+    With cache_path, read-only calls are answered through mcp_cache.CachedClient.
+    """
+    pool = MCPClientPool.from_file(config_path, limits)
+    caller = pool
+    if cache_path:
+        from mcp_cache import CachedClient, ResponseCache
+        caller = CachedClient(pool, ResponseCache(cache_path))
+    stop = asyncio.Event()
+    last_activity = time.monotonic()
+    in_flight = 0
+
+    async def send(response: Dict, writer: asyncio.StreamWriter, write_lock: asyncio.Lock):
+        async with write_lock:
+            if writer.is_closing():
+                return  # client went away; the call still warmed the session
+            writer.write(json.dumps(response).encode() + b"\n")
+            try:
+                await writer.drain()
+            except ConnectionError:
+                pass
+
+    async def handle_request(request: Dict, writer: asyncio.StreamWriter, write_lock: asyncio.Lock):
+        nonlocal last_activity, in_flight
+        response: Dict[str, Any] = {"id": request.get("id")}
+        in_flight += 1
+        try:
+            op = request.get("op", "call")
+            if op == "status":
+                response["result"] = {
+                    "connected": sorted(pool._clients),
+                    "servers": sorted(pool.servers),
+                    "in_flight": in_flight - 1,
+                    "pid": os.getpid()
+                }
+                if caller is not pool:
+                    response["result"]["cache"] = dict(caller.stats, hit_rate=round(caller.hit_rate(), 3))
+            elif op == "stop":
+                response["result"] = "stopping"
+                stop.set()
+            else:
+                result = await caller.call_tool(request["tool"], request.get("arguments"))
+                response["result"] = result_to_dict(result)
+        except Exception as e:
+            response["error"] = f"{type(e).__name__}: {e}"
+        finally:
+            in_flight -= 1
+            last_activity = time.monotonic()
+        await send(response, writer, write_lock)
+
+    async def handle_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        write_lock = asyncio.Lock()
+        tasks = set()
+        try:
+            while line := await reader.readline():
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("expected a JSON object")
+                except ValueError as e:
+                    await send({"id": None, "error": f"Invalid request: {e}"}, writer, write_lock)
+                    continue
+                task = asyncio.create_task(handle_request(request, writer, write_lock))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            await asyncio.gather(*tasks)
+        except (asyncio.CancelledError, ConnectionError):
+            pass  # daemon shutting down or client disconnected
+        finally:
+            writer.close()
+
+    async def watch_idle():
+        while not stop.is_set():
+            await asyncio.sleep(min(60, idle_timeout))
+            if in_flight == 0 and time.monotonic() - last_activity > idle_timeout:
+                print("Idle timeout reached, shutting down", file=sys.stderr)
+                stop.set()
+
+    secure_socket_dir(socket_path)
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    umask = os.umask(0o077)
+    try:
+        server = await asyncio.start_unix_server(handle_connection, path=socket_path)
+    finally:
+        os.umask(umask)
+    os.chmod(socket_path, 0o600)
+    print(f"MCP pool listening on {socket_path} ({', '.join(pool.servers)})", file=sys.stderr)
+
+    idle_task = asyncio.create_task(watch_idle())
+    try:
+        await stop.wait()
+    finally:
+        idle_task.cancel()
+        server.close()
+        await server.wait_closed()
+        await pool.close()
+        if caller is not pool:
+            caller.close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+class RemoteToolResult:
+    """
+    CallToolResult-like view of a daemon response (.data, .content, .is_error).
+
+    .data has the same shape as fastmcp's (a wrapped {"result": ...} is
+    unwrapped), with objects as plain dicts rather than hydrated dataclasses.
+    .content holds the text of each content item.
+    """
+
+    def __init__(self, payload: Dict):
+        self.is_error = payload["is_error"]
+        self.structured_content = payload["structured_content"]
+        self.data = payload["data"] if "data" in payload else payload["structured_content"]
+        self.content = payload["content"]
+
+
+class DaemonClient:
+    """
+    Client for the pool daemon, multiplexing concurrent calls over one socket.
+
+    If no daemon is listening, one is started in the background and the
+    MCP servers' cold start is paid once; later invocations reuse it. A
+    started daemon gets limits, idle_timeout and cache_path as its serve
+    options; a daemon already running keeps its own.
+    """
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET, config_path: str = str(DEFAULT_CONFIG),
+                 autostart: bool = True, start_timeout: float = 60.0,
+                 limits: Optional[Dict[str, int]] = None, idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+                 cache_path: Optional[str] = None):
+        self.socket_path = socket_path
+        self.config_path = config_path
+        self.autostart = autostart
+        self.limits = limits or {}
+        self.idle_timeout = idle_timeout
+        self.cache_path = cache_path
+        self.start_timeout = start_timeout
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._reader_task: Optional[asyncio.Task] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    async def connect(self) -> None:
+        secure_socket_dir(self.socket_path)
+        try:
+            reader, self._writer = await asyncio.open_unix_connection(self.socket_path)
+        except (FileNotFoundError, ConnectionRefusedError):
+            if not self.autostart:
+                raise
+            reader, self._writer = await self._start_daemon()
+        self._reader_task = asyncio.create_task(self._read_responses(reader))
+
+    async def _start_daemon(self) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        print("Starting MCP pool daemon...", file=sys.stderr)
+        command = [sys.executable, str(Path(__file__).resolve()), "serve",
+                   "--socket", self.socket_path, "--config", self.config_path,
+                   "--idle-timeout", str(self.idle_timeout)]
+        for server, limit in self.limits.items():
+            command += ["--limit", f"{server}={limit}"]
+        if self.cache_path:
+            command += ["--cache", self.cache_path]
+        subprocess.Popen(
+            command,
+            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            start_new_session=True
+        )
+        deadline = time.monotonic() + self.start_timeout
+        while True:
+            try:
+                return await asyncio.open_unix_connection(self.socket_path)
+            except (FileNotFoundError, ConnectionRefusedError):
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"MCP pool daemon did not start on {self.socket_path}")
+                await asyncio.sleep(0.2)
+
+    async def _read_responses(self, reader: asyncio.StreamReader) -> None:
+        try:
+            while line := await reader.readline():
+                response = json.loads(line)
+                future = self._pending.pop(response["id"], None)
+                if future is None or future.done():
+                    continue
+                if "error" in response:
+                    future.set_exception(RuntimeError(response["error"]))
+                else:
+                    future.set_result(response["result"])
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("MCP pool daemon closed the connection"))
+            self._pending.clear()
+
+    async def _request(self, payload: Dict) -> Any:
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        self._writer.write(json.dumps({"id": request_id, **payload}).encode() + b"\n")
+        await self._writer.drain()
+        return await future
+
+    async def call_tool(self, tool: str, arguments: Optional[Dict] = None) -> RemoteToolResult:
+        return RemoteToolResult(await self._request({"tool": tool, "arguments": arguments or {}}))
+
+    async def gather(self, calls: Iterable[Tuple[str, Optional[Dict]]]) -> List[Any]:
+        """Run calls concurrently. Failed calls return their exception in place."""
+        return await asyncio.gather(
+            *(self.call_tool(tool, arguments) for tool, arguments in calls),
+            return_exceptions=True
+        )
+
+    async def status(self) -> Dict:
+        return await self._request({"op": "status"})
+
+    async def stop(self) -> None:
+        await self._request({"op": "stop"})
+
+    async def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        if self._reader_task is not None:
+            await asyncio.gather(self._reader_task, return_exceptions=True)
+
+    async def __aenter__(self) -> "DaemonClient":
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+
+def parse_limits(values: List[str]) -> Dict[str, int]:
+    limits = {}
+    for value in values:
+        server, _, limit = value.partition("=")
+        limits[server] = int(limit)
+    return limits
+
+
+def print_result(result: Any) -> None:
+    if isinstance(result, Exception):
+        print(json.dumps({"error": str(result)}))
+    else:
+        print(json.dumps({"is_error": result.is_error, "data": result.data, "content": result.content},
+                         indent=2, ensure_ascii=False))
+
+
+async def run_client(args: argparse.Namespace) -> None:
+    autostart = args.command in ("call", "gather")
+    try:
+        client = DaemonClient(args.socket, args.config, autostart=autostart, limits=parse_limits(args.limit),
+                              idle_timeout=args.idle_timeout, cache_path=args.cache)
+        await client.connect()
+    except (FileNotFoundError, ConnectionRefusedError):
+        print(f"No MCP pool daemon listening on {args.socket}", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        if args.command == "status":
+            print(json.dumps(await client.status(), indent=2))
+        elif args.command == "stop":
+            await client.stop()
+            print("Daemon stopping", file=sys.stderr)
+        elif args.command == "call":
+            arguments = json.loads(args.arguments) if args.arguments else {}
+            print_result((await client.gather([(args.tool, arguments)]))[0])
+        else:
+            with open(args.tool) as f:
+                calls = [(c["tool"], c.get("arguments")) for c in json.load(f)]
+            for result in await client.gather(calls):
+                print_result(result)
+    finally:
+        await client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Pooled, long-lived MCP client sessions",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Keep servers warm in the foreground (call/gather start it automatically otherwise)
+  %(prog)s serve --limit digikey=8
+
+  # Same, answering repeated supplier lookups from the response cache
+  %(prog)s serve --cache /workspace/temp/mcp-cache.sqlite
+
+  # One call through the daemon
+  %(prog)s call playwright-mcp-server_browser_navigate '{"url": "https://www.example.com", "silent_mode": true}'
+
+  # A daemon started by call/gather gets the same --limit/--idle-timeout/--cache
+  %(prog)s call digikey_keyword_search '{"keywords": "LM358"}' --limit digikey=8 --cache /workspace/temp/mcp-cache.sqlite
+
+  # Several calls in parallel across servers
+  %(prog)s gather lookups.json
+        """
+    )
+    parser.add_argument("command", choices=["serve", "call", "gather", "status", "stop"])
+    parser.add_argument("tool", nargs="?", help="Prefixed tool name (call) or JSON file of calls (gather)")
+    parser.add_argument("arguments", nargs="?", help="JSON arguments for call")
+    parser.add_argument("--config", default=str(DEFAULT_CONFIG), help="MCP config (default: .mcp.json)")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help=f"Daemon socket (default: {DEFAULT_SOCKET})")
+    parser.add_argument(
+        "--limit",
+        action="append",
+        default=[],
+        metavar="SERVER=N",
+        help=f"Max concurrent calls for a server (default: {DEFAULT_LIMIT}, 1 for playwright servers)"
+    )
+    parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=DEFAULT_IDLE_TIMEOUT,
+        help=f"Seconds without requests before the daemon exits (default: {DEFAULT_IDLE_TIMEOUT})"
+    )
+    parser.add_argument(
+        "--cache",
+        metavar="PATH",
+        help="Serve read-only calls through the response cache in this SQLite file (see mcp_cache.py)"
+    )
+    args = parser.parse_args()
+
+    if args.command in ("call", "gather") and not args.tool:
+        parser.error(f"{args.command} requires a tool name or calls file")
+
+    try:
+        if args.command == "serve":
+            asyncio.run(serve(args.config, args.socket, parse_limits(args.limit), args.idle_timeout,
+                              args.cache))
+        else:
+            asyncio.run(run_client(args))
+    except PermissionError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        sys.exit(1)
+    except KeyboardInterrupt:
+        print("\nInterrupted by user", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
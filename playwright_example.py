@@ -21,6 +21,8 @@ IMPORTANT NOTES:
   Example: "playwright-mcp-server_browser_navigate"
 - Results are CallToolResult objects - use .data to access structured content
 - Config is loaded from .mcp.json in the same directory
+- For repeated runs or parallel calls across servers, mcp_pool.py keeps the
+  sessions open in a local daemon instead of starting every server each time
 
 USEFUL DOCUMENTATION LINKS:
 - FastMCP Client Overview:
@@ -54,6 +56,8 @@ import json
 from pathlib import Path
 from fastmcp import Client
 
+from snapshot_stream import SnapshotStats, iter_snapshot
+
 
 async def main():
     # Load MCP configuration from .mcp.json
@@ -116,26 +120,17 @@ async def main():
         #
         # For JMESPath query examples, see the CLAUDE.md file in this repo:
         # docs/Using-JMESPath.md
-        print("Capturing page snapshot...")
-        snapshot_result = await client.call_tool(
-            "playwright-mcp-server_browser_snapshot",
-            {
-                # Optional parameters you can use:
-                # "flatten": True,  # Flatten ARIA tree to list
-                # "limit": 150,     # Limit number of items
-                # "output_format": "json"  # Return as JSON instead of YAML
-            }
-        )
-
-        # Access the snapshot data
-        snapshot_data = snapshot_result.data
-
-        print("\nSnapshot captured successfully!")
-        print(f"Total items: {snapshot_data.get('total_items', 'N/A')}")
-        print(f"Output format: {snapshot_data.get('output_format', 'N/A')}")
-        print(f"\nSnapshot content (first 800 chars):")
-        snapshot_content = snapshot_data.get('snapshot', '')
-        print(snapshot_content[:800] if snapshot_content else 'No snapshot')
+        #
+        # Rather than pulling the whole snapshot into one response and
+        # truncating it locally, stream it in flattened pages. Only the items
+        # actually consumed are transferred (see snapshot_stream.py).
+        print("Capturing page snapshot (first 20 items)...")
+        stats = SnapshotStats()
+        async for item in iter_snapshot(client, page_size=20, max_items=20, stats=stats):
+            print(json.dumps(item, ensure_ascii=False))
+
+        print(f"\nTotal items on page: {stats.total_items if stats.total_items is not None else 'N/A'}")
+        print(f"Snapshot bytes transferred: {stats.bytes}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark BuildAvailability against a per-entry stock-history scan.
+
+Scales the checked-in export, adds thousands of synthetic projects, then
+checks every project at several build counts with the precomputed engine
+and, for a sample of projects, by folding each BOM entry's part stock
+history on every check (the manual cross-referencing the engine replaces).
+
+Usage:
+    python bench_build_availability.py
+    python bench_build_availability.py --parts 50000 --projects 5000 --entries 40
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from build_availability import BuildAvailability
+from partsbox_export import PartsBoxExport
+from synthetic import add_synthetic_projects, load_seed_export, scale_export
+
+
+def scan_check(data: Dict, project_id: str, builds: int) -> Tuple[int, List[str]]:
+    """Max builds and short part ids, folding each entry's part history from the raw lists."""
+    max_builds = None
+    short = []
+    for entry in data["entries"]:
+        if entry["entry/project-id"] != project_id:
+            continue
+        part = next(p for p in data["parts"] if p["part/id"] == entry["entry/part-id"])
+        balances: Dict[str, float] = {}
+        for event in part.get("part/stock", []):
+            sid = event["stock/storage-id"]
+            balances[sid] = balances.get(sid, 0) + event.get("stock/quantity", 0)
+        have = sum(q for q in balances.values() if q > 0)
+        possible = int(have // entry["entry/quantity"])
+        max_builds = possible if max_builds is None else min(max_builds, possible)
+        if have < entry["entry/quantity"] * builds:
+            short.append(entry["entry/part-id"])
+    return max_builds or 0, short
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark project build availability checks")
+    parser.add_argument("--parts", type=int, default=20000, help="Synthetic part count (default: 20000)")
+    parser.add_argument("--projects", type=int, default=2000, help="Synthetic project count (default: 2000)")
+    parser.add_argument("--entries", type=int, default=30, help="BOM entries per project (default: 30)")
+    parser.add_argument("--builds", default="1,5,10", help="Build counts to check (default: 1,5,10)")
+    parser.add_argument("--scan-projects", type=int, default=5, help="Projects checked by scan (default: 5)")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed (default: 1)")
+    args = parser.parse_args()
+
+    data = add_synthetic_projects(scale_export(load_seed_export(), args.parts, args.seed),
+                                  args.projects, args.entries, args.seed)
+    print(f"Synthetic export: {len(data['parts'])} parts, {len(data['projects'])} projects, "
+          f"{len(data['entries'])} entries")
+
+    export = PartsBoxExport(data)
+    start = time.perf_counter()
+    engine = BuildAvailability(export)
+    print(f"Engine precompute: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    project_ids = list(engine.projects)
+    builds = [int(b) for b in args.builds.split(",")]
+    sample = random.Random(args.seed).sample(project_ids, min(args.scan_projects, len(project_ids)))
+
+    # Both paths must agree before their times mean anything
+    for project_id in sample:
+        result = engine.check(project_id, builds[-1])
+        expected = scan_check(data, project_id, builds[-1])
+        assert result["max_builds"] == expected[0], project_id
+        assert {s["part_id"] for s in result["shortages"]} == set(expected[1]), project_id
+
+    print(f"\n{'Check':<24} {'Engine':>12} {'Entry scan':>14} {'Speedup':>10}")
+    for count in builds:
+        start = time.perf_counter()
+        for project_id in project_ids:
+            engine.check(project_id, count)
+        engine_time = (time.perf_counter() - start) / len(project_ids)
+
+        start = time.perf_counter()
+        for project_id in sample:
+            scan_check(data, project_id, count)
+        scan_time = (time.perf_counter() - start) / len(sample)
+        print(f"{f'per project, x{count}':<24} {engine_time * 1e6:>9.1f} us {scan_time * 1e3:>11.2f} ms "
+              f"{scan_time / engine_time:>9.0f}x")
+
+    start = time.perf_counter()
+    for count in builds:
+        for project_id in project_ids:
+            engine.check(project_id, count)
+    total = time.perf_counter() - start
+    print(f"\nAll {len(project_ids)} projects x {len(builds)} build counts: {total * 1000:.1f} ms")
+
+    start = time.perf_counter()
+    report = engine.check_combined([(project_id, builds[0]) for project_id in project_ids])
+    print(f"Combined check of all projects x{builds[0]}: {(time.perf_counter() - start) * 1000:.1f} ms "
+          f"({len(report['shortages'])} parts short)")
+
+
+if __name__ == "__main__":
+    main()
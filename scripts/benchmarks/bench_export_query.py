@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark PartsBoxExport indexed queries against linear scans.
+
+Scales the checked-in export to the requested number of parts, then times
+the same lookups (by MPN, by tag, where-is, storage prefix contents) using
+the indexes and using a plain scan over the raw lists.
+
+Usage:
+    python bench_export_query.py
+    python bench_export_query.py --parts 100000 --queries 200
+"""
+
+import argparse
+import random
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from partsbox_export import PartsBoxExport, normalize_key
+from synthetic import load_seed_export, scale_export
+
+
+def scan_by_mpn(data: Dict, mpn: str) -> List[Dict]:
+    key = normalize_key(mpn)
+    return [p for p in data["parts"]
+            if normalize_key(p.get("part/name", "")) == key or normalize_key(p.get("part/mpn") or "") == key]
+
+
+def scan_by_tag(data: Dict, tag: str) -> List[Dict]:
+    key = normalize_key(tag)
+    return [p for p in data["parts"] if key in {normalize_key(t) for t in p.get("part/tags") or []}]
+
+
+def scan_where_is(data: Dict, part_id: str) -> Dict[str, int]:
+    names = {s["storage/id"]: s["storage/name"] for s in data["storage"]}
+    for part in data["parts"]:
+        if part["part/id"] == part_id:
+            balances = defaultdict(int)
+            for event in part.get("part/stock", []):
+                balances[names.get(event["stock/storage-id"])] += event.get("stock/quantity", 0)
+            return {name: qty for name, qty in balances.items() if qty}
+    return {}
+
+
+def scan_contents(data: Dict, prefix: str) -> List[Dict]:
+    ids = {s["storage/id"] for s in data["storage"] if s["storage/name"].startswith(prefix)}
+    results = []
+    for part in data["parts"]:
+        balances = defaultdict(int)
+        for event in part.get("part/stock", []):
+            if event["stock/storage-id"] in ids:
+                balances[event["stock/storage-id"]] += event.get("stock/quantity", 0)
+        results.extend((part["part/id"], sid, qty) for sid, qty in balances.items() if qty)
+    return results
+
+
+def time_queries(fn: Callable, args: List) -> float:
+    """Return mean seconds per query."""
+    start = time.perf_counter()
+    for arg in args:
+        fn(arg)
+    return (time.perf_counter() - start) / len(args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PartsBox export queries")
+    parser.add_argument("--parts", type=int, default=100000, help="Synthetic part count (default: 100000)")
+    parser.add_argument("--queries", type=int, default=50, help="Queries per type for indexed lookups (default: 50)")
+    parser.add_argument("--scan-queries", type=int, default=5, help="Queries per type for linear scans (default: 5)")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed (default: 1)")
+    args = parser.parse_args()
+
+    data = scale_export(load_seed_export(), args.parts, args.seed)
+    print(f"Synthetic export: {len(data['parts'])} parts, {len(data['storage'])} storage locations")
+
+    start = time.perf_counter()
+    export = PartsBoxExport(data)
+    print(f"Index build: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    rng = random.Random(args.seed)
+    sample = rng.sample(data["parts"], args.queries)
+    mpns = [p["part/name"] for p in sample]
+    part_ids = [p["part/id"] for p in sample]
+    tags = [rng.choice(["THT", "SMD", "capacitor", "resistor"]) for _ in range(args.queries)]
+    prefixes = [rng.choice(data["storage"])["storage/name"].rsplit("-", 1)[0] + "-" for _ in range(args.queries)]
+
+    cases = [
+        ("find by MPN", export.find_parts, lambda m: scan_by_mpn(data, m), mpns),
+        ("parts with tag", export.parts_with_tag, lambda t: scan_by_tag(data, t), tags),
+        ("where is part", export.where_is, lambda p: scan_where_is(data, p), part_ids),
+        ("storage contents", export.contents, lambda s: scan_contents(data, s), prefixes),
+    ]
+
+    print(f"\n{'Query':<18} {'Indexed':>12} {'Linear scan':>14} {'Speedup':>10}")
+    for label, indexed, scan, inputs in cases:
+        indexed_time = time_queries(indexed, inputs)
+        scan_time = time_queries(scan, inputs[:args.scan_queries])
+        print(f"{label:<18} {indexed_time * 1e6:>9.1f} us {scan_time * 1e3:>11.2f} ms "
+              f"{scan_time / indexed_time:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
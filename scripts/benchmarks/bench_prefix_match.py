@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for storage type prefix matching.
+
+Compares the original linear startswith() scan against PrefixIndex over a
+synthetic set of storage types and location names, and checks that
+PrefixIndex always returns the longest matching prefix.
+
+Usage:
+    python bench_prefix_match.py
+    python bench_prefix_match.py --names 50000 --types 200 --repeat 5
+"""
+
+import argparse
+import random
+import sys
+import time
+import types
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+try:
+    from update_storage_tags import PrefixIndex
+except ImportError:
+    # api_client lives in the partsbox-api skill venv; matching doesn't need it
+    sys.modules["api_client"] = types.SimpleNamespace(api_request=None)
+    from update_storage_tags import PrefixIndex
+
+
+def generate_storage_types(count: int) -> Dict[str, Dict]:
+    """Generate overlapping storage type prefixes (SMD-Box, SMD-Box2, ...)."""
+    families = ["SMD-Box", "SMD-ESD-Box", "CmpntCab", "Stowaway", "Drawer", "Bin"]
+    storage_types = {}
+    i = 0
+    while len(storage_types) < count:
+        family = families[i % len(families)]
+        index = i // len(families)
+        storage_types[family if index == 0 else f"{family}{index}"] = {"tags": [], "description": ""}
+        i += 1
+    return storage_types
+
+
+def generate_names(prefixes: List[str], count: int, seed: int) -> List[str]:
+    """Generate grid location names, with ~5% that match no prefix."""
+    rng = random.Random(seed)
+    names = []
+    for _ in range(count):
+        if rng.random() < 0.05:
+            names.append(f"Unsorted-{rng.randint(1, 999)}")
+        else:
+            names.append(f"{rng.choice(prefixes)}-{rng.choice('ABCDEFGHIJKL')}{rng.randint(1, 12)}")
+    return names
+
+
+def linear_first_match(storage_types: Dict[str, Dict], name: str) -> Optional[str]:
+    """Original behaviour: first prefix in dict order."""
+    for prefix in storage_types:
+        if name.startswith(prefix):
+            return prefix
+    return None
+
+
+def linear_longest_match(storage_types: Dict[str, Dict], name: str) -> Optional[str]:
+    """Reference implementation used to verify PrefixIndex."""
+    matches = [prefix for prefix in storage_types if name.startswith(prefix)]
+    return max(matches, key=len) if matches else None
+
+
+def best_of(repeat: int, fn) -> float:
+    """Return the best wall time of repeat runs of fn()."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark storage type prefix matching")
+    parser.add_argument("--names", type=int, default=50000, help="Number of location names (default: 50000)")
+    parser.add_argument("--types", type=int, default=200, help="Number of storage types (default: 200)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions, best is reported (default: 5)")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed (default: 1)")
+    args = parser.parse_args()
+
+    storage_types = generate_storage_types(args.types)
+    prefixes = list(storage_types)
+    names = generate_names(prefixes, args.names, args.seed)
+
+    build_start = time.perf_counter()
+    index = PrefixIndex(storage_types)
+    build_time = time.perf_counter() - build_start
+
+    mismatches = sum(1 for name in names
+                     if index.longest_match(name) != linear_longest_match(storage_types, name))
+    order_dependent = sum(1 for name in names
+                          if linear_first_match(storage_types, name) != index.longest_match(name))
+
+    linear_time = best_of(args.repeat, lambda: [linear_first_match(storage_types, n) for n in names])
+    longest_time = best_of(args.repeat, lambda: [linear_longest_match(storage_types, n) for n in names])
+    trie_time = best_of(args.repeat, lambda: [index.longest_match(n) for n in names])
+
+    print(f"Storage types:      {len(storage_types)}")
+    print(f"Location names:     {len(names)}")
+    print(f"Index build:        {build_time * 1000:.2f} ms")
+    print(f"Linear first-match: {linear_time * 1000:.2f} ms ({linear_time / len(names) * 1e6:.2f} us/name)")
+    print(f"Linear longest:     {longest_time * 1000:.2f} ms ({longest_time / len(names) * 1e6:.2f} us/name)")
+    print(f"PrefixIndex:        {trie_time * 1000:.2f} ms ({trie_time / len(names) * 1e6:.2f} us/name)")
+    print(f"Speedup:            {linear_time / trie_time:.1f}x vs first-match, "
+          f"{longest_time / trie_time:.1f}x vs longest-match scan")
+    print(f"First-match errors: {order_dependent} names resolved to a shorter prefix by the linear scan")
+
+    if mismatches:
+        print(f"ERROR: {mismatches} names did not resolve to their longest prefix", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Benchmark streamed browser_snapshot reads against fetching the whole snapshot.
+
+Generates a large local fixture page (a supplier-style results table),
+serves it over HTTP, and reads it through the Playwright MCP server three
+ways, each in its own process so peak RSS is measured independently:
+- full:   one browser_snapshot call, links filtered locally
+- stream: snapshot_stream.iter_snapshot pages, links filtered locally
+- query:  iter_snapshot with the link filter pushed down as jmespath_query
+
+Reports snapshot payload bytes received, items, wall time and peak RSS.
+Needs fastmcp and the playwright server from .mcp.json.
+
+Usage:
+    python bench_snapshot_stream.py
+    python bench_snapshot_stream.py --rows 20000 --host host.docker.internal
+"""
+
+import argparse
+import asyncio
+import functools
+import http.server
+import json
+import resource
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT))
+
+from snapshot_stream import (NAVIGATE_TOOL, SNAPSHOT_TOOL, SnapshotStats,
+                             iter_snapshot, parse_snapshot_page)
+
+LINK_QUERY = "[?role == 'link']"
+MODES = ["full", "stream", "query"]
+
+
+def write_fixture(path: Path, rows: int) -> None:
+    """A results page with one table row (link, text cells, button) per part."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        f.write("<!doctype html><html><head><title>Snapshot fixture</title></head><body>\n")
+        f.write(f"<h1>Search results ({rows})</h1>\n<table>\n")
+        f.write("<tr><th>Part</th><th>Description</th><th>Stock</th><th>Price</th><th></th></tr>\n")
+        for i in range(rows):
+            f.write(f'<tr><td><a href="/part/{i}">RC0603FR-07{i}L</a></td>'
+                    f"<td>RES SMD {i} OHM 1% 1/10W 0603</td><td>{(i * 37) % 5000}</td>"
+                    f"<td>${(i % 90) / 100 + 0.01:.2f}</td><td><button>Add to cart</button></td></tr>\n")
+        f.write("</table></body></html>\n")
+
+
+def serve_directory(directory: Path) -> int:
+    """Serve a directory on an ephemeral port in a daemon thread. Returns the port."""
+    handler = functools.partial(_QuietHandler, directory=str(directory))
+    server = http.server.ThreadingHTTPServer(("0.0.0.0", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server.server_address[1]
+
+
+class _QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def peak_rss_kb() -> int:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+async def measure(mode: str, url: str, config_path: str, page_size: int) -> Dict:
+    from fastmcp import Client
+
+    with open(config_path) as f:
+        config = json.load(f)
+
+    async with Client(config) as client:
+        await client.call_tool(NAVIGATE_TOOL, {"url": url, "silent_mode": True})
+        baseline = peak_rss_kb()
+        start = time.perf_counter()
+
+        if mode == "full":
+            result = await client.call_tool(SNAPSHOT_TOOL, {"flatten": True, "output_format": "json"})
+            items, size = parse_snapshot_page(result.data)
+            links = sum(1 for item in items if isinstance(item, dict) and item.get("role") == "link")
+            pages, total = 1, len(items)
+        else:
+            stats = SnapshotStats()
+            query = LINK_QUERY if mode == "query" else None
+            links = 0
+            async for item in iter_snapshot(client, jmespath_query=query, page_size=page_size, stats=stats):
+                if query or (isinstance(item, dict) and item.get("role") == "link"):
+                    links += 1
+            size, pages, total = stats.bytes, stats.pages, stats.items
+
+        return {
+            "mode": mode,
+            "seconds": time.perf_counter() - start,
+            "bytes": size,
+            "pages": pages,
+            "items_received": total,
+            "links": links,
+            "peak_rss_kb": peak_rss_kb(),
+            "rss_growth_kb": peak_rss_kb() - baseline
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark streamed vs whole browser_snapshot reads")
+    parser.add_argument("--rows", type=int, default=10000, help="Table rows in the fixture (default: 10000)")
+    parser.add_argument("--page-size", type=int, default=500, help="Items per streamed request (default: 500)")
+    parser.add_argument("--fixture", default="/workspace/temp/snapshot-fixture/index.html",
+                        help="Where to write the fixture page")
+    parser.add_argument("--host", default="localhost",
+                        help="Host name the browser uses to reach this machine (default: localhost)")
+    parser.add_argument("--config", default=str(REPO_ROOT / ".mcp.json"), help="MCP config")
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--url", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(asyncio.run(measure(args.mode, args.url, args.config, args.page_size))))
+        return
+
+    fixture = Path(args.fixture)
+    write_fixture(fixture, args.rows)
+    port = serve_directory(fixture.parent)
+    url = f"http://{args.host}:{port}/{fixture.name}"
+    print(f"Fixture: {args.rows} rows, {fixture.stat().st_size:,} bytes of HTML at {url}", file=sys.stderr)
+
+    print(f"{'mode':8} {'bytes':>12} {'pages':>6} {'items':>8} {'links':>7} {'seconds':>8} {'rss growth':>11}")
+    for mode in MODES:
+        output = subprocess.run(
+            [sys.executable, __file__, "--mode", mode, "--url", url, "--config", args.config,
+             "--page-size", str(args.page_size)],
+            capture_output=True, text=True
+        )
+        if output.returncode != 0:
+            print(f"ERROR: {mode} run failed:\n{output.stderr}", file=sys.stderr)
+            sys.exit(1)
+        r = json.loads(output.stdout.strip().splitlines()[-1])
+        print(f"{mode:8} {r['bytes']:>12,} {r['pages']:>6} {r['items_received']:>8} {r['links']:>7} "
+              f"{r['seconds']:>8.2f} {r['rss_growth_kb'] / 1024:>9.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
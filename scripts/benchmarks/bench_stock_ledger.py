@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark incremental StockLedger updates against a full refold.
+
+Scales the checked-in export, folds it once into a snapshot, then applies
+the same export again (nothing new) and a copy with one new stock event on
+a share of the parts. Each is compared with folding every part's full
+history from scratch, and the resulting balances must match. The seed
+export averages about one event per part; --history pads every stocked
+part with older events to model longer-lived inventories, where the full
+fold grows with the history and the incremental update does not.
+
+Usage:
+    python bench_stock_ledger.py
+    python bench_stock_ledger.py --parts 30000 --changed 0.1 --history 20
+"""
+
+import argparse
+import copy
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from stock_ledger import StockLedger
+from synthetic import load_seed_export, scale_export
+
+
+def full_fold(data: Dict) -> Dict[str, Dict[str, int]]:
+    """{part_id: {storage_id: quantity}} by replaying every event."""
+    balances = {}
+    for part in data["parts"]:
+        part_balances = {}
+        for event in part.get("part/stock", []):
+            sid = event["stock/storage-id"]
+            part_balances[sid] = part_balances.get(sid, 0) + event.get("stock/quantity", 0)
+        balances[part["part/id"]] = {sid: q for sid, q in part_balances.items() if q}
+    return balances
+
+
+def best_of(repeat: int, fn) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark incremental stock ledger updates")
+    parser.add_argument("--parts", type=int, default=30000, help="Synthetic part count (default: 30000)")
+    parser.add_argument("--changed", type=float, default=0.1,
+                        help="Share of parts with a new stock event (default: 0.1)")
+    parser.add_argument("--history", type=int, default=0,
+                        help="Older stock events added to every stocked part (default: 0)")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per case, best time kept (default: 5)")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed (default: 1)")
+    args = parser.parse_args()
+
+    data = scale_export(load_seed_export(), args.parts, args.seed)
+    for part in data["parts"]:
+        events = part.get("part/stock")
+        if events and args.history:
+            first = events[0]
+            part["part/stock"] = [dict(first, **{"stock/timestamp": first["stock/timestamp"] - args.history + i,
+                                                 "stock/quantity": 1 if i % 2 == 0 else -1})
+                                  for i in range(args.history)] + events
+    print(f"Synthetic export: {len(data['parts'])} parts, "
+          f"{sum(len(p.get('part/stock', [])) for p in data['parts'])} stock events")
+
+    appended = copy.deepcopy(data)
+    rng = random.Random(args.seed)
+    stocked = [p for p in appended["parts"] if p.get("part/stock")]
+    for part in rng.sample(stocked, int(len(stocked) * args.changed)):
+        last = part["part/stock"][-1]
+        part["part/stock"].append(dict(last, **{"stock/timestamp": last["stock/timestamp"] + 1000,
+                                                "stock/quantity": -1}))
+
+    base = StockLedger()
+    base.apply_export(data)
+
+    print(f"\n{'Export':<28} {'Full fold':>12} {'Incremental':>13} {'Speedup':>9}")
+    for label, export in (("unchanged", data), (f"{args.changed:.0%} of parts appended", appended)):
+        expected = full_fold(export)
+        ledger = StockLedger()
+        ledger.parts = copy.deepcopy(base.parts)
+        ledger.apply_export(export)
+        assert {part_id: state["balances"] for part_id, state in ledger.parts.items()} == expected, label
+        assert ledger.stats["refolded"] == 0, ledger.stats
+
+        fold_time = best_of(args.repeat, lambda: full_fold(export))
+
+        def incremental():
+            ledger.parts = {part_id: dict(state, balances=dict(state["balances"]))
+                            for part_id, state in base.parts.items()}
+            start = time.perf_counter()
+            ledger.apply_export(export)
+            return time.perf_counter() - start
+
+        incremental_time = min(incremental() for _ in range(args.repeat))
+        print(f"{label:<28} {fold_time * 1000:>9.1f} ms {incremental_time * 1000:>10.1f} ms "
+              f"{fold_time / incremental_time:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
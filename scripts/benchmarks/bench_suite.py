@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Scale benchmark suite for the inventory tooling, with a regression baseline.
+
+For each scale factor the checked-in export is cloned that many times
+(synthetic.scale_export) and storage_metadata.json is scaled to match
+(synthetic.scale_storage_metadata), so every cloned container has its own
+storage type and every unbuilt grid is planned once per copy. Then it times
+(best of --repeat) and measures the tracemalloc peak of:
+
+- export_load: PartsBoxExport.load() of the scaled export file
+- generate_update_plan: planning every scaled storage location
+- generate_create_plan: expanding every unbuilt grid
+- dry_run: the streamed JSON preview, fetching through stub_api_client
+  (with --latency per call) and writing to a byte-counting sink
+
+Results are compared with scripts/benchmarks/baseline.json. A result is a
+regression when it is slower than the baseline by more than
+--time-tolerance or uses more peak memory than --memory-tolerance (plus
+small absolute floors for noise). Times depend on the machine, so refresh
+the baseline with --update-baseline when moving to new hardware; peak
+memory is close to deterministic.
+
+Usage:
+    python bench_suite.py
+    python bench_suite.py --check
+    python bench_suite.py --scales 1,10,100 --update-baseline
+    python bench_suite.py --scales 10 --latency 0.05 --baseline /tmp/latency-baseline.json --update-baseline
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from stub_api_client import StubAPIClient
+from synthetic import load_seed_export, scale_export, scale_storage_metadata
+
+StubAPIClient([]).install()
+
+from partsbox_export import PartsBoxExport
+from update_storage_tags import StorageMetadataUpdater
+
+DEFAULT_CONFIG = Path(__file__).resolve().parent.parent / "storage_metadata.json"
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+# Differences below these are noise, whatever the relative change
+TIME_FLOOR = 0.002
+MEMORY_FLOOR = 64 * 1024
+
+
+class _ByteCounter:
+    """Write-only sink that keeps the size of what was written, not the text."""
+
+    def __init__(self):
+        self.bytes = 0
+
+    def write(self, text: str) -> int:
+        self.bytes += len(text)
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+
+def measure(fn: Callable[[], int], repeat: int) -> Dict:
+    """Best wall time of repeat runs, then the tracemalloc peak of one more run."""
+    timings = []
+    with contextlib.redirect_stderr(io.StringIO()):
+        for _ in range(repeat):
+            # Start each run without garbage left over from the previous one
+            gc.collect()
+            start = time.perf_counter()
+            items = fn()
+            timings.append(time.perf_counter() - start)
+
+        gc.collect()
+        tracemalloc.start()
+        try:
+            fn()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return {"items": items, "seconds": round(min(timings), 6), "peak_bytes": peak}
+
+
+def run_scale(seed: Dict, metadata: Dict, scale: int, latency: float, repeat: int, seed_value: int) -> Dict:
+    """Measure every benchmark at one scale factor."""
+    data = scale_export(seed, len(seed["parts"]) * scale, seed_value)
+    scaled_metadata = scale_storage_metadata(metadata, scale)
+    locations = data["storage"]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        export_path = Path(tmp) / "partsbox-export-synthetic.json"
+        config_path = Path(tmp) / "storage_metadata.json"
+        with open(export_path, 'w') as f:
+            json.dump(data, f)
+        with open(config_path, 'w') as f:
+            json.dump(scaled_metadata, f, indent=2)
+
+        stub = StubAPIClient(locations, latency=latency, seed=seed_value)
+        updater = StorageMetadataUpdater(str(config_path), api_request=stub.api_request,
+                                         bulk_request=stub.api_bulk_request)
+
+        def export_load() -> int:
+            return len(PartsBoxExport.load(str(export_path)).parts_by_id)
+
+        def update_plan() -> int:
+            return len(updater.generate_update_plan(locations)["matched"])
+
+        def create_plan() -> int:
+            return sum(1 for _ in updater.generate_create_plan())
+
+        def dry_run() -> int:
+            sink = _ByteCounter()
+            updater.dry_run(sink)
+            return sink.bytes
+
+        cases: List[Tuple[str, Callable[[], int]]] = [
+            ("export_load", export_load),
+            ("generate_update_plan", update_plan),
+            ("generate_create_plan", create_plan),
+            ("dry_run", dry_run),
+        ]
+        results = {name: measure(fn, repeat) for name, fn in cases}
+
+    results["_size"] = {"parts": len(data["parts"]), "storage": len(locations),
+                        "storage_types": len(scaled_metadata["storage_types"])}
+    return results
+
+
+def compare(results: Dict, baseline: Dict, time_tolerance: float, memory_tolerance: float) -> List[str]:
+    """Regressions of results against baseline, as readable lines."""
+    regressions = []
+    for scale, cases in results.items():
+        for name, current in cases.items():
+            base = baseline.get("results", {}).get(scale, {}).get(name)
+            if name.startswith("_") or base is None:
+                continue
+            if current["seconds"] > base["seconds"] * (1 + time_tolerance) + TIME_FLOOR:
+                regressions.append(f"x{scale} {name}: {current['seconds'] * 1000:.1f} ms "
+                                   f"vs baseline {base['seconds'] * 1000:.1f} ms")
+            if current["peak_bytes"] > base["peak_bytes"] * (1 + memory_tolerance) + MEMORY_FLOOR:
+                regressions.append(f"x{scale} {name}: peak {current['peak_bytes'] / 1024:.0f} KiB "
+                                   f"vs baseline {base['peak_bytes'] / 1024:.0f} KiB")
+    return regressions
+
+
+def format_results(results: Dict, baseline: Dict) -> str:
+    lines = [f"{'Scale':<7} {'Benchmark':<22} {'Items':>9} {'Time':>11} {'Peak mem':>12} {'vs baseline':>20}"]
+    for scale, cases in results.items():
+        size = cases["_size"]
+        lines.append(f"x{scale:<6} {size['parts']} parts, {size['storage']} storage locations, "
+                     f"{size['storage_types']} storage types")
+        for name, current in cases.items():
+            if name.startswith("_"):
+                continue
+            base = baseline.get("results", {}).get(scale, {}).get(name)
+            versus = ""
+            if base:
+                versus = (f"{current['seconds'] / base['seconds'] if base['seconds'] else 1:.2f}x / "
+                          f"{current['peak_bytes'] / base['peak_bytes'] if base['peak_bytes'] else 1:.2f}x")
+            lines.append(f"{'':<7} {name:<22} {current['items']:>9} {current['seconds'] * 1000:>8.1f} ms "
+                         f"{current['peak_bytes'] / 1024:>8.0f} KiB {versus:>20}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark export loading and storage tag planning at scale",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Run and compare with the checked-in baseline (exit 1 on regression)
+  %(prog)s --check
+
+  # Record a new baseline after an intended change (or on new hardware)
+  %(prog)s --update-baseline
+
+  # Dry run against an API with 50 ms round trips
+  %(prog)s --scales 10 --latency 0.05 --baseline /tmp/latency-baseline.json --update-baseline
+        """
+    )
+    parser.add_argument("--scales", default="1,10,100", help="Comma-separated scale factors (default: 1,10,100)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Stub API latency per call in seconds (default: 0)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions, best is kept (default: 5)")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed (default: 1)")
+    parser.add_argument("--config", default=str(DEFAULT_CONFIG), help="Storage metadata config to scale")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help=f"Baseline file (default: {DEFAULT_BASELINE})")
+    parser.add_argument("--check", action="store_true", help="Exit 1 if any result regressed against the baseline")
+    parser.add_argument("--update-baseline", action="store_true", help="Write this run's results as the baseline")
+    parser.add_argument("--time-tolerance", type=float, default=1.0,
+                        help="Allowed slowdown as a fraction of the baseline time (default: 1.0, i.e. 2x)")
+    parser.add_argument("--memory-tolerance", type=float, default=0.2,
+                        help="Allowed peak memory growth as a fraction of the baseline (default: 0.2)")
+    parser.add_argument("--output", help="Also write this run's results as JSON to this file")
+    args = parser.parse_args()
+
+    try:
+        scales = [int(s) for s in args.scales.split(",")]
+        with open(args.config, 'r') as f:
+            metadata = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    baseline: Dict = {}
+    if Path(args.baseline).exists() and not args.update_baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        if baseline.get("latency") != args.latency or baseline.get("seed") != args.seed:
+            print(f"ERROR: Baseline was recorded with latency={baseline.get('latency')} seed={baseline.get('seed')}; "
+                  f"rerun with the same settings or record a new baseline", file=sys.stderr)
+            sys.exit(1)
+
+    seed = load_seed_export()
+    results = {}
+    for scale in scales:
+        print(f"Running x{scale}...", file=sys.stderr)
+        results[str(scale)] = run_scale(seed, metadata, scale, args.latency, args.repeat, args.seed)
+
+    report = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "latency": args.latency,
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "results": results
+    }
+    print(format_results(results, baseline))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}", file=sys.stderr)
+        return
+
+    if args.check:
+        if not baseline:
+            print(f"ERROR: No baseline at {args.baseline}; record one with --update-baseline", file=sys.stderr)
+            sys.exit(1)
+        missing = [scale for scale in results if scale not in baseline.get("results", {})]
+        if missing:
+            print(f"Warning: no baseline for scale(s) {', '.join(missing)}", file=sys.stderr)
+        regressions = compare(results, baseline, args.time_tolerance, args.memory_tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            print(f"ERROR: {len(regressions)} regression(s) against {args.baseline}", file=sys.stderr)
+            sys.exit(1)
+        print("No regressions against the baseline", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
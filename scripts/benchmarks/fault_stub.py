@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Fault-injecting PartsBox API stub for exercising update_storage_tags.py.
+
+Serves storage/all, storage/update and storage/create over HTTP on
+localhost, seeded with the storage locations of the checked-in export,
+and injects faults:
+
+- 429 with Retry-After and 500/503 errors at configurable rates
+- outage windows in which every call gets 503
+- lost replies: a write is applied, then answered with 500, so a
+  blind retry of a create would create the location twice
+- timeouts: a write is applied, then the reply is held back until the
+  client has given up
+- random latency
+
+Writes go through api_request one location per call, or with --bulk
+through a bulk transport that sends each batch as one call, so the faults
+also hit the updater's bulk path (a create batch applied and then failed
+must not be split and re-sent).
+
+By default it runs a full update + create pass through
+StorageMetadataUpdater against the stub, using a urllib client in place of
+the partsbox-api api_client. It then checks the end state: every location
+is tagged, every new location exists exactly once, and no update failed.
+
+Usage:
+    python fault_stub.py
+    python fault_stub.py --error-rate 0.2 --throttle-rate 0.05 --outage 1:3 --concurrency 4
+    python fault_stub.py --bulk --lost-reply-rate 0.2 --timeout-rate 0.1
+    python fault_stub.py --serve --port 8765
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+import types
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from synthetic import load_seed_export
+
+DEFAULT_CONFIG = Path(__file__).resolve().parent.parent / "storage_metadata.json"
+
+
+class FaultStub(ThreadingHTTPServer):
+    """In-memory storage API with fault injection. Faults are drawn per request."""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], storage: List[Dict], error_rate: float = 0.0,
+                 throttle_rate: float = 0.0, retry_after: float = 0.2, lost_reply_rate: float = 0.0,
+                 outages: Optional[List[Tuple[float, float]]] = None, latency: float = 0.0, seed: int = 1,
+                 timeout_rate: float = 0.0, stall: float = 2.0):
+        super().__init__(address, _Handler)
+        self.storage = {s["storage/id"]: dict(s) for s in storage}
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.lost_reply_rate = lost_reply_rate
+        self.timeout_rate = timeout_rate
+        self.stall = stall
+        self.outages = outages or []
+        self.latency = latency
+        self.started = time.monotonic()
+        self.stats: Dict[str, int] = {}
+        self.duplicate_creates: List[str] = []
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._next_id = 0
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.server_address[0]}:{self.server_address[1]}/api/1/"
+
+    def count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] = self.stats.get(key, 0) + 1
+
+    def fault(self) -> Optional[Tuple[int, Dict[str, str]]]:
+        """(status, headers) to fail this request with, or None."""
+        elapsed = time.monotonic() - self.started
+        if any(start <= elapsed < start + duration for start, duration in self.outages):
+            return 503, {}
+        with self._lock:
+            draw = self._rng.random()
+        if draw < self.throttle_rate:
+            return 429, {"Retry-After": f"{self.retry_after:g}"}
+        if draw < self.throttle_rate + self.error_rate:
+            with self._lock:
+                return self._rng.choice([(500, {}), (503, {})])
+        return None
+
+    def lost_reply(self) -> Optional[str]:
+        """How to fail the reply to an applied write: "lost_reply", "timeout" or None."""
+        with self._lock:
+            draw = self._rng.random()
+        if draw < self.lost_reply_rate:
+            return "lost_reply"
+        if draw < self.lost_reply_rate + self.timeout_rate:
+            return "timeout"
+        return None
+
+    def handle_call(self, endpoint: str, params) -> Dict:
+        if isinstance(params, list):
+            return {"data": [self.handle_call(endpoint, item)["data"] for item in params]}
+        with self._lock:
+            if endpoint == "storage/all":
+                start = int(params.get("cursor") or 0)
+                end = start + int(params.get("limit", 1000))
+                locations = list(self.storage.values())
+                return {"data": locations[start:end],
+                        "meta": {"cursor": str(end) if end < len(locations) else None}}
+            if endpoint == "storage/update":
+                location = self.storage[params["storage/id"]]
+                location.update(params)
+                return {"data": location}
+            if endpoint == "storage/create":
+                if any(s["storage/name"] == params["storage/name"] for s in self.storage.values()):
+                    self.duplicate_creates.append(params["storage/name"])
+                self._next_id += 1
+                location = dict(params, **{"storage/id": f"stub{self._next_id:022d}"})
+                self.storage[location["storage/id"]] = location
+                return {"data": location}
+        raise KeyError(endpoint)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: FaultStub
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status: int, body: Dict, headers: Optional[Dict[str, str]] = None) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        stub = self.server
+        endpoint = self.path.split("/api/1/", 1)[-1]
+        params = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if stub.latency:
+            time.sleep(random.uniform(0, stub.latency))
+
+        fault = stub.fault()
+        if fault:
+            stub.count(str(fault[0]))
+            self._reply(fault[0], {"error": "injected fault"}, fault[1])
+            return
+        try:
+            body = stub.handle_call(endpoint, params)
+        except KeyError as e:
+            stub.count("404")
+            self._reply(404, {"error": f"unknown {e}"})
+            return
+        lost = stub.lost_reply() if endpoint != "storage/all" else None
+        if lost == "lost_reply":
+            stub.count("lost_reply")
+            self._reply(500, {"error": "injected fault after apply"})
+            return
+        if lost == "timeout":
+            # Applied, but answered only after the client has timed out
+            stub.count("timeout")
+            time.sleep(stub.stall)
+            try:
+                self._reply(504, {"error": "injected timeout after apply"})
+            except OSError:
+                pass
+            return
+        stub.count("200")
+        self._reply(200, body)
+
+
+def http_api_request(base_url: str, timeout: float = 10.0) -> Callable[[str, Dict], Dict]:
+    """
+    api_request(endpoint, params) over HTTP; urllib raises HTTPError for non-2xx.
+
+    The same function serves as api_bulk_request(endpoint, payloads): a list
+    of payloads is posted as one call, which the stub applies item by item.
+    """
+    def api_request(endpoint: str, params) -> Dict:
+        request = urllib.request.Request(base_url + endpoint, data=json.dumps(params).encode(),
+                                         headers={"Content-Type": "application/json"}, method="POST")
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return json.loads(response.read())
+    return api_request
+
+
+def check_end_state(stub: FaultStub, metadata: Dict) -> Dict:
+    """
+    Verify every location matches its storage type and planned locations exist once.
+
+    Storage types are matched with the updater's own PrefixIndex.
+    duplicate_creates lists every create the stub received for a name that
+    already existed, even if the copy was later removed or renamed.
+    """
+    from update_storage_tags import PrefixIndex
+
+    names: Dict[str, int] = {}
+    for location in stub.storage.values():
+        names[location["storage/name"]] = names.get(location["storage/name"], 0) + 1
+
+    index = PrefixIndex(metadata["storage_types"])
+    untagged = []
+    for location in stub.storage.values():
+        prefix = index.longest_match(location["storage/name"])
+        if prefix and set(location.get("storage/tags") or []) != set(metadata["storage_types"][prefix]["tags"]):
+            untagged.append(location["storage/name"])
+
+    missing = [f"{prefix}-{row}{col}"
+               for prefix, config in metadata["storage_types"].items()
+               if not config.get("exists", True) and "grid" in config
+               for row in config["grid"]["rows"] for col in config["grid"]["cols"]
+               if f"{prefix}-{row}{col}" not in names]
+    return {
+        "locations": len(stub.storage),
+        "untagged": untagged,
+        "missing_creates": missing,
+        "duplicate_names": sorted(name for name, count in names.items() if count > 1),
+        "duplicate_creates": sorted(stub.duplicate_creates)
+    }
+
+
+def parse_outage(value: str) -> Tuple[float, float]:
+    start, _, duration = value.partition(":")
+    return float(start), float(duration)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run update_storage_tags.py against a fault-injecting API stub",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # 10%% errors, 5%% throttling, a 3 s outage one second in
+  %(prog)s --error-rate 0.1 --throttle-rate 0.05 --outage 1:3
+
+  # Lost replies: creates must not be retried blindly (no duplicates)
+  %(prog)s --lost-reply-rate 0.1 --max-attempts 6
+
+  # Bulk writes, with create batches applied and then failed or timed out
+  %(prog)s --bulk --lost-reply-rate 0.2 --timeout-rate 0.1
+
+  # Only serve the stub (e.g. for a manual api_client run)
+  %(prog)s --serve --port 8765
+        """
+    )
+    parser.add_argument("--error-rate", type=float, default=0.1, help="Fraction of calls failing with 500/503 (default: 0.1)")
+    parser.add_argument("--throttle-rate", type=float, default=0.05, help="Fraction of calls failing with 429 (default: 0.05)")
+    parser.add_argument("--retry-after", type=float, default=0.2, help="Retry-After seconds sent with 429 (default: 0.2)")
+    parser.add_argument("--lost-reply-rate", type=float, default=0.0,
+                        help="Fraction of writes applied but answered with 500 (default: 0)")
+    parser.add_argument("--timeout-rate", type=float, default=0.0,
+                        help="Fraction of writes applied but answered only after the client timeout (default: 0)")
+    parser.add_argument("--client-timeout", type=float, default=1.0,
+                        help="Client timeout per call in seconds (default: 1.0)")
+    parser.add_argument("--bulk", action="store_true",
+                        help="Send each batch as one bulk call instead of one call per location")
+    parser.add_argument("--outage", type=parse_outage, action="append", default=[],
+                        help="START:DURATION seconds after startup during which every call gets 503 (repeatable)")
+    parser.add_argument("--latency", type=float, default=0.005, help="Maximum random latency in seconds (default: 0.005)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--port", type=int, default=0, help="Port to listen on (default: any free port)")
+    parser.add_argument("--serve", action="store_true", help="Only run the stub server until interrupted")
+    parser.add_argument("--config", default=str(DEFAULT_CONFIG), help="Storage metadata config")
+    parser.add_argument("--batch-size", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--max-attempts", type=int, default=8)
+    parser.add_argument("--backoff", type=float, default=0.05)
+    parser.add_argument("--breaker-threshold", type=int, default=5)
+    parser.add_argument("--breaker-cooldown", type=float, default=0.5)
+    args = parser.parse_args()
+
+    storage = [{k: v for k, v in s.items() if k not in ("storage/tags", "storage/description")}
+               for s in load_seed_export()["storage"]]
+    stub = FaultStub(("127.0.0.1", args.port), storage, args.error_rate, args.throttle_rate, args.retry_after,
+                     args.lost_reply_rate, args.outage, args.latency, args.seed,
+                     args.timeout_rate, args.client_timeout + 1.0)
+    threading.Thread(target=stub.serve_forever, daemon=True).start()
+    print(f"Stub serving {len(storage)} locations at {stub.url}", file=sys.stderr)
+
+    if args.serve:
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            return
+
+    # update_storage_tags imports api_client from the partsbox-api skill; use the stub client instead
+    api_request = http_api_request(stub.url, args.client_timeout)
+    sys.modules["api_client"] = types.SimpleNamespace(api_request=api_request)
+    from update_storage_tags import CircuitBreaker, RetryPolicy, StorageMetadataUpdater
+
+    updater = StorageMetadataUpdater(args.config, args.batch_size, concurrency=args.concurrency,
+                                     api_request=api_request, bulk_request=api_request if args.bulk else None,
+                                     retry_policy=RetryPolicy(args.max_attempts, args.backoff, 2.0,
+                                                              random.Random(args.seed)),
+                                     breaker=CircuitBreaker(args.breaker_threshold, args.breaker_cooldown))
+    updates = updater.execute_updates(interactive=False)
+    creates = updater.execute_creates(interactive=False)
+    stub.shutdown()
+
+    with open(args.config, 'r') as f:
+        end_state = check_end_state(stub, json.load(f))
+    metrics = updater.metrics.to_dict()
+    # A create whose reply was lost is reported failed but exists on the server,
+    # so creates are judged by the end state rather than by their failure count
+    ok = not (end_state["untagged"] or end_state["missing_creates"] or end_state["duplicate_names"]
+              or end_state["duplicate_creates"] or updates["failed"])
+    report = {
+        "ok": ok,
+        "updates": updates,
+        "creates": creates,
+        "server_responses": stub.stats,
+        "counters": metrics["counters"],
+        "phases": metrics["phases"],
+        "end_state": end_state
+    }
+    print(updater.metrics.report(), file=sys.stderr)
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
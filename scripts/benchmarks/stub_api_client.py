@@ -0,0 +1,77 @@
+"""
+In-process stand-in for the partsbox-api skill's api_client, for benchmarks.
+
+Serves storage/all (cursor paging), storage/update and storage/create from
+an in-memory list of storage locations. Every call sleeps for an injectable
+latency, so API-bound phases (fetching for a dry run) can be measured at a
+realistic round-trip time without a network or a PartsBox account.
+fault_stub.py is the HTTP, fault-injecting counterpart.
+
+Usage:
+    from stub_api_client import StubAPIClient
+
+    stub = StubAPIClient(export["storage"], latency=0.05)
+    stub.install()                      # before importing update_storage_tags
+    from update_storage_tags import StorageMetadataUpdater
+    updater = StorageMetadataUpdater(config, api_request=stub.api_request, bulk_request=stub.api_bulk_request)
+"""
+
+import random
+import sys
+import threading
+import time
+import types
+from typing import Dict, List
+
+
+class StubAPIClient:
+    """api_request / api_bulk_request over an in-memory storage list with simulated latency."""
+
+    def __init__(self, storage: List[Dict], latency: float = 0.0, jitter: float = 0.0, seed: int = 1):
+        """latency is added to every call, plus a uniform random 0..jitter seconds."""
+        self.storage: Dict[str, Dict] = {s["storage/id"]: dict(s) for s in storage}
+        self.latency = latency
+        self.jitter = jitter
+        self.calls: Dict[str, int] = {}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._next_id = 0
+
+    def install(self) -> None:
+        """Register this stub as the api_client module."""
+        sys.modules["api_client"] = types.SimpleNamespace(api_request=self.api_request,
+                                                          api_bulk_request=self.api_bulk_request)
+
+    def _wait(self, endpoint: str) -> None:
+        with self._lock:
+            self.calls[endpoint] = self.calls.get(endpoint, 0) + 1
+            delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0)
+        if delay:
+            time.sleep(delay)
+
+    def api_request(self, endpoint: str, params: Dict) -> Dict:
+        self._wait(endpoint)
+        return self._apply(endpoint, params)
+
+    def api_bulk_request(self, endpoint: str, items: List[Dict]) -> Dict:
+        self._wait(endpoint)
+        return {"data": [self._apply(endpoint, params)["data"] for params in items]}
+
+    def _apply(self, endpoint: str, params: Dict) -> Dict:
+        with self._lock:
+            if endpoint == "storage/all":
+                start = int(params.get("cursor") or 0)
+                end = start + int(params.get("limit", 1000))
+                locations = list(self.storage.values())
+                return {"data": locations[start:end],
+                        "meta": {"cursor": str(end) if end < len(locations) else None}}
+            if endpoint == "storage/update":
+                location = self.storage[params["storage/id"]]
+                location.update(params)
+                return {"data": location}
+            if endpoint == "storage/create":
+                self._next_id += 1
+                location = dict(params, **{"storage/id": f"stub{self._next_id:022d}"})
+                self.storage[location["storage/id"]] = location
+                return {"data": location}
+        raise ValueError(f"Unsupported endpoint: {endpoint}")
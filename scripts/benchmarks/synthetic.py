@@ -0,0 +1,136 @@
+"""
+Synthetic PartsBox export generator for benchmarks.
+
+Scales a real export by cloning its parts, storage locations, projects and
+entries with fresh ids, keeping each part's stock history pointed at the
+cloned storage so on-hand balances stay realistic.
+"""
+
+import json
+import random
+from pathlib import Path
+from typing import Dict
+
+REPO_ROOT = Path(__file__).resolve().parent.parent.parent
+SEED_EXPORT = REPO_ROOT / "partsbox-backup" / "partsbox-export-1955xp0mcyjs6bbhytq8srqxy7-2026-02-15.json"
+
+_ID_ALPHABET = "0123456789abcdefghjkmnpqrstvwxyz"
+
+
+def load_seed_export() -> Dict:
+    """Load the checked-in export used as the template for scaling."""
+    with open(SEED_EXPORT, 'r') as f:
+        return json.load(f)
+
+
+def make_id(rng: random.Random) -> str:
+    """Generate a 26-character id in the PartsBox style."""
+    return "".join(rng.choice(_ID_ALPHABET) for _ in range(26))
+
+
+def suffixed_storage_name(name: str, suffix: str) -> str:
+    """Insert suffix after the container prefix: CmpntCab3-A1 -> CmpntCab3~2-A1."""
+    container, sep, slot = name.rpartition("-")
+    return f"{container}{suffix}{sep}{slot}" if sep else name + suffix
+
+
+def scale_export(seed: Dict, parts: int, seed_value: int = 1) -> Dict:
+    """
+    Build an export with the requested number of parts.
+
+    Storage, projects and entries are scaled by the same factor as parts.
+    Copy N of a record gets a "~N" suffix on its name so names stay unique;
+    storage copies become new containers (CmpntCab3~2-A1).
+    """
+    rng = random.Random(seed_value)
+    copies = max(1, -(-parts // len(seed["parts"])))
+
+    storage, parts_out, projects, entries = [], [], [], []
+    for copy in range(copies):
+        suffix = "" if copy == 0 else f"~{copy}"
+        storage_ids = {}
+        for location in seed["storage"]:
+            clone = dict(location)
+            clone["storage/id"] = storage_ids[location["storage/id"]] = make_id(rng)
+            clone["storage/name"] = suffixed_storage_name(location["storage/name"], suffix)
+            storage.append(clone)
+
+        part_ids = {}
+        for part in seed["parts"]:
+            if len(parts_out) >= parts:
+                break
+            clone = dict(part)
+            clone["part/id"] = part_ids[part["part/id"]] = make_id(rng)
+            clone["part/name"] = part["part/name"] + suffix
+            clone["part/stock"] = [
+                dict(event, **{"stock/storage-id": storage_ids.get(event["stock/storage-id"],
+                                                                   event["stock/storage-id"])})
+                for event in part.get("part/stock", [])
+            ]
+            parts_out.append(clone)
+
+        project_ids = {}
+        for project in seed.get("projects", []):
+            clone = dict(project)
+            clone["project/id"] = project_ids[project["project/id"]] = make_id(rng)
+            clone["project/name"] = project["project/name"] + suffix
+            projects.append(clone)
+
+        for entry in seed.get("entries", []):
+            if entry["entry/part-id"] not in part_ids:
+                continue
+            clone = dict(entry)
+            clone["entry/id"] = make_id(rng)
+            clone["entry/part-id"] = part_ids[entry["entry/part-id"]]
+            clone["entry/project-id"] = project_ids.get(entry["entry/project-id"], entry["entry/project-id"])
+            entries.append(clone)
+
+    return {
+        "projects": projects,
+        "entries": entries,
+        "parts": parts_out,
+        "settings": seed.get("settings", {}),
+        "storage": storage
+    }
+
+
+def add_synthetic_projects(data: Dict, projects: int, entries_per_project: int = 20, seed_value: int = 1) -> Dict:
+    """
+    Add projects with random BOMs over the export's parts.
+
+    Each project gets entries_per_project entries (quantity 1-10, with
+    designators) drawn from the parts that have stock history, so builds
+    range from easily buildable to short.
+    """
+    rng = random.Random(seed_value)
+    stocked = [p["part/id"] for p in data["parts"] if p.get("part/stock")] or [p["part/id"] for p in data["parts"]]
+    for number in range(projects):
+        project_id = make_id(rng)
+        data["projects"].append({"project/id": project_id, "project/name": f"Synthetic-Project-{number + 1}"})
+        for line, part_id in enumerate(rng.sample(stocked, min(entries_per_project, len(stocked))), 1):
+            quantity = rng.randint(1, 10)
+            data["entries"].append({
+                "entry/id": make_id(rng),
+                "entry/project-id": project_id,
+                "entry/part-id": part_id,
+                "entry/quantity": quantity,
+                "entry/designators": [f"U{line}_{n}" for n in range(quantity)]
+            })
+    return data
+
+
+def scale_storage_metadata(metadata: Dict, copies: int) -> Dict:
+    """
+    Clone every storage type once per scale_export copy.
+
+    Copy N of a type gets the same "~N" suffix as the storage it covers
+    (CmpntCab3 -> CmpntCab3~2), so a scaled export's locations match scaled
+    types. Types marked "exists": false stay unbuilt in every copy, and
+    their grids multiply the create plan.
+    """
+    storage_types = {}
+    for copy in range(copies):
+        suffix = "" if copy == 0 else f"~{copy}"
+        for prefix, config in metadata["storage_types"].items():
+            storage_types[prefix + suffix] = config
+    return dict(metadata, storage_types=storage_types)
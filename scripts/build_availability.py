@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Check whether PartsBox projects can be built from stock, and what is short.
+
+Builds two tables once from the export (or its StockLedger snapshot):
+
+- on-hand totals per part (sum of positive balances over all locations)
+- a BOM per project: part id -> quantity per build, from the export's
+  entries (entry/part-id, entry/quantity; duplicate entries summed)
+
+A check of any number of (project, build count) requests is then one pass
+over the requested BOM lines. Each result has the maximum number of
+builds, the limiting parts and the shortage per part. --combined draws all
+requests from the same stock instead of checking each on its own, e.g.
+"3x CPAP-Refiller and 2x Pump-Controller together".
+
+Shortages can be written as a kit table in the data/kits format, which
+kit_index.py and kit_optimizer.py read like any other kit.
+
+Usage:
+    python build_availability.py check CPAP-Refiller:5
+    python build_availability.py check CPAP-Refiller:3 Other-Project:2 --combined --format kit
+    python build_availability.py max
+"""
+
+import argparse
+import json
+import sys
+import time
+from collections import defaultdict
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from kit_index import find_package
+from partsbox_export import DEFAULT_EXPORT_DIR, PartsBoxExport, find_latest_export, normalize_key
+
+
+class BuildAvailability:
+    """Per-part on-hand totals and per-project BOMs, precomputed once per export."""
+
+    def __init__(self, export: PartsBoxExport):
+        self.export = export
+        self.on_hand: Dict[str, float] = {
+            part_id: sum(q for q in balances.values() if q > 0)
+            for part_id, balances in export.stock_by_part.items()
+        }
+
+        self.projects: Dict[str, Dict] = {p["project/id"]: p for p in export.data.get("projects", [])}
+        self.projects_by_name: Dict[str, List[str]] = defaultdict(list)
+        for project_id, project in self.projects.items():
+            self.projects_by_name[normalize_key(project.get("project/name", ""))].append(project_id)
+
+        boms: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        designators: Dict[Tuple[str, str], List[str]] = defaultdict(list)
+        for entry in export.data.get("entries", []):
+            part_id = entry.get("entry/part-id")
+            quantity = entry.get("entry/quantity") or 0
+            if not part_id or quantity <= 0:
+                continue
+            boms[entry["entry/project-id"]][part_id] += quantity
+            designators[entry["entry/project-id"], part_id].extend(entry.get("entry/designators") or [])
+        self.boms: Dict[str, List[Tuple[str, float]]] = {
+            project_id: list(bom.items()) for project_id, bom in boms.items()
+        }
+        self.designators = designators
+
+    def resolve(self, project: str) -> Optional[str]:
+        """Project id for an id or (case-insensitive) name."""
+        if project in self.projects:
+            return project
+        matches = self.projects_by_name.get(normalize_key(project), [])
+        return matches[0] if len(matches) == 1 else None
+
+    def _line(self, project_id: str, part_id: str, per_build: float, needed: float, have: float) -> Dict:
+        part = self.export.part(part_id)
+        return {
+            "part_id": part_id,
+            "part": part["part/name"] if part else None,
+            "designators": sorted(self.designators.get((project_id, part_id), [])),
+            "per_build": per_build,
+            "needed": needed,
+            "on_hand": have,
+            "short": max(0, needed - have)
+        }
+
+    def check(self, project_id: str, builds: int = 1) -> Dict:
+        """Max builds, limiting parts and shortages for building one project `builds` times."""
+        bom = self.boms.get(project_id, [])
+        max_builds = None
+        limiting: List[Tuple[str, float]] = []
+        shortages = []
+        for part_id, per_build in bom:
+            have = self.on_hand.get(part_id, 0)
+            possible = int(have // per_build)
+            if max_builds is None or possible < max_builds:
+                max_builds, limiting = possible, [(part_id, per_build)]
+            elif possible == max_builds:
+                limiting.append((part_id, per_build))
+            if have < per_build * builds:
+                shortages.append(self._line(project_id, part_id, per_build, per_build * builds, have))
+
+        project = self.projects.get(project_id, {})
+        return {
+            "project_id": project_id,
+            "project": project.get("project/name"),
+            "builds": builds,
+            "buildable": not shortages and bool(bom),
+            "max_builds": max_builds or 0,
+            "bom_lines": len(bom),
+            "limiting": [self._line(project_id, part_id, per_build, per_build * ((max_builds or 0) + 1),
+                                    self.on_hand.get(part_id, 0))
+                         for part_id, per_build in limiting],
+            "shortages": sorted(shortages, key=lambda line: -line["short"])
+        }
+
+    def check_combined(self, plan: List[Tuple[str, int]]) -> Dict:
+        """Shortages when every (project, builds) in plan is built from the same stock."""
+        demand: Dict[str, float] = defaultdict(float)
+        users: Dict[str, List[str]] = defaultdict(list)
+        for project_id, builds in plan:
+            name = self.projects.get(project_id, {}).get("project/name", project_id)
+            for part_id, per_build in self.boms.get(project_id, []):
+                demand[part_id] += per_build * builds
+                users[part_id].append(f"{name} x{builds}")
+
+        shortages = []
+        for part_id, needed in demand.items():
+            have = self.on_hand.get(part_id, 0)
+            if have < needed:
+                part = self.export.part(part_id)
+                shortages.append({
+                    "part_id": part_id,
+                    "part": part["part/name"] if part else None,
+                    "needed": needed,
+                    "on_hand": have,
+                    "short": needed - have,
+                    "projects": users[part_id]
+                })
+        return {
+            "plan": [{"project_id": p, "project": self.projects.get(p, {}).get("project/name"), "builds": b}
+                     for p, b in plan],
+            "buildable": not shortages,
+            "parts_needed": len(demand),
+            "shortages": sorted(shortages, key=lambda line: -line["short"])
+        }
+
+
+def format_kit(export: PartsBoxExport, title: str, shortages: List[Dict]) -> str:
+    """Shortages as a kit file in the data/kits markdown format."""
+    lines = [
+        f"# {title}",
+        "",
+        f"Parts missing to build from stock (generated {date.today().isoformat()} by build_availability.py)",
+        "",
+        "---",
+        "",
+        "## Summary",
+        "",
+        f"- **Total component types**: {len(shortages)}",
+        f"- **Total quantity**: {sum(int(s['short']) for s in shortages)} pieces",
+        "",
+        "---",
+        "",
+        "## Component List",
+        "",
+        "| # | Type | Part Number | Manufacturer | Description | Package | On Hand | Needed | Qty | Used In |",
+        "|---|------|-------------|--------------|-------------|---------|---------|--------|-----|---------|"
+    ]
+    for number, shortage in enumerate(shortages, 1):
+        part = export.part(shortage["part_id"]) or {}
+        description = (part.get("part/description") or "").replace("|", "/").strip()
+        used_in = shortage.get("projects") or shortage.get("designators") or []
+        lines.append("| " + " | ".join([
+            str(number),
+            ", ".join(part.get("part/tags") or []),
+            part.get("part/mpn") or part.get("part/name") or shortage["part_id"],
+            part.get("part/manufacturer") or "",
+            description,
+            find_package(" ".join([part.get("part/name") or "", description, part.get("part/footprint") or ""])),
+            f"{shortage['on_hand']:g}",
+            f"{shortage['needed']:g}",
+            f"{shortage['short']:g}",
+            ", ".join(used_in)
+        ]) + " |")
+    return "\n".join(lines) + "\n"
+
+
+def format_table(results: List[Dict]) -> str:
+    lines = ["| Project | Builds | Buildable | Max Builds | Limiting Parts | Short Lines |",
+             "| --- | --- | --- | --- | --- | --- |"]
+    for result in results:
+        limiting = ", ".join(line["part"] or line["part_id"] for line in result["limiting"][:3])
+        if len(result["limiting"]) > 3:
+            limiting += f" (+{len(result['limiting']) - 3})"
+        lines.append(f"| {result['project']} | {result['builds']} | {'yes' if result['buildable'] else 'no'} | "
+                     f"{result['max_builds']} | {limiting} | {len(result['shortages'])} |")
+    return "\n".join(lines)
+
+
+def parse_request(text: str) -> Tuple[str, int]:
+    """"CPAP-Refiller:5" -> ("CPAP-Refiller", 5); no count means one build."""
+    name, sep, count = text.rpartition(":")
+    if sep and count.isdigit():
+        return name, int(count)
+    return text, 1
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check project builds against on-hand stock",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Can CPAP-Refiller be built 5 times? What is short?
+  %(prog)s check CPAP-Refiller:5
+
+  # Every project at 10 builds, as a table
+  %(prog)s check --all 10 --format table
+
+  # Two projects from the same stock; shortages as a kit file
+  %(prog)s check CPAP-Refiller:3 Pump-Controller:2 --combined --format kit > data/kits/Build_Shortages.md
+
+  # Maximum builds of every project
+  %(prog)s max
+  %(prog)s max --format table
+        """
+    )
+    parser.add_argument("command", choices=["check", "max"])
+    parser.add_argument("requests", nargs="*", help="PROJECT[:BUILDS] by name or id (default builds: 1)")
+    parser.add_argument("--all", type=int, metavar="BUILDS", help="Check every project at this build count")
+    parser.add_argument("--combined", action="store_true", help="Build all requests from the same stock")
+    parser.add_argument("--export", help=f"Path to export JSON (default: newest in {DEFAULT_EXPORT_DIR})")
+    parser.add_argument("--ledger", help="StockLedger snapshot to take stock balances from")
+    parser.add_argument("--format", choices=["json", "table", "kit"], default="json",
+                        help="json, a project table, or shortages as a data/kits markdown table")
+    args = parser.parse_args()
+    if args.command == "max" and args.format == "kit":
+        parser.error("max prints json or a table; --format kit needs check")
+    if args.command == "max" and args.combined:
+        parser.error("--combined needs check")
+
+    try:
+        export = PartsBoxExport.load(str(args.export or find_latest_export(DEFAULT_EXPORT_DIR)), args.ledger)
+    except (OSError, ValueError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    start = time.perf_counter()
+    engine = BuildAvailability(export)
+    print(f"{len(engine.boms)} project BOMs, {len(engine.on_hand)} parts on hand "
+          f"({(time.perf_counter() - start) * 1000:.1f} ms)", file=sys.stderr)
+
+    if args.command == "max" or args.all is not None:
+        plan = [(project_id, args.all if args.all is not None else 1) for project_id in engine.projects]
+    else:
+        plan = []
+        for request in args.requests:
+            name, builds = parse_request(request)
+            project_id = engine.resolve(name)
+            if project_id is None:
+                print(f"ERROR: Project not found (or ambiguous): {name}", file=sys.stderr)
+                sys.exit(1)
+            plan.append((project_id, builds))
+        if not plan:
+            parser.error("check needs PROJECT[:BUILDS] arguments or --all")
+
+    start = time.perf_counter()
+    if args.combined:
+        report = engine.check_combined(plan)
+        shortages = report["shortages"]
+        title = "Build Shortages: " + ", ".join(f"{p['project']} x{p['builds']}" for p in report["plan"])
+    else:
+        results = [engine.check(project_id, builds) for project_id, builds in plan]
+        report = results
+        shortages = [dict(line, projects=[result["project"]]) for result in results for line in result["shortages"]]
+        title = "Build Shortages: " + ", ".join(f"{r['project']} x{r['builds']}" for r in results)
+    print(f"Checked {len(plan)} build request(s) in {(time.perf_counter() - start) * 1000:.2f} ms", file=sys.stderr)
+
+    if args.command == "max" and args.format == "json":
+        print(json.dumps({r["project"]: {"max_builds": r["max_builds"],
+                                         "limiting": [line["part"] for line in r["limiting"]]}
+                          for r in report}, indent=2, ensure_ascii=False))
+    elif args.format == "kit":
+        print(format_kit(export, title, shortages), end="")
+    elif args.format == "table" and not args.combined:
+        print(format_table(report))
+    else:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Content-addressed, deduplicated backup store for PartsBox exports.
+
+Each export is split into one object per record (part, storage location,
+project, entry) keyed by a hash of its serialized bytes, plus a manifest
+listing the object hashes in order. Records unchanged between snapshots
+are stored once, so the store grows with churn rather than inventory size.
+Objects are zlib-compressed with a preset dictionary of PartsBox field
+names, which matters for small records.
+
+Restores reassemble the original JSON byte-for-byte; every snapshot keeps
+the sha256 of the source file and restore/verify check against it. A
+snapshot is rebuilt before it is committed; an export whose formatting
+the records cannot reproduce (re-indented, mixed '/' escaping) is stored
+whole as a single object instead.
+
+Usage:
+    python export_backup.py backup partsbox-backup/partsbox-export-....json
+    python export_backup.py list
+    python export_backup.py restore partsbox-export-...-2026-02-15 -o restored.json
+    python export_backup.py verify --all
+    python export_backup.py stats
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+from partsbox_export import LIST_START, stream_export
+
+DEFAULT_STORE = "/workspace/partsbox-backup/backup-store.sqlite"
+CODEC = "zlib-pbdict-1"
+
+# Preset compression dictionary: field names and values common to every record.
+# Changing it requires a new CODEC name, since existing objects depend on it.
+_ZDICT = (
+    '"storage\\/existing-parts-only?":false,"storage\\/full?":false,"storage\\/single-part?":false,'
+    '"storage\\/archived?":false,"storage\\/description":"","storage\\/id":"","storage\\/name":"",'
+    '"storage\\/owner":"","storage\\/tags":[],"entry\\/id":"","entry\\/cad-footprint":"","entry\\/quantity":1,'
+    '"entry\\/project-id":"","entry\\/owner":"","entry\\/part-id":"","entry\\/designators":[],'
+    '"entry\\/name":"","entry\\/comments":"","project\\/created":,"project\\/description":"",'
+    '"project\\/id":"","project\\/name":"","project\\/owner":"","project\\/timestamp":'
+    '"stock\\/comments":"Moved from ","stock\\/linked?":true,"stock\\/currency":"usd","stock\\/price":'
+    '"stock\\/quantity":,"stock\\/storage-id":"","stock\\/timestamp":174,"stock\\/user":"'
+    '"part\\/id":"","part\\/description":"","part\\/stock":[{"part\\/owner":"","part\\/tags":["THT","SMD"],'
+    '"part\\/linked-id":"","linked\\/octopart-id":"","part\\/name":"","part\\/type":"linked",'
+    '"part\\/created":174,"part\\/footprint":"","part\\/manufacturer":"","part\\/mpn":"",'
+    '"part\\/cad-keys":[],"part\\/img-id":"","part\\/notes":"","Resistor","Capacitor","0805","1206"'
+).encode("ascii")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    hash TEXT PRIMARY KEY,
+    codec TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    name TEXT PRIMARY KEY,
+    created REAL NOT NULL,
+    source TEXT NOT NULL,
+    sha256 TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    manifest BLOB NOT NULL
+);
+"""
+
+
+def encode_value(value: Any, escape_slashes: bool) -> bytes:
+    """Serialize a value the way PartsBox writes exports (compact, ASCII, escaped '/')."""
+    text = json.dumps(value, separators=(",", ":"), ensure_ascii=True)
+    if escape_slashes:
+        # '/' can only appear inside strings in JSON output, so this is safe
+        text = text.replace("/", "\\/")
+    return text.encode("ascii")
+
+
+def object_hash(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def compress(data: bytes) -> bytes:
+    compressor = zlib.compressobj(9, zdict=_ZDICT)
+    return compressor.compress(data) + compressor.flush()
+
+
+def decompress(data: bytes) -> bytes:
+    decompressor = zlib.decompressobj(zdict=_ZDICT)
+    return decompressor.decompress(data) + decompressor.flush()
+
+
+def scan_export(path: str) -> Tuple[str, bool]:
+    """(sha256, escape_slashes) of a file; escape_slashes if '\\/' occurs anywhere in it."""
+    digest = hashlib.sha256()
+    escaped = False
+    tail = b""
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+            # Carry the last byte over so a '\/' split across chunks is still seen
+            escaped = escaped or b"\\/" in tail + chunk
+            tail = chunk[-1:]
+    return digest.hexdigest(), escaped
+
+
+class BackupStore:
+    """SQLite-backed object store with one manifest per snapshot."""
+
+    def __init__(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+
+    def backup(self, export_path: str, name: str) -> Dict:
+        """
+        Store an export as a snapshot. Returns counts of new and reused objects.
+
+        The export is streamed record by record, so only the manifest is held
+        in memory. The snapshot is reassembled and checked against the file's
+        sha256 before it is committed. If the records cannot reproduce the
+        file (it was re-indented, or escapes '/' only in places), the record
+        objects are rolled back and the file is stored as one raw object;
+        stats["format"] is then "raw" instead of "records".
+        """
+        if self.db.execute("SELECT 1 FROM snapshots WHERE name = ?", (name,)).fetchone():
+            raise ValueError(f"Snapshot {name!r} already exists")
+
+        sha256, escape_slashes = scan_export(export_path)
+        sections: List[List] = []
+        stats = {"records": 0, "new_objects": 0, "new_bytes": 0, "format": "records"}
+
+        try:
+            for section, value in stream_export(export_path, list_markers=True):
+                if value is LIST_START:
+                    sections.append([section, "list", []])
+                elif sections and sections[-1][0] == section and sections[-1][1] == "list":
+                    sections[-1][2].append(self._put(encode_value(value, escape_slashes), stats))
+                    stats["records"] += 1
+                else:
+                    sections.append([section, "value", self._put(encode_value(value, escape_slashes), stats)])
+                    stats["records"] += 1
+            manifest = {"escape_slashes": escape_slashes, "sections": sections}
+
+            digest = hashlib.sha256()
+            for chunk in self._iter_manifest(manifest):
+                digest.update(chunk)
+            if digest.hexdigest() != sha256:
+                self.db.rollback()
+                stats = {"records": 1, "new_objects": 0, "new_bytes": 0, "format": "raw"}
+                with open(export_path, 'rb') as f:
+                    manifest = {"raw": self._put(f.read(), stats)}
+
+            self.db.execute(
+                "INSERT INTO snapshots (name, created, source, sha256, size, manifest) VALUES (?, ?, ?, ?, ?, ?)",
+                (name, time.time(), os.path.basename(export_path), sha256,
+                 os.path.getsize(export_path), compress(json.dumps(manifest).encode("ascii")))
+            )
+            self.db.commit()
+        except BaseException:
+            self.db.rollback()
+            raise
+
+        stats["reused_objects"] = stats["records"] - stats["new_objects"]
+        return stats
+
+    def _put(self, data: bytes, stats: Dict) -> str:
+        """Store an object if it isn't already present. Returns its hash."""
+        key = object_hash(data)
+        if not self.db.execute("SELECT 1 FROM objects WHERE hash = ?", (key,)).fetchone():
+            blob = compress(data)
+            self.db.execute("INSERT INTO objects (hash, codec, size, data) VALUES (?, ?, ?, ?)",
+                            (key, CODEC, len(data), blob))
+            stats["new_objects"] += 1
+            stats["new_bytes"] += len(blob)
+        return key
+
+    def _get(self, key: str) -> bytes:
+        row = self.db.execute("SELECT codec, data FROM objects WHERE hash = ?", (key,)).fetchone()
+        if row is None:
+            raise KeyError(f"Missing object {key}")
+        if row[0] != CODEC:
+            raise ValueError(f"Unsupported codec {row[0]} for object {key}")
+        return decompress(row[1])
+
+    def _manifest(self, name: str) -> Dict:
+        row = self.db.execute("SELECT manifest FROM snapshots WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            raise KeyError(f"No snapshot named {name!r}")
+        return json.loads(decompress(row[0]))
+
+    def iter_restore(self, name: str) -> Iterator[bytes]:
+        """Yield the reassembled export in chunks."""
+        return self._iter_manifest(self._manifest(name))
+
+    def _iter_manifest(self, manifest: Dict) -> Iterator[bytes]:
+        if "raw" in manifest:
+            yield self._get(manifest["raw"])
+            return
+        escape = manifest["escape_slashes"]
+        yield b"{"
+        for i, (section, kind, ref) in enumerate(manifest["sections"]):
+            yield (b"," if i else b"") + encode_value(section, escape) + b":"
+            if kind == "value":
+                yield self._get(ref)
+            else:
+                yield b"["
+                for j, key in enumerate(ref):
+                    yield (b"," if j else b"") + self._get(key)
+                yield b"]"
+        yield b"}"
+
+    def restore(self, name: str, output_path: str) -> bool:
+        """Write a snapshot to output_path. Returns True if it matches the original sha256."""
+        digest = hashlib.sha256()
+        with open(output_path, 'wb') as f:
+            for chunk in self.iter_restore(name):
+                digest.update(chunk)
+                f.write(chunk)
+        return digest.hexdigest() == self.snapshot(name)["sha256"]
+
+    def verify(self, name: str) -> bool:
+        """Reassemble a snapshot in memory and compare it with the original sha256."""
+        digest = hashlib.sha256()
+        for chunk in self.iter_restore(name):
+            digest.update(chunk)
+        return digest.hexdigest() == self.snapshot(name)["sha256"]
+
+    def snapshot(self, name: str) -> Dict:
+        row = self.db.execute(
+            "SELECT name, created, source, sha256, size FROM snapshots WHERE name = ?", (name,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(f"No snapshot named {name!r}")
+        return dict(zip(("name", "created", "source", "sha256", "size"), row))
+
+    def snapshots(self) -> List[Dict]:
+        names = [row[0] for row in self.db.execute("SELECT name FROM snapshots ORDER BY created")]
+        return [self.snapshot(name) for name in names]
+
+    def stats(self) -> Dict:
+        objects, raw, stored = self.db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(LENGTH(data)), 0) FROM objects"
+        ).fetchone()
+        snapshots, logical, manifests = self.db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(LENGTH(manifest)), 0) FROM snapshots"
+        ).fetchone()
+        return {
+            "snapshots": snapshots,
+            "objects": objects,
+            "logical_bytes": logical,
+            "object_bytes_uncompressed": raw,
+            "stored_bytes": stored + manifests,
+            "ratio": round(logical / (stored + manifests), 2) if stored else None
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Deduplicated backup store for PartsBox exports",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Add an export (snapshot name defaults to the file name without .json)
+  %(prog)s backup partsbox-backup/partsbox-export-1955xp0mcyjs6bbhytq8srqxy7-2026-02-15.json
+
+  # Restore a snapshot to a file
+  %(prog)s restore partsbox-export-1955xp0mcyjs6bbhytq8srqxy7-2026-02-15 -o /tmp/restored.json
+
+  # Check every snapshot round-trips to its original bytes
+  %(prog)s verify --all
+        """
+    )
+    parser.add_argument("command", choices=["backup", "list", "restore", "verify", "stats"])
+    parser.add_argument("target", nargs="?", help="Export file (backup) or snapshot name (restore/verify)")
+    parser.add_argument("--store", default=DEFAULT_STORE, help=f"Store database (default: {DEFAULT_STORE})")
+    parser.add_argument("--name", help="Snapshot name for backup (default: export file name)")
+    parser.add_argument("-o", "--output", help="Output file for restore")
+    parser.add_argument("--all", action="store_true", help="Verify every snapshot")
+    args = parser.parse_args()
+
+    store = BackupStore(args.store)
+
+    try:
+        if args.command == "backup":
+            if not args.target:
+                parser.error("backup requires an export file")
+            name = args.name or Path(args.target).stem
+            stats = store.backup(args.target, name)
+            if stats["format"] == "raw":
+                print(f"WARNING: {args.target} is not in PartsBox's compact export format; "
+                      f"stored whole without deduplication", file=sys.stderr)
+            print(f"Snapshot {name}: {stats['records']} records, {stats['new_objects']} new objects "
+                  f"({stats['new_bytes']} bytes), {stats['reused_objects']} reused", file=sys.stderr)
+
+        elif args.command == "list":
+            print(json.dumps(store.snapshots(), indent=2))
+
+        elif args.command == "restore":
+            if not args.target or not args.output:
+                parser.error("restore requires a snapshot name and -o/--output")
+            if store.restore(args.target, args.output):
+                print(f"Restored {args.target} to {args.output} (sha256 verified)", file=sys.stderr)
+            else:
+                print(f"WARNING: Restored {args.target} to {args.output} but it does not match "
+                      f"the original sha256", file=sys.stderr)
+                sys.exit(1)
+
+        elif args.command == "verify":
+            names = [s["name"] for s in store.snapshots()] if args.all else [args.target]
+            if not names or None in names:
+                parser.error("verify requires a snapshot name or --all")
+            failed = 0
+            for name in names:
+                ok = store.verify(name)
+                failed += not ok
+                print(f"{'✓' if ok else '✗'} {name}", file=sys.stderr)
+            sys.exit(1 if failed else 0)
+
+        else:
+            print(json.dumps(store.stats(), indent=2))
+
+    except (KeyError, ValueError, OSError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
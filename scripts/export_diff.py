@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Diff two PartsBox exports record by record.
+
+Reports added, removed and changed parts, storage locations, projects and
+entries (keyed on their ids), plus stock events appended to each part's
+history. The whole history of an added part counts as new events and is
+tagged with added_part. Both files are read with the incremental parser in
+partsbox_export.stream_export: the old export is reduced to per-field
+digests and the new one is compared as it streams, so neither document is
+held in memory as Python objects.
+
+Usage:
+    python export_diff.py OLD.json NEW.json
+    python export_diff.py OLD.json NEW.json --ids-only | jq .summary
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+from typing import Any, Dict, List, Tuple
+
+from partsbox_export import SECTION_ID_KEYS, stream_export
+
+STOCK_KEY = "part/stock"
+
+
+def digest(value: Any) -> bytes:
+    """Short digest of a JSON value, independent of object key order."""
+    canonical = json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.blake2b(canonical.encode("utf-8"), digest_size=8).digest()
+
+
+def field_digests(record: Dict) -> Dict[str, bytes]:
+    """Digest every field except the stock history, which is diffed separately."""
+    return {key: digest(value) for key, value in record.items() if key != STOCK_KEY}
+
+
+def stock_fingerprint(events: List[Dict]) -> Tuple[int, bytes]:
+    """(event count, digest of the whole history) for a part's stock list."""
+    return len(events), digest(events)
+
+
+class ExportDiff:
+    """Streaming comparison of an old and a new export."""
+
+    def __init__(self, old_path: str, new_path: str, include_records: bool = True):
+        self.old_path = old_path
+        self.new_path = new_path
+        self.include_records = include_records
+
+    def _index_old(self) -> Tuple[Dict[str, Dict[str, Dict[str, bytes]]], Dict[str, Tuple[int, bytes]], Dict]:
+        """Reduce the old export to {section: {id: field digests}} and part stock fingerprints."""
+        records: Dict[str, Dict[str, Dict[str, bytes]]] = {section: {} for section in SECTION_ID_KEYS}
+        stock: Dict[str, Tuple[int, bytes]] = {}
+        other: Dict[str, bytes] = {}
+
+        for section, record in stream_export(self.old_path):
+            id_key = SECTION_ID_KEYS.get(section)
+            if id_key is None:
+                other[section] = digest(record)
+                continue
+            records[section][record[id_key]] = field_digests(record)
+            if section == "parts":
+                stock[record[id_key]] = stock_fingerprint(record.get(STOCK_KEY, []))
+
+        return records, stock, other
+
+    def run(self) -> Dict:
+        """Compute the diff. Returns a JSON-serializable report."""
+        old_records, old_stock, old_other = self._index_old()
+
+        report = {
+            section: {"added": [], "removed": [], "changed": []}
+            for section in SECTION_ID_KEYS
+        }
+        stock_events = []
+        stock_rewritten = []
+        settings_changed = []
+
+        for section, record in stream_export(self.new_path):
+            id_key = SECTION_ID_KEYS.get(section)
+            if id_key is None:
+                if old_other.pop(section, None) != digest(record):
+                    settings_changed.append(section)
+                continue
+
+            record_id = record[id_key]
+            old_fields = old_records[section].pop(record_id, None)
+            new_fields = field_digests(record)
+            entry = record if self.include_records else record_id
+
+            if old_fields is None:
+                report[section]["added"].append(entry)
+            elif old_fields != new_fields:
+                changed = sorted(key for key in old_fields.keys() | new_fields.keys()
+                                 if old_fields.get(key) != new_fields.get(key))
+                item = {"id": record_id, "fields": changed}
+                if self.include_records:
+                    item["record"] = record
+                report[section]["changed"].append(item)
+
+            if section != "parts":
+                continue
+            events = record.get(STOCK_KEY, [])
+            if record_id not in old_stock:
+                if events:
+                    stock_events.append({"part_id": record_id, "added_part": True, "events": events})
+                continue
+            old_count, old_digest = old_stock.pop(record_id)
+            if (len(events), digest(events)) == (old_count, old_digest):
+                continue
+            if len(events) > old_count and digest(events[:old_count]) == old_digest:
+                stock_events.append({"part_id": record_id, "added_part": False, "events": events[old_count:]})
+            else:
+                stock_rewritten.append(record_id)
+
+        for section, remaining in old_records.items():
+            report[section]["removed"] = sorted(remaining)
+        settings_changed.extend(old_other)
+
+        summary = {
+            section: {kind: len(items) for kind, items in changes.items()}
+            for section, changes in report.items()
+        }
+        summary["new_stock_events"] = sum(len(item["events"]) for item in stock_events)
+        summary["new_stock_events_of_added_parts"] = sum(len(item["events"]) for item in stock_events
+                                                         if item["added_part"])
+        summary["stock_histories_rewritten"] = len(stock_rewritten)
+
+        return {
+            "old": self.old_path,
+            "new": self.new_path,
+            "summary": summary,
+            **report,
+            "stock_events": stock_events,
+            "stock_histories_rewritten": stock_rewritten,
+            "other_sections_changed": sorted(settings_changed)
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Diff two PartsBox exports",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Full diff including the new version of added/changed records
+  %(prog)s data/parts-box-backup/partsbox-export-A.json partsbox-backup/partsbox-export-B.json
+
+  # Only ids and changed field names
+  %(prog)s OLD.json NEW.json --ids-only | jq .summary
+        """
+    )
+    parser.add_argument("old", help="Older export JSON")
+    parser.add_argument("new", help="Newer export JSON")
+    parser.add_argument(
+        "--ids-only",
+        action="store_true",
+        help="Report ids and changed field names without record contents"
+    )
+    args = parser.parse_args()
+
+    try:
+        report = ExportDiff(args.old, args.new, include_records=not args.ids_only).run()
+    except (OSError, ValueError) as e:
+        print(f"ERROR: Could not diff exports: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,515 @@
+#!/usr/bin/env python3
+"""
+Parse the kit markdown tables in data/kits into one typed, columnar index.
+
+Every kit file holds one or more markdown tables with its own column names
+("1% LCSC", "LCSC Code", "LCSC ID", "Unit Price (100+)", "Unit Price @ Qty"...).
+KitIndex maps them onto a common set of columns, parses numbers (stock, MOQ,
+unit price, quantity) and component values with SI prefixes (Ω, F, H), and
+keeps each column as one array, so a cross-kit query filters column by
+column instead of re-reading markdown.
+
+Parsed tables are cached per file in a JSON file keyed on the file's mtime
+and size; only kits that changed are parsed again.
+
+Usage:
+    python kit_index.py query --package 0805 --max-price 0.01 --max-moq 100
+    python kit_index.py query --unit F --min-value 1n --max-value 100n --format table
+    python kit_index.py kits
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import sys
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_KITS_DIR = "/workspace/data/kits"
+DEFAULT_CACHE = "/workspace/temp/kit-index-cache.json"
+CACHE_VERSION = 3
+
+# Canonical column -> header aliases in priority order. A trailing "*" matches
+# any header starting with the alias ("unit price*" covers "Unit Price (100+)").
+COLUMN_ALIASES: Dict[str, List[str]] = {
+    "row": ["#"],
+    "type": ["type", "category", "component type"],
+    "value": ["value"],
+    "mpn": ["1% mpn", "mpn", "part number", "part"],
+    "lcsc": ["1% lcsc", "lcsc", "lcsc code", "lcsc id"],
+    "manufacturer": ["manufacturer", "mfr", "lcsc manufacturer"],
+    "package": ["package", "package/footprint"],
+    "power": ["power"],
+    "tolerance": ["tolerance"],
+    "voltage": ["voltage"],
+    "description": ["description", "specs", "key specs"],
+    "stock": ["stock", "lcsc stock", "stock status"],
+    "moq": ["moq"],
+    "unit_price": ["unit price*", "price (each)", "price", "est. price"],
+    "supplier": ["supplier"],
+    "quantity": ["quantity", "qty", "rec. qty"],
+    "status": ["status", "stock status"],
+    "notes": ["notes", "note"],
+}
+
+NUMERIC_COLUMNS = ["stock", "moq", "unit_price", "price_tier", "quantity", "value_si"]
+TEXT_COLUMNS = ["kit", "section", "row", "type", "value", "value_unit", "mpn", "lcsc", "manufacturer",
+                "package", "power", "tolerance", "voltage", "description", "supplier", "status"]
+
+# Wide tables repeat supplier columns per distributor ("Mouser Stock", "Digikey MOQ",
+# "Alt Unit Price"); each group becomes an extra offer for the row.
+OFFER_GROUPS = {"mouser": "Mouser", "digikey": "DigiKey", "farnell": "Farnell", "alt": None}
+OFFER_FIELDS = {"sku": ["code", "mpn"], "stock": ["stock"], "moq": ["moq"], "unit_price": ["unit price"],
+                "supplier": ["supplier"]}
+OFFER_NUMERIC = ["stock", "moq", "unit_price", "price_tier"]
+OFFER_TEXT = ["supplier", "sku"]
+
+SI_PREFIXES = {"p": 1e-12, "n": 1e-9, "u": 1e-6, "µ": 1e-6, "μ": 1e-6, "m": 1e-3,
+               "": 1.0, "k": 1e3, "K": 1e3, "M": 1e6, "G": 1e9}
+SI_UNITS = {"Ω": "Ω", "ohm": "Ω", "ohms": "Ω", "F": "F", "H": "H"}
+
+_SI_VALUE = re.compile(r"(?<![\w.])(\d+(?:\.\d+)?)\s?([pnuµμmkKMG]?)\s?(Ω|ohms?|F|H)(?![a-zA-Z])")
+_RKM_VALUE = re.compile(r"^(\d*)([RKM])(\d*)$")
+_NUMBER = re.compile(r"(\d[\d,]*(?:\.\d+)?|\.\d+)([kKM](?![a-zA-Z]))?")
+_COUNT_SUFFIX = {"k": 1e3, "K": 1e3, "M": 1e6}
+# "MOQ:100" at the start of a notes cell or after a separator; "DK MOQ 5000" is another offer's
+_NOTE_MOQ = re.compile(r"(?:^|[,;(]\s*)MOQ:\s*(\d+(?:,\d{3})*)")
+_LINK = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+_STRUCK = re.compile(r"~~.*?~~")
+_PACKAGE = re.compile(r"\b(0201|0402|0603|0805|1206|1210|1812|2010|2512|SOD-\d+\w*|SOT-\d+(?:-\d+)?|SMA|SMB|SMC|"
+                      r"SOIC-\d+|TSSOP-\d+|QFN-\d+|DIP-\d+|TO-\d+\w*)\b", re.IGNORECASE)
+
+
+def parse_si(text: str) -> Optional[Tuple[float, str]]:
+    """
+    Parse the first component value in text into (base-unit value, unit).
+
+    Handles "4.7kΩ", "10 pF", "100nF", "4.7µH", "0.02Ω" and RKM codes like
+    "4K7" or "R010" (read as ohms). Returns None if there is no value.
+    """
+    if not text:
+        return None
+    match = _SI_VALUE.search(text)
+    if match:
+        number, prefix, unit = match.groups()
+        return float(number) * SI_PREFIXES[prefix], SI_UNITS[unit]
+    rkm = _RKM_VALUE.match(text.strip())
+    if rkm and (rkm.group(1) or rkm.group(3)):
+        whole, letter, fraction = rkm.groups()
+        multiplier = {"R": 1.0, "K": 1e3, "M": 1e6}[letter]
+        return float(f"{whole or 0}.{fraction or 0}") * multiplier, "Ω"
+    return None
+
+
+def find_package(text: str) -> str:
+    """First package/footprint token in text ("0805", "SOT-23-6", "SOIC-8"), upper-cased, or ''."""
+    match = _PACKAGE.search(text or "")
+    return match.group(1).upper() if match else ""
+
+
+def parse_si_bound(text: str) -> float:
+    """Parse a CLI bound like "4.7k", "100n" or "10" into a float."""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([pnuµμmkKMG]?)\s*(?:Ω|ohms?|F|H)?\s*", text)
+    if not match:
+        raise ValueError(f"Not a value: {text!r}")
+    return float(match.group(1)) * SI_PREFIXES[match.group(2)]
+
+
+def parse_number(text: str) -> Optional[float]:
+    """First number in a cell ("52,400", "✅ 3.7M", "$ 0.0041 (100+ MOQ)", "$0.15-0.20 ea"), or None."""
+    match = _NUMBER.search(text or "")
+    if not match:
+        return None
+    return float(match.group(1).replace(",", "")) * _COUNT_SUFFIX.get(match.group(2) or "", 1)
+
+
+def parse_price_tier(header: str, cell: str, moq: Optional[float],
+                     quantity: Optional[float]) -> Optional[float]:
+    """
+    Order quantity from which a listed unit price applies.
+
+    Taken from the cell ("$0.031 @ 10+", "$ 0.0128 (50+ MOQ)") or else the
+    header ("Unit Price (100+)", "Unit Price @ 3k", "@ MOQ", "@ Qty").
+    Returns None when the table does not say.
+    """
+    match = re.search(r"\((\d[\d,]*)\+", cell) or re.search(r"@\s*(\d[\d,]*)\+?", cell)
+    if match:
+        return float(match.group(1).replace(",", ""))
+    header = header.lower()
+    match = re.search(r"\((\d[\d,]*)\+\)", header)
+    if match:
+        return float(match.group(1).replace(",", ""))
+    match = re.search(r"@\s*(\d+(?:\.\d+)?)\s*(k?)\b", header)
+    if match:
+        return float(match.group(1)) * (1000 if match.group(2) else 1)
+    if "@ moq" in header:
+        return moq
+    if "@ qty" in header:
+        return quantity
+    return None
+
+
+def clean_cell(cell: str) -> str:
+    """Strip markdown links, emphasis and struck-through text; "-" means empty."""
+    cell = _LINK.sub(r"\1", _STRUCK.sub("", cell)).replace("**", "").replace("`", "").strip()
+    return "" if cell in ("-", "—") else cell
+
+
+def split_row(line: str) -> List[str]:
+    return [cell.strip() for cell in line.strip().strip("|").split("|")]
+
+
+def map_columns(headers: List[str]) -> Dict[str, int]:
+    """Map canonical column names to header positions."""
+    normalized = [h.strip().lower() for h in headers]
+    mapping = {}
+    for column, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias.endswith("*"):
+                position = next((i for i, h in enumerate(normalized) if h.startswith(alias[:-1])), None)
+            else:
+                position = normalized.index(alias) if alias in normalized else None
+            if position is not None:
+                mapping[column] = position
+                break
+    return mapping
+
+
+def map_offer_groups(headers: List[str]) -> List[Tuple[Optional[str], Dict[str, int]]]:
+    """(supplier label, {field: position}) for each priced supplier column group."""
+    normalized = [h.strip().lower() for h in headers]
+    groups = []
+    for prefix, label in OFFER_GROUPS.items():
+        fields = {}
+        for field, suffixes in OFFER_FIELDS.items():
+            for suffix in suffixes:
+                name = f"{prefix} {suffix}"
+                if name in normalized:
+                    fields[field] = normalized.index(name)
+                    break
+        if "unit_price" in fields:
+            groups.append((label, fields))
+    return groups
+
+
+def iter_tables(lines: Iterable[str]) -> Iterable[List[str]]:
+    """Yield each markdown table as a list of its lines."""
+    table: List[str] = []
+    for line in lines:
+        if line.lstrip().startswith("|"):
+            table.append(line)
+        elif table:
+            yield table
+            table = []
+    if table:
+        yield table
+
+
+def note_moq(text: str) -> Optional[float]:
+    """MOQ written into a notes cell ("MOQ:100, price verified"), or None."""
+    match = _NOTE_MOQ.search(text or "")
+    return float(match.group(1).replace(",", "")) if match else None
+
+
+def parse_kit(path: Path) -> Dict[str, Dict[str, list]]:
+    """
+    Parse every table of a kit file into column lists (missing numbers as None).
+
+    Returns {"rows": columns, "offers": columns}. Offers are the extra
+    supplier column groups of wide tables, with "row" pointing into rows.
+    """
+    kit = path.stem
+    kit_package = find_package(kit.replace("_", " "))
+    columns: Dict[str, list] = {name: [] for name in TEXT_COLUMNS + NUMERIC_COLUMNS}
+    offers: Dict[str, list] = {name: [] for name in ["row"] + OFFER_TEXT + OFFER_NUMERIC}
+
+    with open(path, 'r', encoding='utf-8') as f:
+        tables = list(iter_tables(f))
+
+    for table in tables:
+        if len(table) < 3 or not re.fullmatch(r"[\s|:\-]+", table[1]):
+            continue
+        headers = split_row(table[0])
+        mapping = map_columns(headers)
+        offer_groups = map_offer_groups(headers)
+        price_header = headers[mapping["unit_price"]] if "unit_price" in mapping else ""
+        if "mpn" not in mapping and "value" not in mapping and "lcsc" not in mapping:
+            continue
+
+        section = ""
+        for line in table[2:]:
+            cells = [clean_cell(c) for c in split_row(line)]
+            if not any(cells[1:]):
+                # Single-cell (or otherwise empty) row: a section heading
+                section = cells[0]
+                continue
+
+            def cell(column: str) -> str:
+                position = mapping.get(column)
+                return cells[position] if position is not None and position < len(cells) else ""
+
+            row = {column: cell(column) for column in COLUMN_ALIASES}
+            if not any(row[c] for c in ("mpn", "value", "lcsc")):
+                continue
+
+            parsed = parse_si(row["value"]) or parse_si(row["description"]) or parse_si(row["mpn"])
+            package = row["package"] or find_package(row["description"]) or find_package(section) or kit_package
+
+            for column in TEXT_COLUMNS:
+                if column == "kit":
+                    columns[column].append(kit)
+                elif column == "section":
+                    columns[column].append(section)
+                elif column == "package":
+                    columns[column].append(package.upper())
+                elif column == "value_unit":
+                    columns[column].append(parsed[1] if parsed else "")
+                else:
+                    columns[column].append(row[column])
+            numbers = {column: parse_number(row[column]) for column in ("stock", "moq", "unit_price", "quantity")}
+            if "moq" not in mapping:
+                numbers["moq"] = note_moq(row["notes"]) or note_moq(row["description"])
+            numbers["price_tier"] = parse_price_tier(price_header, row["unit_price"],
+                                                     numbers["moq"], numbers["quantity"])
+            numbers["value_si"] = parsed[0] if parsed else None
+            for column, number in numbers.items():
+                columns[column].append(number)
+
+            for label, fields in offer_groups:
+                def field(name: str) -> str:
+                    position = fields.get(name)
+                    return cells[position] if position is not None and position < len(cells) else ""
+
+                price = parse_number(field("unit_price"))
+                if price is None:
+                    continue
+                moq = parse_number(field("moq"))
+                offers["row"].append(len(columns["kit"]) - 1)
+                offers["supplier"].append(field("supplier") if label is None else label)
+                offers["sku"].append(field("sku"))
+                offers["stock"].append(parse_number(field("stock")))
+                offers["moq"].append(moq)
+                offers["unit_price"].append(price)
+                offers["price_tier"].append(parse_price_tier("", field("unit_price"), moq, numbers["quantity"]))
+
+    return {"rows": columns, "offers": offers}
+
+
+class KitIndex:
+    """
+    All kit rows as typed columns.
+
+    Text columns are lists of str; numeric columns (stock, moq, unit_price,
+    quantity, value_si) are array('d') with NaN for missing values, so every
+    comparison against a missing value is False and filters drop those rows.
+    Additional supplier offers from wide tables are in self.offers, with an
+    integer "row" column pointing at the row they belong to.
+    """
+
+    def __init__(self, columns: Dict[str, list], offers: Optional[Dict[str, list]] = None):
+        self.columns: Dict[str, object] = {}
+        for name in TEXT_COLUMNS:
+            self.columns[name] = columns[name]
+        for name in NUMERIC_COLUMNS:
+            self.columns[name] = array('d', (math.nan if v is None else v for v in columns[name]))
+        self.size = len(columns["kit"])
+
+        offers = offers or {name: [] for name in ["row"] + OFFER_TEXT + OFFER_NUMERIC}
+        self.offers: Dict[str, object] = {"row": array('l', offers["row"])}
+        for name in OFFER_TEXT:
+            self.offers[name] = offers[name]
+        for name in OFFER_NUMERIC:
+            self.offers[name] = array('d', (math.nan if v is None else v for v in offers[name]))
+
+    @classmethod
+    def load(cls, kits_dir: str = DEFAULT_KITS_DIR, cache_path: Optional[str] = DEFAULT_CACHE,
+             rebuild: bool = False) -> "KitIndex":
+        """Build the index, reusing cached tables of kit files whose mtime and size are unchanged."""
+        cache = {}
+        if cache_path and not rebuild and os.path.exists(cache_path):
+            try:
+                with open(cache_path, 'r') as f:
+                    stored = json.load(f)
+                if stored.get("version") == CACHE_VERSION:
+                    cache = stored["files"]
+            except (OSError, json.JSONDecodeError):
+                cache = {}
+
+        files = {}
+        parsed = 0
+        for path in sorted(Path(kits_dir).glob("*.md")):
+            stat = path.stat()
+            key = [stat.st_mtime_ns, stat.st_size]
+            entry = cache.get(path.name)
+            if entry is None or entry["key"] != key:
+                entry = {"key": key, **parse_kit(path)}
+                parsed += 1
+            files[path.name] = entry
+
+        if cache_path and (parsed or set(files) != set(cache)):
+            Path(cache_path).parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = f"{cache_path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump({"version": CACHE_VERSION, "files": files}, f, separators=(",", ":"),
+                          ensure_ascii=False)
+            os.replace(tmp_path, cache_path)
+
+        merged: Dict[str, list] = {name: [] for name in TEXT_COLUMNS + NUMERIC_COLUMNS}
+        merged_offers: Dict[str, list] = {name: [] for name in ["row"] + OFFER_TEXT + OFFER_NUMERIC}
+        for entry in files.values():
+            offset = len(merged["kit"])
+            for name in merged:
+                merged[name].extend(entry["rows"][name])
+            merged_offers["row"].extend(row + offset for row in entry["offers"]["row"])
+            for name in OFFER_TEXT + OFFER_NUMERIC:
+                merged_offers[name].extend(entry["offers"][name])
+
+        index = cls(merged, merged_offers)
+        index.files_parsed = parsed
+        index.files_total = len(files)
+        return index
+
+    def select(self, package: Optional[str] = None, unit: Optional[str] = None,
+               min_value: Optional[float] = None, max_value: Optional[float] = None,
+               max_price: Optional[float] = None, max_moq: Optional[float] = None,
+               min_stock: Optional[float] = None, kit: Optional[str] = None,
+               text: Optional[str] = None) -> List[int]:
+        """
+        Row positions matching every given condition.
+
+        Conditions are applied one column at a time to the surviving
+        positions, numeric bounds first.
+        """
+        positions: Iterable[int] = range(self.size)
+        numeric = [("unit_price", None, max_price), ("moq", None, max_moq),
+                   ("stock", min_stock, None), ("value_si", min_value, max_value)]
+        for name, low, high in numeric:
+            column = self.columns[name]
+            if low is not None:
+                positions = [i for i in positions if column[i] >= low]
+            if high is not None:
+                positions = [i for i in positions if column[i] <= high]
+
+        if unit:
+            column = self.columns["value_unit"]
+            unit = SI_UNITS.get(unit, unit)
+            positions = [i for i in positions if column[i] == unit]
+        if package:
+            column = self.columns["package"]
+            package = package.upper()
+            positions = [i for i in positions if column[i] == package]
+        if kit:
+            column = self.columns["kit"]
+            needle = kit.lower()
+            positions = [i for i in positions if needle in column[i].lower()]
+        if text:
+            needle = text.lower()
+            mpn, description, value = self.columns["mpn"], self.columns["description"], self.columns["value"]
+            positions = [i for i in positions
+                         if needle in mpn[i].lower() or needle in description[i].lower() or needle in value[i].lower()]
+
+        return list(positions)
+
+    def row(self, position: int) -> Dict:
+        """One row as a dict (NaN numbers as None)."""
+        result = {}
+        for name, column in self.columns.items():
+            value = column[position]
+            result[name] = None if isinstance(value, float) and math.isnan(value) else value
+        return result
+
+    def query(self, **conditions) -> List[Dict]:
+        """Rows matching select(**conditions) as dicts."""
+        return [self.row(i) for i in self.select(**conditions)]
+
+    def kits(self) -> Dict[str, int]:
+        """Row count per kit."""
+        counts: Dict[str, int] = {}
+        for kit in self.columns["kit"]:
+            counts[kit] = counts.get(kit, 0) + 1
+        return counts
+
+
+def format_table(rows: List[Dict]) -> str:
+    headers = ["kit", "value", "mpn", "lcsc", "package", "stock", "moq", "unit_price", "quantity", "supplier"]
+    lines = ["| " + " | ".join(headers) + " |", "|" + "---|" * len(headers)]
+    for row in rows:
+        cells = []
+        for header in headers:
+            value = row[header]
+            if isinstance(value, float):
+                value = f"${value:g}" if header == "unit_price" else f"{value:g}"
+            cells.append("" if value is None else str(value))
+        lines.append("| " + " | ".join(cells) + " |")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Query the parts listed in data/kits markdown tables",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # 0805 parts under $0.01 with MOQ <= 100
+  %(prog)s query --package 0805 --max-price 0.01 --max-moq 100
+
+  # Capacitors between 1nF and 100nF, as a markdown table
+  %(prog)s query --unit F --min-value 1n --max-value 100n --format table
+
+  # Resistors 1k-10k in the 1206 kits
+  %(prog)s query --unit ohm --min-value 1k --max-value 10k --kit 1206
+
+  # Rows per kit (and whether the cache was used)
+  %(prog)s kits
+        """
+    )
+    parser.add_argument("command", choices=["query", "kits"])
+    parser.add_argument("--kits-dir", default=DEFAULT_KITS_DIR, help=f"Kit files (default: {DEFAULT_KITS_DIR})")
+    parser.add_argument("--cache", default=DEFAULT_CACHE, help=f"Parse cache (default: {DEFAULT_CACHE})")
+    parser.add_argument("--rebuild", action="store_true", help="Ignore the cache and parse every kit")
+    parser.add_argument("--package", help="Package/footprint, e.g. 0805, SOT-23")
+    parser.add_argument("--unit", help="Value unit: ohm/Ω, F or H")
+    parser.add_argument("--min-value", help="Minimum value with SI prefix, e.g. 1k, 100n")
+    parser.add_argument("--max-value", help="Maximum value with SI prefix")
+    parser.add_argument("--max-price", type=float, help="Maximum unit price ($)")
+    parser.add_argument("--max-moq", type=float, help="Maximum MOQ")
+    parser.add_argument("--min-stock", type=float, help="Minimum supplier stock")
+    parser.add_argument("--kit", help="Substring of the kit file name")
+    parser.add_argument("--text", help="Substring of MPN, value or description")
+    parser.add_argument("--format", choices=["json", "table"], default="json", help="Output format")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.kits_dir):
+        print(f"ERROR: Kits directory not found: {args.kits_dir}", file=sys.stderr)
+        sys.exit(1)
+
+    index = KitIndex.load(args.kits_dir, args.cache, rebuild=args.rebuild)
+    print(f"Indexed {index.size} rows from {index.files_total} kit files "
+          f"({index.files_parsed} parsed, {index.files_total - index.files_parsed} cached)", file=sys.stderr)
+
+    if args.command == "kits":
+        print(json.dumps(index.kits(), indent=2))
+        return
+
+    try:
+        min_value = parse_si_bound(args.min_value) if args.min_value else None
+        max_value = parse_si_bound(args.max_value) if args.max_value else None
+    except ValueError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    rows = index.query(package=args.package, unit=args.unit, min_value=min_value, max_value=max_value,
+                       max_price=args.max_price, max_moq=args.max_moq, min_stock=args.min_stock,
+                       kit=args.kit, text=args.text)
+    print(f"{len(rows)} matching rows", file=sys.stderr)
+    if args.format == "table":
+        print(format_table(rows))
+    else:
+        print(json.dumps(rows, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
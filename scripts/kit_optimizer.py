@@ -0,0 +1,467 @@
+#!/usr/bin/env python3
+"""
+Pick the cheapest valid supplier for every line of one or more kits.
+
+Offers come from the kit tables (the row's own price, plus the Mouser /
+DigiKey / Alt column groups of wide tables, plus alternate rows such as
+the unnumbered alternatives in SMD-Kit-Recommendations) and optionally from
+a JSON file of supplier lookups. Each offer is checked against the rules in
+docs/Pricing-Guidelines.md:
+
+1. The price tier must match the order quantity (tier <= quantity)
+2. MOQ <= quantity
+3. In stock for the full quantity (back-order counts as out of stock)
+
+An offer whose MOQ or price tier is not on record cannot be checked. By
+default it stays eligible, and every line assigned to such an offer is
+listed under "unverified" and counted in the summary. With --strict it is
+rejected instead.
+
+The checks run over whole offer columns at once. Supplier choice then
+accounts for per-order shipping fees and free-shipping thresholds. Every
+subset of suppliers is evaluated: within a subset each line takes its
+cheapest valid offer, then lines are moved to suppliers below their
+free-shipping threshold when reaching it lowers the total. The subset with
+the lowest total including shipping wins. The threshold step is a
+heuristic, so the reported total is the cheapest found rather than a proven
+optimum.
+
+Usage:
+    python kit_optimizer.py E24_Resistors_0805 E24_Capacitors
+    python kit_optimizer.py E24_ --offers /workspace/temp/mouser-offers.json --format table
+    python kit_optimizer.py Motor_Control --shipping LCSC=8 --shipping DigiKey=6.99:50
+    python kit_optimizer.py E24_Capacitors --strict
+"""
+
+import argparse
+import itertools
+import json
+import math
+import re
+import sys
+import time
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from kit_index import DEFAULT_CACHE, DEFAULT_KITS_DIR, KitIndex
+
+# Supplier -> (shipping fee per order, order subtotal for free shipping or None).
+# Rough defaults; override with --shipping for the current terms in your region.
+DEFAULT_SHIPPING: Dict[str, Tuple[float, Optional[float]]] = {
+    "LCSC": (8.00, None),
+    "DigiKey": (6.99, 50.00),
+    "Mouser": (7.99, 50.00),
+    "Farnell": (8.00, 50.00),
+}
+SUPPLIER_NAMES = {name.lower(): name for name in DEFAULT_SHIPPING}
+MAX_SUBSET_SUPPLIERS = 12
+
+_IN_STOCK = re.compile(r"in stock|✅|✓", re.IGNORECASE)
+_KIT_QUANTITY = re.compile(r"qty(\d+)", re.IGNORECASE)
+
+
+def normalize_supplier(name: str) -> str:
+    name = name.strip()
+    return SUPPLIER_NAMES.get(name.lower(), name)
+
+
+def kit_supplier_hint(kit: str) -> str:
+    """Supplier named in a kit file name (e.g. ..._Kit_Digikey), or ''."""
+    lowered = kit.lower()
+    return next((name for key, name in SUPPLIER_NAMES.items() if key in lowered), "")
+
+
+def line_key(kit: str, mpn: str, value: str) -> Tuple[str, str]:
+    return kit, (mpn or value).strip().upper()
+
+
+class KitOptimizer:
+    """
+    Offer table for the selected kit lines and the supplier assignment over it.
+
+    Lines are kit rows with a quantity; a row without a quantity that repeats
+    the MPN of the line above it is an alternative offer for that line.
+    """
+
+    def __init__(self, index: KitIndex, kits: List[str], quantity: Optional[float] = None,
+                 shipping: Optional[Dict[str, Tuple[float, Optional[float]]]] = None,
+                 extra_offers: Optional[List[Dict]] = None, strict: bool = False):
+        self.index = index
+        self.strict = strict
+        self.shipping = dict(DEFAULT_SHIPPING, **(shipping or {}))
+        self.lines: List[Dict] = []
+        self.line_quantity = array('d')
+        self.suppliers: List[str] = []
+        self._supplier_ids: Dict[str, int] = {}
+
+        # Offer columns
+        self.o_line = array('l')
+        self.o_supplier = array('l')
+        self.o_price = array('d')
+        self.o_tier = array('d')
+        self.o_moq = array('d')
+        self.o_stock = array('d')
+        self.o_status_in_stock: List[bool] = []
+        self.o_sku: List[str] = []
+
+        self._build(kits, quantity, extra_offers or [])
+
+    def _supplier_id(self, name: str) -> int:
+        name = normalize_supplier(name) or "Unknown"
+        if name not in self._supplier_ids:
+            self._supplier_ids[name] = len(self.suppliers)
+            self.suppliers.append(name)
+        return self._supplier_ids[name]
+
+    def _add_offer(self, line: int, supplier: str, sku: str, price: float, tier: float,
+                   moq: float, stock: float, status_in_stock: bool) -> None:
+        self.o_line.append(line)
+        self.o_supplier.append(self._supplier_id(supplier))
+        self.o_price.append(price)
+        self.o_tier.append(tier)
+        self.o_moq.append(moq)
+        self.o_stock.append(stock)
+        self.o_status_in_stock.append(status_in_stock)
+        self.o_sku.append(sku)
+
+    def _build(self, kits: List[str], quantity: Optional[float], extra_offers: List[Dict]) -> None:
+        c = self.index.columns
+        needles = [k.lower() for k in kits]
+        line_of_row: Dict[int, int] = {}
+        line_by_key: Dict[Tuple[str, str], int] = {}
+        line_by_code: Dict[str, int] = {}
+
+        for i in range(self.index.size):
+            kit = c["kit"][i]
+            if not any(n in kit.lower() for n in needles):
+                continue
+            key = line_key(kit, c["mpn"][i], c["value"][i])
+            row_quantity = c["quantity"][i]
+
+            if math.isnan(row_quantity) and key in line_by_key:
+                line = line_by_key[key]
+            else:
+                if math.isnan(row_quantity):
+                    kit_quantity = _KIT_QUANTITY.search(kit)
+                    row_quantity = quantity if quantity is not None else (
+                        float(kit_quantity.group(1)) if kit_quantity else math.nan)
+                line = len(self.lines)
+                self.lines.append({"kit": kit, "row": c["row"][i], "mpn": c["mpn"][i], "value": c["value"][i],
+                                   "lcsc": c["lcsc"][i]})
+                self.line_quantity.append(row_quantity)
+                line_by_key[key] = line
+                for code in (c["mpn"][i], c["lcsc"][i]):
+                    if code:
+                        line_by_code.setdefault(code.upper(), line)
+            line_of_row[i] = line
+
+            supplier = c["supplier"][i] or kit_supplier_hint(kit) or ("LCSC" if c["lcsc"][i] else "")
+            sku = c["lcsc"][i] if normalize_supplier(supplier) == "LCSC" and c["lcsc"][i] else c["mpn"][i]
+            self._add_offer(line, supplier, sku, c["unit_price"][i], c["price_tier"][i], c["moq"][i],
+                            c["stock"][i], bool(_IN_STOCK.search(c["status"][i])))
+
+        offers = self.index.offers
+        for j, row in enumerate(offers["row"]):
+            if row in line_of_row:
+                self._add_offer(line_of_row[row], offers["supplier"][j], offers["sku"][j], offers["unit_price"][j],
+                                offers["price_tier"][j], offers["moq"][j], offers["stock"][j], False)
+
+        for offer in extra_offers:
+            line = next((line_by_code[code.upper()] for code in (offer.get("mpn"), offer.get("lcsc"))
+                         if code and code.upper() in line_by_code), None)
+            if line is None:
+                continue
+            breaks = offer.get("price_breaks") or [[offer.get("price_tier"), offer.get("unit_price")]]
+            for tier, price in breaks:
+                self._add_offer(line, offer.get("supplier", ""), offer.get("sku") or offer.get("mpn") or "",
+                                math.nan if price is None else float(price),
+                                math.nan if tier is None else float(tier),
+                                math.nan if offer.get("moq") is None else float(offer["moq"]),
+                                math.nan if offer.get("stock") is None else float(offer["stock"]), False)
+
+    def validity(self) -> Dict[str, List[bool]]:
+        """
+        Per-offer rule checks, computed column by column.
+
+        A missing MOQ or price tier passes its check unless strict, and is
+        recorded in "moq_known" / "tier_known" so the report can flag it.
+        """
+        quantity = [self.line_quantity[line] for line in self.o_line]
+        unknown_passes = not self.strict
+        checks = {
+            "quantity": [q == q for q in quantity],
+            "price": [p == p for p in self.o_price],
+            "tier": [t <= q if t == t else unknown_passes for t, q in zip(self.o_tier, quantity)],
+            "moq": [m <= q if m == m else unknown_passes for m, q in zip(self.o_moq, quantity)],
+            "stock": [s >= q if s == s else hint
+                      for s, q, hint in zip(self.o_stock, quantity, self.o_status_in_stock)],
+        }
+        checks["valid"] = [all(flags) for flags in zip(*checks.values())]
+        checks["moq_known"] = [m == m for m in self.o_moq]
+        checks["tier_known"] = [t == t for t in self.o_tier]
+        return checks
+
+    def _assign(self, subset: Tuple[int, ...], best: List[array]) -> Tuple[float, array, array]:
+        """
+        Offer per line within a supplier subset: (total with shipping, cost, supplier).
+
+        Each line starts at its cheapest offer. Then, for every supplier still
+        below its free-shipping threshold, lines are moved to it (smallest price
+        premium per dollar first) until the threshold is reached, and the moves
+        are kept if the total including shipping drops. This repeats until no
+        supplier's threshold pays off. It is a heuristic: the total is the best
+        found, not a proven optimum.
+        """
+        cost = array('d', best[subset[0]])
+        supplier = array('l', [subset[0]]) * len(cost)
+        for s in subset[1:]:
+            column = best[s]
+            for line, value in enumerate(column):
+                if value < cost[line]:
+                    cost[line] = value
+                    supplier[line] = s
+        total, subtotal = self._total(subset, cost, supplier)
+
+        improved = True
+        while improved:
+            improved = False
+            for s in subset:
+                fee, free_over = self.shipping.get(self.suppliers[s], (0.0, None))
+                if free_over is None or not fee or subtotal[s] >= free_over:
+                    continue
+                moves = sorted(((best[s][line] - value) / best[s][line], line)
+                               for line, value in enumerate(cost)
+                               if supplier[line] != s and 0 < best[s][line] < math.inf)
+                trial_cost, trial_supplier = array('d', cost), array('l', supplier)
+                reached = subtotal[s]
+                for _, line in moves:
+                    if reached >= free_over:
+                        break
+                    trial_cost[line] = best[s][line]
+                    trial_supplier[line] = s
+                    reached += best[s][line]
+                if reached < free_over:
+                    continue
+                trial_total, trial_subtotal = self._total(subset, trial_cost, trial_supplier)
+                if trial_total < total - 1e-9:
+                    total, subtotal, cost, supplier = trial_total, trial_subtotal, trial_cost, trial_supplier
+                    improved = True
+        return total, cost, supplier
+
+    def _total(self, subset: Tuple[int, ...], cost: array, supplier: array) -> Tuple[float, List[float]]:
+        """Merchandise plus shipping for an assignment, and the per-supplier subtotals."""
+        subtotal = [0.0] * len(self.suppliers)
+        for line, value in enumerate(cost):
+            if value != math.inf:
+                subtotal[supplier[line]] += value
+        total = sum(subtotal)
+        for s in subset:
+            if subtotal[s]:
+                total += self.shipping_fee(self.suppliers[s], subtotal[s])
+        return total, subtotal
+
+    def shipping_fee(self, supplier: str, subtotal: float) -> float:
+        fee, free_over = self.shipping.get(supplier, (0.0, None))
+        return 0.0 if free_over is not None and subtotal >= free_over else fee
+
+    def optimize(self) -> Dict:
+        checks = self.validity()
+        valid = checks["valid"]
+        n_lines, n_suppliers = len(self.lines), len(self.suppliers)
+
+        # Best valid offer per (supplier, line)
+        best = [array('d', [math.inf]) * n_lines for _ in range(n_suppliers)]
+        choice = [array('l', [-1]) * n_lines for _ in range(n_suppliers)]
+        for o, ok in enumerate(valid):
+            if ok:
+                s, line = self.o_supplier[o], self.o_line[o]
+                extended = self.o_price[o] * self.line_quantity[line]
+                if extended < best[s][line]:
+                    best[s][line] = extended
+                    choice[s][line] = o
+
+        fillable = [any(best[s][line] != math.inf for s in range(n_suppliers)) for line in range(n_lines)]
+        candidates = [s for s in range(n_suppliers) if any(v != math.inf for v in best[s])]
+
+        result = None
+        if candidates:
+            if len(candidates) <= MAX_SUBSET_SUPPLIERS:
+                subsets = (subset for size in range(1, len(candidates) + 1)
+                           for subset in itertools.combinations(candidates, size))
+            else:
+                subsets = iter([tuple(candidates)])
+            for subset in subsets:
+                total, cost, supplier = self._assign(subset, best)
+                if any(fillable[line] and cost[line] == math.inf for line in range(n_lines)):
+                    continue
+                if result is None or total < result[0] - 1e-9:
+                    result = (total, cost, supplier)
+
+        return self._report(result, checks, fillable, choice)
+
+    def _report(self, result, checks: Dict[str, List[bool]], fillable: List[bool], choice: List[array]) -> Dict:
+        assignments, unfillable = [], []
+        per_supplier: Dict[str, Dict] = {}
+
+        offers_by_line: Dict[int, List[int]] = {}
+        for o, line in enumerate(self.o_line):
+            offers_by_line.setdefault(line, []).append(o)
+
+        for line, info in enumerate(self.lines):
+            quantity = self.line_quantity[line]
+            if not fillable[line]:
+                reasons = set()
+                for o in offers_by_line.get(line, []):
+                    if not checks["quantity"][o]:
+                        reasons.add("no quantity")
+                    elif not checks["price"][o]:
+                        reasons.add(f"{self.suppliers[self.o_supplier[o]]}: no price")
+                    else:
+                        if not checks["tier_known"][o] and not checks["tier"][o]:
+                            reasons.add(f"{self.suppliers[self.o_supplier[o]]}: price tier unknown")
+                        elif not checks["tier"][o]:
+                            reasons.add(f"{self.suppliers[self.o_supplier[o]]}: price tier {self.o_tier[o]:g}+ "
+                                        f"above quantity")
+                        if not checks["moq_known"][o] and not checks["moq"][o]:
+                            reasons.add(f"{self.suppliers[self.o_supplier[o]]}: MOQ unknown")
+                        elif not checks["moq"][o]:
+                            reasons.add(f"{self.suppliers[self.o_supplier[o]]}: MOQ {self.o_moq[o]:g} > quantity")
+                        if not checks["stock"][o]:
+                            stock = self.o_stock[o]
+                            reasons.add(f"{self.suppliers[self.o_supplier[o]]}: "
+                                        + ("stock not verified" if stock != stock else f"only {stock:g} in stock"))
+                unfillable.append(dict(info, quantity=None if quantity != quantity else quantity,
+                                       reasons=sorted(reasons) or ["no offers"]))
+                continue
+
+            total, cost, supplier = result
+            s = supplier[line]
+            o = choice[s][line]
+            name = self.suppliers[s]
+            assignments.append(dict(
+                info, quantity=quantity, supplier=name, sku=self.o_sku[o], unit_price=self.o_price[o],
+                extended=round(cost[line], 4),
+                alternatives=sum(1 for x in offers_by_line[line] if checks["valid"][x]) - 1,
+                unverified=[label for label, known in (("MOQ", checks["moq_known"][o]),
+                                                       ("price tier", checks["tier_known"][o])) if not known]
+            ))
+            entry = per_supplier.setdefault(name, {"lines": 0, "subtotal": 0.0})
+            entry["lines"] += 1
+            entry["subtotal"] += cost[line]
+
+        merchandise = sum(entry["subtotal"] for entry in per_supplier.values())
+        for name, entry in per_supplier.items():
+            entry["shipping"] = self.shipping_fee(name, entry["subtotal"])
+            entry["subtotal"] = round(entry["subtotal"], 2)
+        shipping = sum(entry["shipping"] for entry in per_supplier.values())
+
+        return {
+            "lines": len(self.lines),
+            "offers": len(self.o_line),
+            "assigned": len(assignments),
+            "unverified_count": sum(1 for a in assignments if a["unverified"]),
+            "unfillable_count": len(unfillable),
+            "merchandise": round(merchandise, 2),
+            "shipping": round(shipping, 2),
+            "total": round(merchandise + shipping, 2),
+            "suppliers": per_supplier,
+            "assignments": assignments,
+            "unfillable": unfillable
+        }
+
+
+def parse_shipping(values: List[str]) -> Dict[str, Tuple[float, Optional[float]]]:
+    """SUPPLIER=FEE[:FREE_OVER] options."""
+    shipping = {}
+    for value in values:
+        supplier, _, terms = value.partition("=")
+        fee, _, free_over = terms.partition(":")
+        shipping[normalize_supplier(supplier)] = (float(fee), float(free_over) if free_over else None)
+    return shipping
+
+
+def format_table(report: Dict) -> str:
+    lines = ["| # | Kit | MPN | Value | Supplier | SKU | Qty | Unit Price | Extended | Unverified |",
+             "|---|-----|-----|-------|----------|-----|-----|------------|----------|------------|"]
+    for n, a in enumerate(report["assignments"], 1):
+        lines.append(f"| {n} | {a['kit']} | {a['mpn']} | {a['value']} | {a['supplier']} | {a['sku']} | "
+                     f"{a['quantity']:g} | ${a['unit_price']:g} | ${a['extended']:.2f} | "
+                     f"{', '.join(a['unverified'])} |")
+    lines.append("")
+    for name, entry in report["suppliers"].items():
+        lines.append(f"- **{name}**: {entry['lines']} lines, ${entry['subtotal']:.2f} + ${entry['shipping']:.2f} shipping")
+    lines.append(f"- **Total**: ${report['total']:.2f} ({report['unfillable_count']} lines unfillable)")
+    if report["unverified_count"]:
+        lines.append(f"- **Unverified**: {report['unverified_count']} lines have no MOQ or price tier on record; "
+                     f"check them before ordering")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Cheapest valid supplier per kit line, following docs/Pricing-Guidelines.md",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Optimize the E24 resistor and capacitor kits together
+  %(prog)s E24_Resistors E24_Capacitors
+
+  # Add offers saved from supplier lookups and print a markdown table
+  %(prog)s E24_ --offers /workspace/temp/mouser-offers.json --format table
+
+  # Override shipping terms (fee, and free-shipping threshold after ':')
+  %(prog)s Motor_Control --shipping LCSC=8 --shipping DigiKey=6.99:50
+
+  # Reject offers whose MOQ or price tier is not on record
+  %(prog)s E24_Capacitors --strict
+
+Offers file format (JSON list):
+  [{"mpn": "RC0805FR-0710KL", "supplier": "Mouser", "sku": "603-RC0805FR-0710KL",
+    "stock": 120000, "moq": 1, "price_breaks": [[1, 0.1], [100, 0.012]]}]
+        """
+    )
+    parser.add_argument("kits", nargs="+", help="Kit name substrings (e.g. E24_Resistors_0805)")
+    parser.add_argument("--kits-dir", default=DEFAULT_KITS_DIR, help=f"Kit files (default: {DEFAULT_KITS_DIR})")
+    parser.add_argument("--cache", default=DEFAULT_CACHE, help=f"Kit parse cache (default: {DEFAULT_CACHE})")
+    parser.add_argument("--quantity", type=float, help="Quantity for lines without one (default: kit name qtyN)")
+    parser.add_argument("--offers", help="JSON file of extra supplier offers")
+    parser.add_argument("--shipping", action="append", default=[], metavar="SUPPLIER=FEE[:FREE_OVER]",
+                        help="Shipping terms per supplier")
+    parser.add_argument("--format", choices=["json", "table"], default="json", help="Output format")
+    parser.add_argument("--strict", action="store_true",
+                        help="Treat offers with unknown MOQ or price tier as invalid instead of flagging them")
+    args = parser.parse_args()
+
+    try:
+        extra_offers = []
+        if args.offers:
+            with open(args.offers, 'r') as f:
+                extra_offers = json.load(f)
+        shipping = parse_shipping(args.shipping)
+    except (OSError, json.JSONDecodeError, ValueError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    index = KitIndex.load(args.kits_dir, args.cache)
+
+    start = time.perf_counter()
+    optimizer = KitOptimizer(index, args.kits, args.quantity, shipping, extra_offers, strict=args.strict)
+    if not optimizer.lines:
+        print(f"ERROR: No kit rows match {args.kits}", file=sys.stderr)
+        sys.exit(1)
+    report = optimizer.optimize()
+    elapsed = time.perf_counter() - start
+
+    print(f"{report['lines']} lines, {report['offers']} offers, {len(optimizer.suppliers)} suppliers: "
+          f"optimized in {elapsed * 1000:.1f} ms", file=sys.stderr)
+    if report["unverified_count"]:
+        print(f"WARNING: {report['unverified_count']} assigned lines have no MOQ or price tier on record "
+              f"(see 'unverified'); check them before ordering or use --strict", file=sys.stderr)
+    if args.format == "table":
+        print(format_table(report))
+    else:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""
+Parametric search over PartsBox parts: value, package, tolerance, power, voltage.
+
+Part specs in the export are free text ("1.5Ω Resistor 0805 1% 1/8W",
+"General Type Metal Film Resistor 68kOhm 1W 1%", MPNs like
+"MFR-25FRF52-2K2"). Each part is parsed once into normalized parameters:
+
+- value:     base-unit value and unit (Ω, F, H), from name or description,
+             or an RKM code at the end of the MPN ("-2K2", "-33R")
+- package:   0805, SOT-23, TO-92, ...
+- tolerance: percent
+- power:     watts ("1/8W", "250mW")
+- voltage:   volts ("16 V", "12VDC")
+
+and indexed two ways:
+
+- range indexes: per parameter (value per unit), a sorted list of
+  (number, part id), so a range is two bisections: O(log n + matches)
+- an inverted index from tokens (words, tags, package:, unit:) to part ids
+
+Parameters are cached per part with a fingerprint of the fields they come
+from (/workspace/temp/part-search-cache.json); a new export only re-parses
+parts whose name, description, tags, MPN or footprint changed. A
+long-running process can apply a new export with update(), which touches
+the indexes only for changed and removed parts.
+
+Usage:
+    python part_search.py query --unit ohm --min-value 1k --max-value 2k --package 0805 --on-hand
+    python part_search.py query --tag resistor --min-power 0.5 --facets
+    python part_search.py query --text "hall effect"
+    python part_search.py update
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from bisect import bisect_left, bisect_right
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from kit_index import SI_UNITS, find_package, parse_si, parse_si_bound
+from partsbox_export import DEFAULT_EXPORT_DIR, PartsBoxExport, find_latest_export, normalize_key
+
+DEFAULT_CACHE = "/workspace/temp/part-search-cache.json"
+CACHE_VERSION = 1
+RANGE_FIELDS = ["tolerance", "power", "voltage"]
+
+_OHM_WORD = re.compile(r"(?<=[\dkKmMG])\s?ohms?\b", re.IGNORECASE)
+_LOWER_FARAD = re.compile(r"(?<=\d)\s?([pnuµμ])f\b")
+_MPN_RKM = re.compile(r"-(\d+[RKM]\d*|[RKM]\d+)$")
+_TOLERANCE = re.compile(r"±?\s?(\d+(?:\.\d+)?)\s?%")
+_POWER_FRACTION = re.compile(r"(?<![\d.])(\d+)/(\d+)\s?W\b")
+_POWER = re.compile(r"(?<![\w./])(\d+(?:\.\d+)?)\s?([mk]?)W\b")
+_VOLTAGE = re.compile(r"(?<![\w.])(\d+(?:\.\d+)?)\s?([mk]?)V(?:DC|AC)?\b")
+_TOKEN = re.compile(r"[a-z0-9µμΩ][a-z0-9µμΩ.\-/]*", re.IGNORECASE)
+_SCALE = {"": 1.0, "m": 1e-3, "k": 1e3}
+
+
+def _normalize_units(text: str) -> str:
+    """"68kOhm" -> "68kΩ", "10uf" -> "10uF", so kit_index.parse_si can read them."""
+    return _LOWER_FARAD.sub(r"\1F", _OHM_WORD.sub("Ω", text))
+
+
+def _part_text(part: Dict) -> List[str]:
+    return [part.get("part/name") or "", part.get("part/description") or "",
+            part.get("part/mpn") or "", part.get("part/footprint") or ""]
+
+
+def fingerprint(part: Dict) -> str:
+    """Digest of the fields parameters are extracted from."""
+    source = _part_text(part) + sorted(part.get("part/tags") or [])
+    return hashlib.sha1(json.dumps(source, ensure_ascii=False).encode()).hexdigest()[:16]
+
+
+def extract_params(part: Dict) -> Dict:
+    """Normalized parameters and search tokens of one part."""
+    texts = [_normalize_units(text) for text in _part_text(part)]
+    joined = " ".join(texts)
+    params: Dict = {}
+
+    value = next(filter(None, (parse_si(text) for text in texts)), None)
+    if value is None:
+        rkm = _MPN_RKM.search(part.get("part/mpn") or part.get("part/name") or "")
+        value = parse_si(rkm.group(1)) if rkm else None
+    if value:
+        params["value"], params["unit"] = value
+
+    package = next(filter(None, (find_package(text) for text in texts)), "")
+    if package:
+        params["package"] = package
+
+    match = _TOLERANCE.search(joined)
+    if match:
+        params["tolerance"] = float(match.group(1))
+    match = _POWER_FRACTION.search(joined)
+    if match and int(match.group(2)):
+        params["power"] = int(match.group(1)) / int(match.group(2))
+    else:
+        match = _POWER.search(joined)
+        if match:
+            params["power"] = float(match.group(1)) * _SCALE[match.group(2)]
+    match = _VOLTAGE.search(joined)
+    if match:
+        params["voltage"] = float(match.group(1)) * _SCALE[match.group(2)]
+
+    tokens = {token.lower().strip(".-/") for token in _TOKEN.findall(joined)}
+    tokens = {token for token in tokens if len(token) > 1}
+    tokens.update(f"tag:{normalize_key(tag)}" for tag in part.get("part/tags") or [])
+    if package:
+        tokens.add(f"package:{package}")
+    if value:
+        tokens.add(f"unit:{value[1]}")
+    params["tokens"] = sorted(tokens)
+    return params
+
+
+class PartSearchIndex:
+    """
+    Range and inverted indexes over extracted part parameters.
+
+    self.params maps part id -> parameters (with "fp", the source
+    fingerprint). Range indexes keep parallel sorted lists of keys and
+    part ids per field ("value:Ω", "tolerance", ...).
+    """
+
+    def __init__(self):
+        self.params: Dict[str, Dict] = {}
+        self.ranges: Dict[str, Tuple[List[float], List[str]]] = defaultdict(lambda: ([], []))
+        self.tokens: Dict[str, Set[str]] = defaultdict(set)
+        self._token_list: Optional[List[str]] = None
+        self.stats = {"parsed": 0, "reused": 0, "removed": 0}
+
+    @staticmethod
+    def _range_entries(params: Dict) -> Iterable[Tuple[str, float]]:
+        if "value" in params:
+            yield f"value:{params['unit']}", params["value"]
+        for field in RANGE_FIELDS:
+            if field in params:
+                yield field, params[field]
+
+    def _add(self, part_id: str, params: Dict) -> None:
+        self.params[part_id] = params
+        for field, key in self._range_entries(params):
+            keys, ids = self.ranges[field]
+            position = bisect_left(keys, key)
+            while position < len(keys) and keys[position] == key and ids[position] < part_id:
+                position += 1
+            keys.insert(position, key)
+            ids.insert(position, part_id)
+        for token in params["tokens"]:
+            self.tokens[token].add(part_id)
+        self._token_list = None
+
+    def _remove(self, part_id: str) -> None:
+        params = self.params.pop(part_id)
+        for field, key in self._range_entries(params):
+            keys, ids = self.ranges[field]
+            position = bisect_left(keys, key)
+            while ids[position] != part_id:
+                position += 1
+            del keys[position], ids[position]
+        for token in params["tokens"]:
+            self.tokens[token].discard(part_id)
+            if not self.tokens[token]:
+                del self.tokens[token]
+        self._token_list = None
+
+    def _build(self) -> None:
+        """Rebuild all indexes from self.params in one sort per field."""
+        entries: Dict[str, List[Tuple[float, str]]] = defaultdict(list)
+        self.tokens = defaultdict(set)
+        for part_id, params in self.params.items():
+            for field, key in self._range_entries(params):
+                entries[field].append((key, part_id))
+            for token in params["tokens"]:
+                self.tokens[token].add(part_id)
+        self._token_list = None
+        self.ranges = defaultdict(lambda: ([], []))
+        for field, pairs in entries.items():
+            pairs.sort()
+            self.ranges[field] = ([key for key, _ in pairs], [part_id for _, part_id in pairs])
+
+    def update(self, parts: Iterable[Dict], rebuild: bool = False) -> Dict:
+        """
+        Bring the index up to date with a list of parts.
+
+        Parts whose fingerprint is unchanged keep their parameters; changed
+        and new parts are re-parsed and removed parts dropped. With
+        rebuild=False the indexes are patched in place (bisect insert/delete
+        per changed entry); with rebuild=True they are rebuilt by sorting,
+        which is faster when most parts changed or on first load.
+        """
+        self.stats = {"parsed": 0, "reused": 0, "removed": 0}
+        seen = set()
+        for part in parts:
+            part_id = part["part/id"]
+            seen.add(part_id)
+            fp = fingerprint(part)
+            current = self.params.get(part_id)
+            if current and current["fp"] == fp:
+                self.stats["reused"] += 1
+                continue
+            params = dict(extract_params(part), fp=fp)
+            self.stats["parsed"] += 1
+            if rebuild:
+                self.params[part_id] = params
+            else:
+                if current:
+                    self._remove(part_id)
+                self._add(part_id, params)
+
+        for part_id in set(self.params) - seen:
+            if rebuild:
+                del self.params[part_id]
+            else:
+                self._remove(part_id)
+            self.stats["removed"] += 1
+
+        if rebuild:
+            self._build()
+        return self.stats
+
+    @classmethod
+    def load(cls, parts: Iterable[Dict], cache_path: Optional[str] = DEFAULT_CACHE,
+             rebuild: bool = False) -> "PartSearchIndex":
+        """Index parts, reusing cached parameters of unchanged parts, and save the cache."""
+        index = cls()
+        if cache_path and not rebuild and os.path.exists(cache_path):
+            try:
+                with open(cache_path, 'r') as f:
+                    stored = json.load(f)
+                if stored.get("version") == CACHE_VERSION:
+                    index.params = stored["parts"]
+            except (OSError, json.JSONDecodeError):
+                index.params = {}
+
+        index.update(parts, rebuild=True)
+        if cache_path and (index.stats["parsed"] or index.stats["removed"]):
+            index.save(cache_path)
+        return index
+
+    def save(self, cache_path: str) -> None:
+        Path(cache_path).parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = f"{cache_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({"version": CACHE_VERSION, "parts": self.params}, f, separators=(",", ":"),
+                      ensure_ascii=False)
+        os.replace(tmp_path, cache_path)
+
+    def range(self, field: str, low: Optional[float] = None, high: Optional[float] = None) -> Set[str]:
+        """Part ids with low <= field <= high (either bound optional)."""
+        keys, ids = self.ranges.get(field, ([], []))
+        start = bisect_left(keys, low) if low is not None else 0
+        end = bisect_right(keys, high) if high is not None else len(keys)
+        return set(ids[start:end])
+
+    def prefixed(self, prefix: str) -> Set[str]:
+        """Part ids with any token starting with prefix (bisect over the sorted tokens)."""
+        if self._token_list is None:
+            self._token_list = sorted(self.tokens)
+        start = bisect_left(self._token_list, prefix)
+        end = bisect_left(self._token_list, prefix + "\U0010ffff", start)
+        return set().union(*(self.tokens[token] for token in self._token_list[start:end]))
+
+    def search(self, text: Optional[str] = None, unit: Optional[str] = None,
+               min_value: Optional[float] = None, max_value: Optional[float] = None,
+               package: Optional[str] = None, tags: Iterable[str] = (),
+               ranges: Optional[Dict[str, Tuple[Optional[float], Optional[float]]]] = None) -> Set[str]:
+        """
+        Part ids matching every given condition.
+
+        text is split into words that must all appear as tokens (prefix
+        match for the last word). ranges maps tolerance/power/voltage to
+        (low, high) bounds. Candidate sets are intersected smallest first.
+        """
+        sets: List[Set[str]] = []
+        if unit:
+            unit = SI_UNITS.get(unit, unit)
+            if min_value is not None or max_value is not None:
+                sets.append(self.range(f"value:{unit}", min_value, max_value))
+            else:
+                sets.append(self.tokens.get(f"unit:{unit}", set()))
+        if package:
+            sets.append(self.tokens.get(f"package:{package.upper()}", set()))
+        for tag in tags:
+            sets.append(self.tokens.get(f"tag:{normalize_key(tag)}", set()))
+        for field, (low, high) in (ranges or {}).items():
+            if low is not None or high is not None:
+                sets.append(self.range(field, low, high))
+        if text:
+            words = [word.lower() for word in text.split()]
+            for word in words[:-1]:
+                sets.append(self.tokens.get(word, set()))
+            sets.append(self.prefixed(words[-1]))
+
+        if not sets:
+            return set(self.params)
+        sets.sort(key=len)
+        result = set(sets[0])
+        for other in sets[1:]:
+            result &= other
+            if not result:
+                break
+        return result
+
+    def facets(self, part_ids: Iterable[str]) -> Dict[str, Dict[str, int]]:
+        """Counts of package, unit and tag values among the given parts."""
+        counts: Dict[str, Counter] = {"package": Counter(), "unit": Counter(), "tag": Counter()}
+        for part_id in part_ids:
+            for token in self.params[part_id]["tokens"]:
+                field, _, value = token.partition(":")
+                if value and field in counts:
+                    counts[field][value] += 1
+        return {field: dict(counter.most_common()) for field, counter in counts.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Parametric search over PartsBox parts",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # 0805 resistors from 1k to 2k that are on hand
+  %(prog)s query --unit ohm --min-value 1k --max-value 2k --package 0805 --on-hand
+
+  # Resistors rated 1/2 W or more, with package/unit/tag counts
+  %(prog)s query --tag resistor --min-power 0.5 --facets
+
+  # Capacitors rated at least 25 V; free-text search
+  %(prog)s query --unit F --min-voltage 25
+  %(prog)s query --text "hall effect"
+
+  # Refresh the parameter cache from the newest export
+  %(prog)s update
+        """
+    )
+    parser.add_argument("command", choices=["query", "update"])
+    parser.add_argument("--export", help=f"Path to export JSON (default: newest in {DEFAULT_EXPORT_DIR})")
+    parser.add_argument("--ledger", help="StockLedger snapshot to take stock balances from")
+    parser.add_argument("--cache", default=DEFAULT_CACHE, help=f"Parameter cache (default: {DEFAULT_CACHE})")
+    parser.add_argument("--rebuild", action="store_true", help="Ignore the cache and parse every part")
+    parser.add_argument("--text", help="Words that must appear in name, description, MPN or tags")
+    parser.add_argument("--unit", help="Value unit: ohm/Ω, F or H")
+    parser.add_argument("--min-value", help="Minimum value with SI prefix, e.g. 1k, 100n")
+    parser.add_argument("--max-value", help="Maximum value with SI prefix")
+    parser.add_argument("--package", help="Package/footprint, e.g. 0805, SOT-23")
+    parser.add_argument("--tag", action="append", default=[], help="Required part tag (repeatable)")
+    parser.add_argument("--max-tolerance", type=float, help="Maximum tolerance in percent")
+    parser.add_argument("--min-power", type=float, help="Minimum power rating in watts")
+    parser.add_argument("--min-voltage", type=float, help="Minimum voltage rating in volts")
+    parser.add_argument("--on-hand", action="store_true", help="Only parts with stock on hand")
+    parser.add_argument("--facets", action="store_true", help="Add package/unit/tag counts of the matches")
+    args = parser.parse_args()
+
+    try:
+        export = PartsBoxExport.load(str(args.export or find_latest_export(DEFAULT_EXPORT_DIR)), args.ledger)
+        min_value = parse_si_bound(args.min_value) if args.min_value else None
+        max_value = parse_si_bound(args.max_value) if args.max_value else None
+    except (OSError, ValueError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        sys.exit(1)
+    if (min_value is not None or max_value is not None) and not args.unit:
+        print("ERROR: --min-value/--max-value need --unit", file=sys.stderr)
+        sys.exit(1)
+
+    start = time.perf_counter()
+    index = PartSearchIndex.load(export.data.get("parts", []), args.cache, rebuild=args.rebuild)
+    print(f"Indexed {len(index.params)} parts in {(time.perf_counter() - start) * 1000:.1f} ms "
+          f"({index.stats['parsed']} parsed, {index.stats['reused']} cached, "
+          f"{index.stats['removed']} removed)", file=sys.stderr)
+    if args.command == "update":
+        print(json.dumps(index.stats))
+        return
+
+    start = time.perf_counter()
+    part_ids = index.search(args.text, args.unit, min_value, max_value, args.package, args.tag, {
+        "tolerance": (None, args.max_tolerance),
+        "power": (args.min_power, None),
+        "voltage": (args.min_voltage, None)
+    })
+    if args.on_hand:
+        part_ids = {part_id for part_id in part_ids if any(q > 0 for q in export.stock_by_part.get(part_id, {}).values())}
+    print(f"{len(part_ids)} matching parts ({(time.perf_counter() - start) * 1e6:.0f} µs)", file=sys.stderr)
+
+    results = []
+    for part_id in sorted(part_ids, key=lambda p: (index.params[p].get("value", 0), export.part(p)["part/name"])):
+        params = index.params[part_id]
+        results.append({
+            "id": part_id,
+            "name": export.part(part_id)["part/name"],
+            **{key: params[key] for key in ("value", "unit", "package", "tolerance", "power", "voltage") if key in params},
+            "stock": export.where_is(part_id)
+        })
+    output = {"parts": results, "facets": index.facets(part_ids)} if args.facets else results
+    print(json.dumps(output, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+Indexed, in-memory query engine over PartsBox export JSON.
+
+Loads a partsbox-export-*.json file once and builds lookup tables so common
+inventory questions ("where is part X", "what's in CmpntCab3") are answered
+from dict/bisect lookups instead of scanning the raw lists.
+
+Usage:
+    python partsbox_export.py where MFR-25FRF52-10K
+    python partsbox_export.py contents CmpntCab3
+    python partsbox_export.py tag THT
+    python partsbox_export.py part 0bxvt36kmjjcsbnx20zach342s
+    python partsbox_export.py storage SMD-Box-A
+"""
+
+import argparse
+import json
+import sys
+from bisect import bisect_left
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+DEFAULT_EXPORT_DIR = "/workspace/partsbox-backup"
+
+# Record id field for each list section of an export
+SECTION_ID_KEYS = {
+    "projects": "project/id",
+    "entries": "entry/id",
+    "parts": "part/id",
+    "storage": "storage/id"
+}
+
+
+def find_latest_export(directory: str) -> Path:
+    """Return the newest partsbox-export-*.json in directory (by dated filename)."""
+    exports = sorted(Path(directory).glob("partsbox-export-*.json"))
+    if not exports:
+        raise FileNotFoundError(f"No partsbox-export-*.json files in {directory}")
+    return exports[-1]
+
+
+class _JSONStream:
+    """Buffered reader that decodes one JSON value at a time from a file."""
+
+    _decoder = json.JSONDecoder()
+
+    def __init__(self, f, chunk_size: int):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        """Read another chunk, discarding consumed input. Returns False at EOF."""
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        self.eof = not chunk
+        return bool(chunk)
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character without consuming it."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON input")
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} at offset {self.pos}, found {self.buf[self.pos]!r}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Decode the next complete value, reading more input as needed."""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self.buf, self.pos)
+                # A number or literal ending exactly at the buffer edge may be truncated
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+
+
+# Yielded by stream_export(list_markers=True) before the elements of a list section
+LIST_START = object()
+
+
+def stream_export(path: str, chunk_size: int = 1 << 16,
+                  list_markers: bool = False) -> Iterator[Tuple[str, Any]]:
+    """
+    Incrementally parse an export without loading it into memory at once.
+
+    Yields (section, record) for each element of the list sections (parts,
+    storage, projects, entries) and (section, value) for other top-level keys
+    such as settings. With list_markers, (section, LIST_START) is yielded
+    when a list section begins, so empty lists remain visible.
+    """
+    with open(path, 'r') as f:
+        stream = _JSONStream(f, chunk_size)
+        stream.expect("{")
+        if stream.peek() == "}":
+            return
+        while True:
+            section = stream.value()
+            stream.expect(":")
+            if stream.peek() == "[":
+                stream.expect("[")
+                if list_markers:
+                    yield section, LIST_START
+                if stream.peek() != "]":
+                    while True:
+                        yield section, stream.value()
+                        if stream.peek() != ",":
+                            break
+                        stream.expect(",")
+                stream.expect("]")
+            else:
+                yield section, stream.value()
+
+            if stream.peek() != ",":
+                break
+            stream.expect(",")
+        stream.expect("}")
+
+
+def normalize_key(value: str) -> str:
+    """Normalize an MPN, name or tag for case-insensitive lookup."""
+    return value.strip().upper()
+
+
+class PartsBoxExport:
+    """
+    Indexed view of a PartsBox export.
+
+    Tables reference the original record dicts rather than copying them:
+    - parts_by_id, storage_by_id, storage_by_name: O(1) record lookup
+    - parts_by_key: part ids by normalized MPN and part name
+    - parts_by_tag: part ids by normalized tag
+    - storage_names: sorted names for O(log n) prefix queries
+    - stock_by_storage / stock_by_part: on-hand quantity per (part, storage)
+
+    Balances are folded from the stock history unless precomputed ones are
+    passed in (for example StockLedger.balances()).
+    """
+
+    def __init__(self, data: Dict, balances: Optional[Iterable[Tuple[str, str, float]]] = None):
+        self.data = data
+        self.parts_by_id: Dict[str, Dict] = {}
+        self.parts_by_key: Dict[str, List[str]] = defaultdict(list)
+        self.parts_by_tag: Dict[str, List[str]] = defaultdict(list)
+        self.storage_by_id: Dict[str, Dict] = {}
+        self.storage_by_name: Dict[str, Dict] = {}
+        self.stock_by_part: Dict[str, Dict[str, float]] = defaultdict(dict)
+        self.stock_by_storage: Dict[str, Dict[str, float]] = defaultdict(dict)
+
+        for storage in data.get("storage", []):
+            self.storage_by_id[storage["storage/id"]] = storage
+            self.storage_by_name[storage["storage/name"]] = storage
+        self.storage_names: List[str] = sorted(self.storage_by_name)
+
+        for part in data.get("parts", []):
+            part_id = part["part/id"]
+            self.parts_by_id[part_id] = part
+
+            keys = {normalize_key(part.get("part/name", ""))}
+            if part.get("part/mpn"):
+                keys.add(normalize_key(part["part/mpn"]))
+            for key in keys - {""}:
+                self.parts_by_key[key].append(part_id)
+
+            for tag in part.get("part/tags") or []:
+                self.parts_by_tag[normalize_key(tag)].append(part_id)
+
+        self._index_stock(balances if balances is not None else self.iter_on_hand())
+
+    @classmethod
+    def load(cls, path: str, ledger_path: Optional[str] = None) -> "PartsBoxExport":
+        """
+        Load and index an export file.
+
+        With ledger_path, stock balances come from the StockLedger snapshot,
+        which is brought up to date with this export and saved back.
+        """
+        with open(path, 'r') as f:
+            data = json.load(f)
+
+        if not ledger_path:
+            return cls(data)
+
+        from stock_ledger import StockLedger
+
+        ledger = StockLedger.load(ledger_path)
+        ledger.apply_export(data, source=Path(path).name)
+        ledger.save(ledger_path)
+        return cls(data, balances=ledger.balances())
+
+    def iter_on_hand(self) -> Iterator[Tuple[str, str, float]]:
+        """Yield (part_id, storage_id, quantity) by folding each part's stock history."""
+        for part in self.data.get("parts", []):
+            balances: Dict[str, float] = defaultdict(int)
+            for event in part.get("part/stock", []):
+                balances[event["stock/storage-id"]] += event.get("stock/quantity", 0)
+            for storage_id, quantity in balances.items():
+                yield part["part/id"], storage_id, quantity
+
+    def _index_stock(self, balances: Iterable[Tuple[str, str, float]]) -> None:
+        """Build stock_by_part / stock_by_storage from non-zero balances."""
+        self.stock_by_part.clear()
+        self.stock_by_storage.clear()
+        for part_id, storage_id, quantity in balances:
+            if quantity:
+                self.stock_by_part[part_id][storage_id] = quantity
+                self.stock_by_storage[storage_id][part_id] = quantity
+
+    def part(self, part_id: str) -> Optional[Dict]:
+        """Return the part record for an id, or None."""
+        return self.parts_by_id.get(part_id)
+
+    def find_parts(self, mpn_or_name: str) -> List[Dict]:
+        """Return parts whose MPN or name matches exactly (case-insensitive)."""
+        return [self.parts_by_id[pid] for pid in self.parts_by_key.get(normalize_key(mpn_or_name), [])]
+
+    def parts_with_tag(self, tag: str) -> List[Dict]:
+        """Return parts carrying a tag (case-insensitive)."""
+        return [self.parts_by_id[pid] for pid in self.parts_by_tag.get(normalize_key(tag), [])]
+
+    def storage(self, storage_id: str) -> Optional[Dict]:
+        """Return the storage record for an id, or None."""
+        return self.storage_by_id.get(storage_id)
+
+    def storage_with_prefix(self, prefix: str) -> List[Dict]:
+        """Return storage locations whose name starts with prefix, in name order."""
+        start = bisect_left(self.storage_names, prefix)
+        end = bisect_left(self.storage_names, prefix + "\U0010ffff", start)
+        return [self.storage_by_name[name] for name in self.storage_names[start:end]]
+
+    def where_is(self, part_id: str) -> Dict[str, float]:
+        """Return {storage name: on-hand quantity} for a part."""
+        return {
+            self._storage_name(storage_id): quantity
+            for storage_id, quantity in self.stock_by_part.get(part_id, {}).items()
+        }
+
+    def contents(self, storage_prefix: str) -> List[Dict]:
+        """Return on-hand parts in every location whose name starts with storage_prefix."""
+        results = []
+        for storage in self.storage_with_prefix(storage_prefix):
+            for part_id, quantity in self.stock_by_storage.get(storage["storage/id"], {}).items():
+                results.append({
+                    "storage": storage["storage/name"],
+                    "part_id": part_id,
+                    "part": self.parts_by_id.get(part_id, {}).get("part/name"),
+                    "quantity": quantity
+                })
+        return results
+
+    def _storage_name(self, storage_id: str) -> str:
+        storage = self.storage_by_id.get(storage_id)
+        return storage["storage/name"] if storage else storage_id
+
+
+def summarize_part(part: Dict, export: PartsBoxExport) -> Dict:
+    """Compact JSON view of a part with its on-hand locations."""
+    return {
+        "id": part["part/id"],
+        "name": part.get("part/name"),
+        "mpn": part.get("part/mpn"),
+        "description": part.get("part/description"),
+        "tags": part.get("part/tags", []),
+        "stock": export.where_is(part["part/id"])
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Query a PartsBox export",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Where is a part stored? (by MPN or part name)
+  %(prog)s where MFR-25FRF52-10K
+
+  # What's in a cabinet or drawer? (storage name prefix)
+  %(prog)s contents CmpntCab3
+
+  # Parts with a tag
+  %(prog)s tag THT
+
+  # Storage locations by name prefix
+  %(prog)s storage SMD-Box-A
+        """
+    )
+    parser.add_argument(
+        "--export",
+        help=f"Path to export JSON (default: newest in {DEFAULT_EXPORT_DIR})"
+    )
+    parser.add_argument(
+        "--ledger",
+        help="StockLedger snapshot to take stock balances from (updated incrementally)"
+    )
+    parser.add_argument("command", choices=["where", "contents", "tag", "part", "storage"])
+    parser.add_argument("value", help="MPN/name, storage prefix, tag or part id")
+    args = parser.parse_args()
+
+    try:
+        path = args.export or find_latest_export(DEFAULT_EXPORT_DIR)
+        export = PartsBoxExport.load(path, ledger_path=args.ledger)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"ERROR: Could not load export: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.command == "where":
+        result = [summarize_part(part, export) for part in export.find_parts(args.value)]
+    elif args.command == "contents":
+        result = export.contents(args.value)
+    elif args.command == "tag":
+        result = [summarize_part(part, export) for part in export.parts_with_tag(args.value)]
+    elif args.command == "part":
+        part = export.part(args.value)
+        result = summarize_part(part, export) if part else None
+    else:
+        result = [
+            {"id": s["storage/id"], "name": s["storage/name"], "tags": s.get("storage/tags", [])}
+            for s in export.storage_with_prefix(args.value)
+        ]
+
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
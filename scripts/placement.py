@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+Recommend storage slots for new parts: the nearest free slot to similar parts.
+
+Builds an occupancy index once from the export (or its StockLedger
+snapshot) and the storage types in storage_metadata.json:
+
+- every storage location is a slot with a container (longest storage type
+  prefix), a grid position parsed from its name (SMD-Box-C7 -> row C, col 7)
+  and the type's tags (esd_yes, type_smd-box, capacity_300pcs-1206, ...)
+- grid slots of types that do not exist yet ("exists": false, e.g.
+  SMD-ESD-Box1) are included as planned slots, created later with
+  update_storage_tags.py --mode create-new
+- a slot is free when nothing is on hand in it
+- parts are described by features: their tags, package (0805, SOT-23...)
+  and value unit (Ω, F, H); each feature maps to the slots holding parts with it
+
+A query keeps the containers that carry the required tags, takes the
+occupied slots whose parts share the most features with the new part as
+anchors, and returns the free slots closest to them on the container grid.
+Batch mode places a whole stock-in receipt, each placement becoming an
+anchor for the lines after it.
+
+Usage:
+    python placement.py suggest --part C2012X6S1C106K125AC
+    python placement.py suggest --tags resistor,SMD --package 0805 --esd -n 3
+    python placement.py receipt data/stock-in/mouser-2026-02-02-resistors-low-value.md --esd
+    python placement.py free
+"""
+
+import argparse
+import json
+import math
+import re
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+from kit_index import find_package, parse_si
+from partsbox_export import DEFAULT_EXPORT_DIR, PartsBoxExport, find_latest_export, normalize_key
+from reconcile_stock_in import parse_receipt
+from storage_types import PrefixIndex
+
+DEFAULT_CONFIG = Path(__file__).parent / "storage_metadata.json"
+ANCHORS = 8
+OTHER_CONTAINER_DISTANCE = 1000
+
+_SLOT_NAME = re.compile(r"^(?P<container>.+)-(?P<row>[A-Z]+)(?P<col>\d+)$")
+_CAPACITY = re.compile(r"^capacity_(\d+)pcs")
+
+
+def row_number(letters: str) -> int:
+    """A -> 0, B -> 1, ..., Z -> 25, AA -> 26."""
+    number = 0
+    for letter in letters:
+        number = number * 26 + ord(letter) - ord("A") + 1
+    return number - 1
+
+
+def part_features(tags: Iterable[str], *texts: str) -> Set[str]:
+    """Similarity features of a part: its tags, package and value unit."""
+    features = {f"tag:{normalize_key(tag)}" for tag in tags}
+    for text in texts:
+        package = find_package(text or "")
+        if package:
+            features.add(f"package:{package}")
+            break
+    for text in texts:
+        value = parse_si(text or "")
+        if value:
+            features.add(f"unit:{value[1]}")
+            break
+    return features
+
+
+def feature_weight(feature: str) -> int:
+    return 2 if feature.startswith(("package:", "unit:")) else 1
+
+
+class PlacementIndex:
+    """Slots, their occupancy and feature -> slot weights, built once per export."""
+
+    def __init__(self, export: PartsBoxExport, config: Dict, include_planned: bool = True):
+        self.export = export
+        self.types = config["storage_types"]
+        self.prefix_index = PrefixIndex(self.types)
+
+        self.slots: List[Dict] = []
+        self.by_name: Dict[str, int] = {}
+        self.by_container: Dict[str, List[int]] = defaultdict(list)
+        self.free: Set[int] = set()
+        self.feature_slots: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+
+        for storage in export.data.get("storage", []):
+            self._add_slot(storage["storage/name"], storage["storage/id"], storage.get("storage/tags") or [])
+        if include_planned:
+            for prefix, config_entry in self.types.items():
+                if config_entry.get("exists", True) or "grid" not in config_entry:
+                    continue
+                for row in config_entry["grid"]["rows"]:
+                    for col in config_entry["grid"]["cols"]:
+                        name = f"{prefix}-{row}{col}"
+                        if name not in self.by_name:
+                            self._add_slot(name, None, [])
+
+        for slots in self.by_container.values():
+            slots.sort(key=lambda s: (self.slots[s]["row"], self.slots[s]["col"], self.slots[s]["name"]))
+
+        for storage_id, parts in export.stock_by_storage.items():
+            slot = self.by_name.get(export._storage_name(storage_id))
+            if slot is None:
+                continue
+            for part_id, quantity in parts.items():
+                if quantity <= 0:
+                    continue
+                self.free.discard(slot)
+                part = export.part(part_id) or {}
+                for feature in part_features(part.get("part/tags") or [], part.get("part/name", ""),
+                                             part.get("part/description", "")):
+                    self.feature_slots[feature][slot] += 1
+
+    def _add_slot(self, name: str, storage_id: Optional[str], tags: List[str]) -> None:
+        storage_type = self.prefix_index.longest_match(name)
+        if not tags and storage_type:
+            tags = self.types[storage_type]["tags"]
+        match = _SLOT_NAME.match(name)
+        container = match.group("container") if match else name
+        capacity = next((int(m.group(1)) for m in map(_CAPACITY.match, tags) if m), None)
+
+        slot = len(self.slots)
+        self.slots.append({
+            "name": name,
+            "storage_id": storage_id,
+            "container": container,
+            "row": row_number(match.group("row")) if match else math.inf,
+            "col": int(match.group("col")) if match else math.inf,
+            "tags": frozenset(tags),
+            "capacity": capacity,
+            "planned": storage_id is None
+        })
+        self.by_name[name] = slot
+        self.by_container[container].append(slot)
+        self.free.add(slot)
+
+    def eligible_containers(self, required: Set[str]) -> List[str]:
+        return sorted(c for c, slots in self.by_container.items()
+                      if slots and required <= self.slots[slots[0]]["tags"])
+
+    def distance(self, a: int, b: int) -> float:
+        slot_a, slot_b = self.slots[a], self.slots[b]
+        if slot_a["container"] != slot_b["container"]:
+            return OTHER_CONTAINER_DISTANCE
+        if math.inf in (slot_a["row"], slot_b["row"]):
+            return OTHER_CONTAINER_DISTANCE - 1
+        return abs(slot_a["row"] - slot_b["row"]) + abs(slot_a["col"] - slot_b["col"])
+
+    def suggest(self, features: Set[str], required: Set[str] = frozenset(), count: int = 1,
+                quantity: Optional[int] = None) -> List[Dict]:
+        """The count best free slots for a part with these features."""
+        containers = set(self.eligible_containers(required))
+        if not containers:
+            return []
+
+        scores: Dict[int, int] = defaultdict(int)
+        for feature in features:
+            for slot, parts in self.feature_slots.get(feature, {}).items():
+                if self.slots[slot]["container"] in containers:
+                    scores[slot] += feature_weight(feature) * parts
+        anchors = sorted(scores, key=lambda s: (-scores[s], self.slots[s]["name"]))[:ANCHORS]
+
+        candidates = []
+        if anchors:
+            best_score = scores[anchors[0]]
+            for container in {self.slots[a]["container"] for a in anchors}:
+                container_anchors = [a for a in anchors if self.slots[a]["container"] == container]
+                for slot in self.by_container[container]:
+                    if slot in self.free:
+                        nearest = min(container_anchors, key=lambda a: (self.distance(slot, a), -scores[a]))
+                        penalty = best_score - scores[nearest]
+                        candidates.append((self.distance(slot, nearest) + penalty, self.slots[slot]["name"],
+                                           slot, self.slots[nearest]["name"]))
+
+        if len(candidates) < count:
+            # Fill from the remaining eligible containers, existing slots before planned ones
+            taken = {c[2] for c in candidates}
+            for container in sorted(containers, key=lambda c: (self.slots[self.by_container[c][0]]["planned"], c)):
+                for slot in self.by_container[container]:
+                    if slot in self.free and slot not in taken:
+                        candidates.append((OTHER_CONTAINER_DISTANCE, "", slot, None))
+                        if len(candidates) >= count * 4:
+                            break
+
+        candidates.sort(key=lambda c: (c[0], self.slots[c[2]]["planned"], c[1]))
+        results = []
+        for distance, _, slot, near in candidates[:count]:
+            info = self.slots[slot]
+            result = {
+                "storage": info["name"],
+                "storage_id": info["storage_id"],
+                "planned": info["planned"],
+                "near": near,
+                "distance": None if near is None else distance
+            }
+            if quantity and info["capacity"] and quantity > info["capacity"]:
+                result["warning"] = f"quantity {quantity} exceeds slot capacity {info['capacity']}"
+            results.append(result)
+        return results
+
+    def occupy(self, storage_name: str, features: Set[str]) -> None:
+        """Mark a slot used by a newly placed part (batch placement)."""
+        slot = self.by_name[storage_name]
+        self.free.discard(slot)
+        for feature in features:
+            self.feature_slots[feature][slot] += 1
+
+    def free_counts(self, required: Set[str] = frozenset()) -> Dict[str, Dict]:
+        counts = {}
+        for container in self.eligible_containers(required):
+            slots = self.by_container[container]
+            counts[container] = {
+                "slots": len(slots),
+                "free": sum(1 for s in slots if s in self.free),
+                "planned": self.slots[slots[0]]["planned"]
+            }
+        return counts
+
+
+def requirements(args: argparse.Namespace) -> Set[str]:
+    required = set(args.require or [])
+    if args.esd:
+        required.add("esd_yes")
+    if args.type:
+        required.add(f"type_{args.type}")
+    return required
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Recommend free storage slots near similar parts",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Best slot for a part already in PartsBox (by id, MPN or name)
+  %(prog)s suggest --part 0bxvt36kmjjcsbnx20zach342s
+
+  # Three ESD-safe slots for a new 0805 resistor
+  %(prog)s suggest --tags resistor,SMD --package 0805 --unit ohm --esd -n 3
+
+  # Place every line of a stock-in receipt
+  %(prog)s receipt data/stock-in/mouser-2026-02-02-resistors-low-value.md --type smd-box
+
+  # Free slots per container
+  %(prog)s free --esd
+        """
+    )
+    parser.add_argument("command", choices=["suggest", "receipt", "free"])
+    parser.add_argument("receipt", nargs="?", help="Stock-in receipt markdown for 'receipt'")
+    parser.add_argument("--export", help=f"Path to export JSON (default: newest in {DEFAULT_EXPORT_DIR})")
+    parser.add_argument("--ledger", help="StockLedger snapshot to take stock balances from")
+    parser.add_argument("--config", default=str(DEFAULT_CONFIG), help="Storage metadata config")
+    parser.add_argument("--existing-only", action="store_true",
+                        help="Ignore planned slots of storage types that do not exist yet")
+    parser.add_argument("--part", help="Existing part id, MPN or name to place")
+    parser.add_argument("--tags", help="Comma-separated part tags (e.g. resistor,SMD)")
+    parser.add_argument("--package", help="Part package (e.g. 0805)")
+    parser.add_argument("--unit", choices=["ohm", "F", "H"], help="Value unit of the part")
+    parser.add_argument("--quantity", type=int, help="Quantity to store (checked against slot capacity)")
+    parser.add_argument("--esd", action="store_true", help="Require an ESD-safe slot (esd_yes)")
+    parser.add_argument("--type", help="Require a storage type tag, e.g. smd-box, drawer-cabinet")
+    parser.add_argument("--require", action="append", help="Require any storage tag (repeatable)")
+    parser.add_argument("-n", "--count", type=int, default=1, help="Suggestions per part (default: 1)")
+    args = parser.parse_args()
+
+    try:
+        with open(args.config, 'r') as f:
+            config = json.load(f)
+        export = PartsBoxExport.load(str(args.export or find_latest_export(DEFAULT_EXPORT_DIR)), args.ledger)
+    except (OSError, ValueError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    start = time.perf_counter()
+    index = PlacementIndex(export, config, include_planned=not args.existing_only)
+    print(f"Indexed {len(index.slots)} slots ({len(index.free)} free) in "
+          f"{(time.perf_counter() - start) * 1000:.1f} ms", file=sys.stderr)
+    required = requirements(args)
+
+    if args.command == "free":
+        print(json.dumps(index.free_counts(required), indent=2))
+        return
+
+    if args.command == "suggest":
+        tags = [t for t in (args.tags or "").split(",") if t]
+        texts = [args.package or ""]
+        if args.part:
+            matches = [export.part(args.part)] if export.part(args.part) else export.find_parts(args.part)
+            if not matches:
+                print(f"ERROR: Part not found: {args.part}", file=sys.stderr)
+                sys.exit(1)
+            tags += matches[0].get("part/tags") or []
+            texts += [matches[0].get("part/name", ""), matches[0].get("part/description", "")]
+        features = part_features(tags, *texts)
+        if args.unit:
+            features.add(f"unit:{'Ω' if args.unit == 'ohm' else args.unit}")
+
+        start = time.perf_counter()
+        suggestions = index.suggest(features, required, args.count, args.quantity)
+        elapsed = time.perf_counter() - start
+        print(f"Query took {elapsed * 1e6:.0f} µs", file=sys.stderr)
+        print(json.dumps({"features": sorted(features), "required": sorted(required),
+                          "suggestions": suggestions}, indent=2, ensure_ascii=False))
+        return
+
+    if not args.receipt:
+        parser.error("receipt requires a stock-in receipt file")
+    try:
+        lines = parse_receipt(Path(args.receipt))
+    except OSError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    placements = []
+    start = time.perf_counter()
+    for line in lines:
+        part = export.part(line["part_id"]) if line["part_id"] else None
+        tags = (part or {}).get("part/tags") or []
+        features = part_features(tags, line["name"], line["mpn"] or "", (part or {}).get("part/description", ""))
+        suggestion = index.suggest(features, required, 1, line["quantity"])
+        placement = {"name": line["name"], "quantity": line["quantity"], "receipt_storage": line["storage"],
+                     "suggested": suggestion[0] if suggestion else None}
+        if suggestion:
+            index.occupy(suggestion[0]["storage"], features)
+        placements.append(placement)
+    elapsed = time.perf_counter() - start
+
+    print(f"Placed {sum(1 for p in placements if p['suggested'])}/{len(placements)} lines in "
+          f"{elapsed * 1000:.2f} ms", file=sys.stderr)
+    print(json.dumps(placements, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Reconcile stock-in receipts (data/stock-in/*.md) against a PartsBox export.
+
+Each receipt has an Inventory Summary table (part, storage location, qty,
+order #, price, Stored ☐/☑) and a detail section per part with its PartsBox
+ID and storage location ID. All receipt lines are checked in one pass
+against the indexed export. The stock events recorded for the part since
+the receipt date show whether the delivery was entered, where, and how
+much of it.
+
+Line status:
+- ok:              received quantity recorded at the receipt's location
+- mis_located:     recorded, but (partly) at a different location and not moved since
+- short:           only part of the quantity recorded
+- not_recorded:    marked Stored ☑ but nothing recorded in PartsBox
+- pending:         not stored yet (☐) and nothing recorded
+- missing_part:    part not found in the export (by id, MPN or name)
+- missing_storage: storage location not found in the export
+
+For short, not_recorded and pending lines the missing quantity is emitted as
+stock/add operations. Stock recorded at the wrong location is emitted as
+stock/move operations to the receipt's location (up to what is still on
+hand there). A line that is both mis-located and short gets both. Each kind
+is grouped into batches.
+
+Usage:
+    python reconcile_stock_in.py
+    python reconcile_stock_in.py data/stock-in/mouser-2026-02-02-resistors-low-value.md --ops-only
+"""
+
+import argparse
+import json
+import re
+import sys
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from kit_index import clean_cell, iter_tables, split_row
+from partsbox_export import DEFAULT_EXPORT_DIR, PartsBoxExport, find_latest_export
+
+DEFAULT_STOCK_IN_DIR = "/workspace/data/stock-in"
+DEFAULT_BATCH_SIZE = 20
+GRACE = timedelta(days=1)
+
+_RECEIVED = re.compile(r"\*\*Received:\*\*\s*(\d{4}-\d{2}-\d{2})")
+_PARTSBOX_ID = re.compile(r"\*\*PartsBox ID:\*\*\s*`([^`]+)`")
+_STORAGE = re.compile(r"\*\*Storage Location:\*\*\s*`([^`]+)`(?:\s*\(ID:\s*`([^`]+)`\))?")
+_MPN = re.compile(r"(?:\*\*MPN:\*\*|^-\s*MPN:)\s*`?([^`\n]+?)`?\s*$", re.MULTILINE)
+_PRODUCT_LINK = re.compile(r"\*\*(?:Mouser|DigiKey|Digikey) Link:\*\*\s*<[^>]*/ProductDetail/(?:[^/>]+/)?([^/>?]+)>")
+
+
+def parse_receipt(path: Path) -> List[Dict]:
+    """Lines of a receipt, each joined to its detail section."""
+    text = path.read_text(encoding='utf-8')
+    received = _RECEIVED.search(text)
+    received = received.group(1) if received else None
+
+    sections: Dict[str, str] = {}
+    for block in re.split(r"^### ", text, flags=re.MULTILINE)[1:]:
+        heading, _, body = block.partition("\n")
+        sections[heading.strip()] = re.split(r"^## ", body, flags=re.MULTILINE)[0]
+
+    lines = []
+    for table in iter_tables(text.splitlines()):
+        headers = [h.lower() for h in split_row(table[0])]
+        if "part name" not in headers or "storage location" not in headers:
+            continue
+        column = {name: headers.index(name) for name in headers if name}
+        for line_no, row in enumerate(table[2:], 1):
+            cells = [clean_cell(c) for c in split_row(row)]
+
+            def cell(name: str) -> str:
+                position = column.get(name)
+                return cells[position] if position is not None and position < len(cells) else ""
+
+            name = cell("part name")
+            section = sections.get(name, "")
+            part_id = _PARTSBOX_ID.search(section)
+            storage = _STORAGE.search(section)
+            mpn = _MPN.search(section) or _PRODUCT_LINK.search(section)
+            quantity = re.search(r"\d[\d,]*", cell("qty"))
+            price = re.search(r"\d[\d,]*(?:\.\d+)?", cell("price"))
+
+            lines.append({
+                "receipt": path.name,
+                "line": line_no,
+                "received": received,
+                "name": name,
+                "mpn": mpn.group(1).strip() if mpn else None,
+                "part_id": part_id.group(1) if part_id else None,
+                "storage": cell("storage location") or (storage.group(1) if storage else ""),
+                "storage_id": storage.group(2) if storage else None,
+                "quantity": int(quantity.group().replace(",", "")) if quantity else 0,
+                "order": cell("order #"),
+                "price": float(price.group().replace(",", "")) if price else None,
+                "stored": "☑" in cell("stored")
+            })
+    return lines
+
+
+class StockInReconciler:
+    """
+    Match receipt lines to parts, storage and recorded stock events.
+
+    Recorded quantities are non-move stock additions at or after the receipt
+    date (less a day of grace). Each event is consumed by at most one receipt
+    line, oldest receipts first, so a part bought twice is not double counted.
+    Stock booked at the wrong location and later moved to the receipt's
+    location in PartsBox is credited through the move's incoming (linked)
+    event, so it is not reported as mis-located.
+    """
+
+    def __init__(self, export: PartsBoxExport, batch_size: int = DEFAULT_BATCH_SIZE):
+        self.export = export
+        self.batch_size = batch_size
+        self._events: Dict[str, List[List]] = {}
+        self._moves_in: Dict[str, List[List]] = {}
+
+    def _resolve_part(self, line: Dict) -> Optional[Dict]:
+        if line["part_id"] and self.export.part(line["part_id"]):
+            return self.export.part(line["part_id"])
+        for key in (line["mpn"], line["name"]):
+            if key:
+                matches = self.export.find_parts(key)
+                if len(matches) == 1:
+                    return matches[0]
+        return None
+
+    def _additions(self, part: Dict, linked: bool = False) -> List[List]:
+        """
+        [timestamp, storage_id, unconsumed quantity] for a part's stock additions,
+        or with linked=True for the incoming side of its stock moves.
+        """
+        cache = self._moves_in if linked else self._events
+        part_id = part["part/id"]
+        if part_id not in cache:
+            cache[part_id] = [
+                [event["stock/timestamp"], event["stock/storage-id"], event["stock/quantity"]]
+                for event in part.get("part/stock", [])
+                if event.get("stock/quantity", 0) > 0 and bool(event.get("stock/linked?")) == linked
+            ]
+        return cache[part_id]
+
+    @staticmethod
+    def _consume(events: List[List], since_ms: int, quantity: int, storage_id: Optional[str]) -> Dict[str, int]:
+        """Take up to quantity from unconsumed events (optionally only at storage_id)."""
+        taken: Dict[str, int] = {}
+        for event in events:
+            if quantity <= 0:
+                break
+            timestamp, event_storage, available = event
+            if timestamp < since_ms or available <= 0 or (storage_id and event_storage != storage_id):
+                continue
+            amount = min(available, quantity)
+            event[2] -= amount
+            quantity -= amount
+            taken[event_storage] = taken.get(event_storage, 0) + amount
+        return taken
+
+    def reconcile(self, lines: List[Dict]) -> Dict:
+        results = []
+        operations = []
+        moves = []
+
+        for line in sorted(lines, key=lambda l: (l["received"] or "", l["receipt"], l["line"])):
+            result = dict(line, status=None, issues=[], recorded={})
+            results.append(result)
+
+            part = self._resolve_part(line)
+            storage = self.export.storage_by_name.get(line["storage"])
+            if part is None:
+                result["status"] = "missing_part"
+                continue
+            result["part_id"] = part["part/id"]
+            if storage is None:
+                result["status"] = "missing_storage"
+                continue
+            if line["storage_id"] and line["storage_id"] != storage["storage/id"]:
+                result["issues"].append(f"receipt storage ID {line['storage_id']} != export "
+                                        f"{storage['storage/id']} for {line['storage']}")
+            storage_id = storage["storage/id"]
+
+            since = datetime.fromisoformat(line["received"]).replace(tzinfo=timezone.utc) - GRACE \
+                if line["received"] else datetime.fromtimestamp(0, timezone.utc)
+            since_ms = int(since.timestamp() * 1000)
+            events = self._additions(part)
+            recorded = self._consume(events, since_ms, line["quantity"], storage_id)
+            at_location = recorded.get(storage_id, 0)
+            elsewhere = self._consume(events, since_ms, line["quantity"] - at_location, None)
+            if elsewhere:
+                # Booked elsewhere, then moved here in PartsBox: the stock is where it belongs
+                moved_in = sum(self._consume(self._additions(part, linked=True), since_ms,
+                                             sum(elsewhere.values()), storage_id).values())
+                if moved_in:
+                    result["issues"].append(f"{moved_in} moved here after being booked at "
+                                            + ", ".join(self.export._storage_name(sid) for sid in elsewhere))
+                    at_location += moved_in
+                    for sid in list(elsewhere):
+                        credited = min(elsewhere[sid], moved_in)
+                        moved_in -= credited
+                        elsewhere[sid] -= credited
+                        if not elsewhere[sid]:
+                            del elsewhere[sid]
+            result["recorded"] = {self.export._storage_name(sid): qty
+                                  for sid, qty in {storage_id: at_location, **elsewhere}.items()
+                                  if qty}
+            total = at_location + sum(elsewhere.values())
+
+            if elsewhere:
+                result["status"] = "mis_located"
+                on_hand = self.export.stock_by_part.get(part["part/id"], {})
+                for source_id, quantity in elsewhere.items():
+                    quantity = min(quantity, int(on_hand.get(source_id, 0)))
+                    if quantity > 0:
+                        moves.append({
+                            "stock/part-id": part["part/id"],
+                            "stock/storage-id": source_id,
+                            "stock/target-storage-id": storage_id,
+                            "stock/quantity": quantity,
+                            "stock/comments": f"Stock-in {line['received']} order #{line['order']} "
+                                              f"({line['receipt']}): move to receipt location"
+                        })
+            elif at_location >= line["quantity"]:
+                result["status"] = "ok"
+                if not line["stored"]:
+                    result["issues"].append("recorded in PartsBox but Stored box not ticked")
+            elif total:
+                result["status"] = "short"
+            else:
+                result["status"] = "not_recorded" if line["stored"] else "pending"
+
+            missing = line["quantity"] - total
+            if missing > 0:
+                if elsewhere:
+                    result["issues"].append(f"also short by {missing}")
+                result["missing_quantity"] = missing
+                operation = {
+                    "stock/part-id": part["part/id"],
+                    "stock/storage-id": storage_id,
+                    "stock/quantity": missing,
+                    "stock/comments": f"Stock-in {line['received']} order #{line['order']} ({line['receipt']})"
+                }
+                if line["price"] is not None and line["quantity"]:
+                    operation["stock/price"] = round(line["price"] / line["quantity"], 5)
+                    operation["stock/currency"] = "usd"
+                operations.append(operation)
+
+        return {
+            "lines": len(results),
+            "summary": dict(Counter(r["status"] for r in results)),
+            "results": results,
+            "operations": [self._group("stock/add", operations), self._group("stock/move", moves)]
+        }
+
+    def _group(self, endpoint: str, payloads: List[Dict]) -> Dict:
+        batches = [payloads[i:i + self.batch_size] for i in range(0, len(payloads), self.batch_size)]
+        return {"endpoint": endpoint, "count": len(payloads), "batches": batches}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Reconcile stock-in receipts against a PartsBox export",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # All receipts against the newest export
+  %(prog)s
+
+  # One receipt, only the stock/add and stock/move batches
+  %(prog)s data/stock-in/mouser-2026-02-02-resistors-low-value.md --ops-only
+
+  # Problem lines only
+  %(prog)s | jq '.results[] | select(.status != "ok")'
+        """
+    )
+    parser.add_argument("receipts", nargs="*", help=f"Receipt markdown files (default: all in {DEFAULT_STOCK_IN_DIR})")
+    parser.add_argument("--export", help=f"Path to export JSON (default: newest in {DEFAULT_EXPORT_DIR})")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"Operations per batch (default: {DEFAULT_BATCH_SIZE})")
+    parser.add_argument("--ops-only", action="store_true", help="Print only the stock/add and stock/move operations")
+    args = parser.parse_args()
+
+    paths = [Path(p) for p in args.receipts] or sorted(Path(DEFAULT_STOCK_IN_DIR).glob("*.md"))
+    try:
+        lines = [line for path in paths for line in parse_receipt(path)]
+        export = PartsBoxExport.load(str(args.export or find_latest_export(DEFAULT_EXPORT_DIR)))
+    except (OSError, ValueError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    report = StockInReconciler(export, args.batch_size).reconcile(lines)
+    print(f"{report['lines']} lines from {len(paths)} receipt(s): "
+          + ", ".join(f"{status} {count}" for status, count in sorted(report["summary"].items())), file=sys.stderr)
+    for group in report["operations"]:
+        print(f"{group['count']} {group['endpoint']} operations in {len(group['batches'])} batch(es)",
+              file=sys.stderr)
+
+    print(json.dumps(report["operations"] if args.ops_only else report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
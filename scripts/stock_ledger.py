@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Materialize PartsBox stock history into per-(part, storage) balances.
+
+Each part's `part/stock` list is an append-only log of signed quantity
+deltas. StockLedger folds it into on-hand balances and persists a snapshot
+with a high-water mark (the newest stock/timestamp folded) and, per part,
+how many events were folded and the last of them. The next export only
+needs its newer events applied instead of replaying every part's full
+history.
+
+Usage:
+    python stock_ledger.py update --export partsbox-backup/partsbox-export-....json
+    python stock_ledger.py show 0bxvt36kmjjcsbnx20zach342s
+    python stock_ledger.py update --rebuild
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+from partsbox_export import DEFAULT_EXPORT_DIR, find_latest_export
+
+DEFAULT_SNAPSHOT = "/workspace/temp/stock-ledger-snapshot.json"
+SNAPSHOT_VERSION = 3
+
+
+
+def _tail(event: Dict) -> List:
+    """[timestamp, storage id, quantity] of an event, as stored in the snapshot."""
+    return [event.get("stock/timestamp"), event["stock/storage-id"], event.get("stock/quantity", 0)]
+
+
+def format_timestamp(timestamp) -> str:
+    if timestamp is None:
+        return "no events"
+    return datetime.fromtimestamp(timestamp / 1000, timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
+
+
+class StockLedger:
+    """
+    Per-part stock balances with incremental updates.
+
+    For every part the snapshot keeps the balances by storage id, the number
+    of events folded and the last folded event as a (timestamp, storage id,
+    quantity) tail. A new export is applied part by part, without looking at
+    the folded events themselves:
+    - same count and tail: nothing to do
+    - more events, the tail still in place and no new event older than it:
+      fold only the new ones
+    - anything else (events removed, the tail edited, an event inserted
+      before it): refold that part from scratch
+    An edit to an event before the tail keeps count and tail, so it is not
+    detected; export_diff.py lists such parts under stock_histories_rewritten
+    and `update --rebuild` refolds them. Parts missing from the new export
+    are dropped.
+    """
+
+    def __init__(self):
+        self.parts: Dict[str, Dict] = {}
+        self.source = None
+        self.high_water = None
+        self.stats = {"unchanged": 0, "incremental": 0, "refolded": 0, "removed": 0, "events_applied": 0}
+
+    @classmethod
+    def load(cls, path: str) -> "StockLedger":
+        """Load a snapshot, or return an empty ledger if none exists or it is stale."""
+        ledger = cls()
+        if not os.path.exists(path):
+            return ledger
+
+        with open(path, 'r') as f:
+            snapshot = json.load(f)
+        if snapshot.get("version") != SNAPSHOT_VERSION:
+            print(f"WARNING: Ignoring snapshot {path} with unsupported version", file=sys.stderr)
+            return ledger
+
+        ledger.parts = snapshot["parts"]
+        ledger.source = snapshot.get("source")
+        ledger.high_water = snapshot.get("high_water")
+        return ledger
+
+    def save(self, path: str) -> None:
+        """Write the snapshot atomically."""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                "version": SNAPSHOT_VERSION,
+                "source": self.source,
+                "high_water": self.high_water,
+                "parts": self.parts
+            }, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    def apply_export(self, data: Dict, source: str = None) -> Dict:
+        """Bring balances up to date with an export. Returns per-part update stats."""
+        self.stats = {key: 0 for key in self.stats}
+        parts = self.parts
+        known = 0
+        unchanged = 0
+
+        for part in data.get("parts", []):
+            part_id = part["part/id"]
+            events = part.get("part/stock", ())
+            state = parts.get(part_id)
+            if state is not None:
+                known += 1
+                # Common case, inline: same count and the same last event
+                if len(events) == state["events"]:
+                    tail = state["tail"]
+                    if tail is None:
+                        unchanged += 1
+                        continue
+                    last = events[-1]
+                    if (last.get("stock/timestamp") == tail[0] and last["stock/storage-id"] == tail[1]
+                            and last.get("stock/quantity", 0) == tail[2]):
+                        unchanged += 1
+                        continue
+            self._apply_part(part_id, events)
+        self.stats["unchanged"] += unchanged
+
+        if known < len(parts):
+            seen = {part["part/id"] for part in data.get("parts", [])}
+            for part_id in set(parts) - seen:
+                del parts[part_id]
+                self.stats["removed"] += 1
+
+        self.source = source
+        return self.stats
+
+    def _apply_part(self, part_id: str, events: List[Dict]) -> None:
+        state = self.parts.get(part_id)
+        folded = state["events"] if state else 0
+
+        if state and len(events) >= folded and (not folded or _tail(events[folded - 1]) == state["tail"]):
+            new_events = events[folded:]
+            if not new_events:
+                self.stats["unchanged"] += 1
+                return
+            last_timestamp = state["tail"][0] if state["tail"] else None
+            if last_timestamp is None or all(event.get("stock/timestamp", 0) >= last_timestamp
+                                             for event in new_events):
+                self.stats["incremental"] += 1
+            else:
+                state = None
+        else:
+            state = None
+
+        if state is None:
+            state = {"balances": {}, "events": 0, "tail": None}
+            self.parts[part_id] = state
+            new_events = events
+            self.stats["refolded"] += 1
+
+        balances = state["balances"]
+        for event in new_events:
+            storage_id = event["stock/storage-id"]
+            quantity = balances.get(storage_id, 0) + event.get("stock/quantity", 0)
+            if quantity:
+                balances[storage_id] = quantity
+            else:
+                balances.pop(storage_id, None)
+            timestamp = event.get("stock/timestamp")
+            if timestamp is not None and (self.high_water is None or timestamp > self.high_water):
+                self.high_water = timestamp
+
+        state["events"] = len(events)
+        state["tail"] = _tail(events[-1]) if events else None
+        self.stats["events_applied"] += len(new_events)
+
+    def balances(self) -> Iterator[Tuple[str, str, int]]:
+        """Yield (part_id, storage_id, quantity) for every non-zero balance."""
+        for part_id, state in self.parts.items():
+            for storage_id, quantity in state["balances"].items():
+                yield part_id, storage_id, quantity
+
+    def on_hand(self, part_id: str) -> Dict[str, int]:
+        """Return {storage_id: quantity} for a part."""
+        state = self.parts.get(part_id)
+        return dict(state["balances"]) if state else {}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Materialize PartsBox stock balances with incremental snapshots",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Apply the newest export to the snapshot (creates it on first run)
+  %(prog)s update
+
+  # Rebuild the snapshot from scratch
+  %(prog)s update --rebuild
+
+  # Show balances for a part
+  %(prog)s show 0bxvt36kmjjcsbnx20zach342s
+        """
+    )
+    parser.add_argument("command", choices=["update", "show"])
+    parser.add_argument("part_id", nargs="?", help="Part id for 'show'")
+    parser.add_argument(
+        "--export",
+        help=f"Path to export JSON (default: newest in {DEFAULT_EXPORT_DIR})"
+    )
+    parser.add_argument(
+        "--snapshot",
+        default=DEFAULT_SNAPSHOT,
+        help=f"Snapshot file (default: {DEFAULT_SNAPSHOT})"
+    )
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Ignore the existing snapshot and fold every event again"
+    )
+    args = parser.parse_args()
+
+    if args.command == "show":
+        if not args.part_id:
+            parser.error("show requires a part id")
+        ledger = StockLedger.load(args.snapshot)
+        print(json.dumps(ledger.on_hand(args.part_id), indent=2))
+        return
+
+    ledger = StockLedger() if args.rebuild else StockLedger.load(args.snapshot)
+
+    try:
+        path = str(args.export or find_latest_export(DEFAULT_EXPORT_DIR))
+        with open(path, 'r') as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"ERROR: Could not load export: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    previous = f"{ledger.source}, events up to {format_timestamp(ledger.high_water)}" if ledger.source else "nothing"
+    stats = ledger.apply_export(data, source=os.path.basename(path))
+    ledger.save(args.snapshot)
+
+    print(f"Applied {path} (snapshot was at {previous})", file=sys.stderr)
+    print(f"High-water mark: {format_timestamp(ledger.high_water)}", file=sys.stderr)
+    print(f"Parts unchanged: {stats['unchanged']}, incremental: {stats['incremental']}, "
+          f"refolded: {stats['refolded']}, removed: {stats['removed']}", file=sys.stderr)
+    print(f"Events applied: {stats['events_applied']}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Storage type lookup shared by the storage tools.
+
+Storage types in storage_metadata.json are keyed by name prefix
+("SMD-Box", "SMD-Box2", "SMD-ESD-Box1"). A location belongs to the type
+with the longest prefix of its name, so "SMD-Box2-A1" is SMD-Box2 and not
+SMD-Box. update_storage_tags.py (tagging) and placement.py (slot
+suggestions) both match through PrefixIndex, so they always agree.
+
+Usage:
+    from storage_types import PrefixIndex
+
+    index = PrefixIndex(metadata["storage_types"])
+    index.longest_match("SMD-Box2-A1")   # "SMD-Box2"
+"""
+
+from typing import Dict, Iterable, Optional
+
+
+class PrefixIndex:
+    """
+    Longest-prefix-match index over storage type prefixes.
+
+    Prefixes are stored in a character trie, so a lookup walks the name once
+    (O(len(name))) and always returns the longest configured prefix,
+    independent of the order the prefixes were defined in.
+    """
+
+    _END = object()
+
+    def __init__(self, prefixes: Iterable[str]):
+        self._root: Dict = {}
+        for prefix in prefixes:
+            node = self._root
+            for char in prefix:
+                node = node.setdefault(char, {})
+            node[self._END] = prefix
+
+    def longest_match(self, name: str) -> Optional[str]:
+        """Return the longest prefix of name in the index, or None."""
+        end = self._END
+        node = self._root
+        match = node.get(end)
+        for char in name:
+            node = node.get(char)
+            if node is None:
+                break
+            if end in node:
+                match = node[end]
+        return match
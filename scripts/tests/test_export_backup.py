@@ -0,0 +1,104 @@
+"""
+Round-trip and compression tests for export_backup.py.
+
+Run from the repository root:
+    python -m pytest scripts/tests
+"""
+
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from export_backup import BackupStore, compress, decompress, scan_export
+
+REPO_ROOT = Path(__file__).resolve().parent.parent.parent
+EXPORTS = sorted(REPO_ROOT.glob("partsbox-backup/partsbox-export-*.json")) + \
+    sorted(REPO_ROOT.glob("data/parts-box-backup/partsbox-export-*.json"))
+
+
+class BackupStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        self.store = BackupStore(str(self.dir / "store.sqlite"))
+
+    def tearDown(self):
+        self.store.db.close()
+        self.tmp.cleanup()
+
+    def test_exports_round_trip_byte_for_byte(self):
+        self.assertEqual(len(EXPORTS), 2)
+        for i, export in enumerate(EXPORTS):
+            stats = self.store.backup(str(export), f"snapshot-{i}")
+            self.assertEqual(stats["format"], "records")
+
+            restored = self.dir / f"restored-{i}.json"
+            self.assertTrue(self.store.restore(f"snapshot-{i}", str(restored)))
+            self.assertEqual(restored.read_bytes(), export.read_bytes())
+            self.assertTrue(self.store.verify(f"snapshot-{i}"))
+
+    def test_second_snapshot_reuses_objects(self):
+        first = self.store.backup(str(EXPORTS[0]), "first")
+        self.assertEqual(first["new_objects"], first["records"])
+
+        again = self.store.backup(str(EXPORTS[1]), "again")
+        self.assertEqual(again["new_objects"], 0)
+        self.assertEqual(again["reused_objects"], again["records"])
+
+        # One edited part record costs exactly one new object
+        data = EXPORTS[0].read_bytes()
+        name = json.loads(data)["parts"][0]["part/name"].replace("/", "\\/").encode("ascii")
+        edited = self.dir / "edited.json"
+        edited.write_bytes(data.replace(b'"part\\/name":"' + name + b'"',
+                                        b'"part\\/name":"' + name + b'-EDITED"', 1))
+        stats = self.store.backup(str(edited), "edited")
+        self.assertEqual(stats["new_objects"], 1)
+        self.assertEqual(stats["reused_objects"], stats["records"] - 1)
+        self.assertTrue(self.store.verify("edited"))
+
+    def test_compression_stats(self):
+        for i, export in enumerate(EXPORTS):
+            self.store.backup(str(export), f"snapshot-{i}")
+        stats = self.store.stats()
+
+        self.assertEqual(stats["snapshots"], len(EXPORTS))
+        self.assertEqual(stats["logical_bytes"], sum(export.stat().st_size for export in EXPORTS))
+        self.assertLess(stats["stored_bytes"], stats["object_bytes_uncompressed"])
+        # Two identical exports are stored once, compressed
+        self.assertGreater(stats["ratio"], 2 * EXPORTS[0].stat().st_size / stats["object_bytes_uncompressed"])
+
+    def test_preset_dictionary_helps_small_records(self):
+        import zlib
+
+        record = json.loads(EXPORTS[0].read_bytes())["storage"][0]
+        data = json.dumps(record, separators=(",", ":")).replace("/", "\\/").encode("ascii")
+        self.assertEqual(decompress(compress(data)), data)
+        self.assertLess(len(compress(data)), len(zlib.compress(data, 9)))
+
+    def test_reformatted_export_is_stored_raw(self):
+        reindented = self.dir / "reindented.json"
+        reindented.write_text(json.dumps(json.loads(EXPORTS[0].read_bytes()), indent=2))
+
+        stats = self.store.backup(str(reindented), "reindented")
+        self.assertEqual(stats["format"], "raw")
+        self.assertEqual(self.store.stats()["objects"], 1)
+
+        restored = self.dir / "restored.json"
+        self.assertTrue(self.store.restore("reindented", str(restored)))
+        self.assertEqual(restored.read_bytes(), reindented.read_bytes())
+
+    def test_escaped_slash_detected_anywhere(self):
+        path = self.dir / "late-slash.json"
+        # The only escaped slash straddles the 64 KiB read boundary
+        path.write_bytes(b'{"a":"' + b"x" * ((1 << 16) - 7) + b'\\/"}')
+        self.assertTrue(scan_export(str(path))[1])
+        path.write_bytes(b'{"a":"x/y"}')
+        self.assertFalse(scan_export(str(path))[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+"""
+Stock event tests for export_diff.py.
+
+Run from the repository root:
+    python -m pytest scripts/tests
+"""
+
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from export_diff import ExportDiff
+
+
+def event(timestamp, quantity, storage="s1"):
+    return {"stock/timestamp": timestamp, "stock/storage-id": storage, "stock/quantity": quantity}
+
+
+def part(part_id, events):
+    return {"part/id": part_id, "part/name": part_id.upper(), "part/stock": events}
+
+
+class ExportDiffStockTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def diff(self, old_parts, new_parts):
+        paths = []
+        for name, parts in (("old", old_parts), ("new", new_parts)):
+            path = self.dir / f"{name}.json"
+            path.write_text(json.dumps({"parts": parts, "storage": [{"storage/id": "s1", "storage/name": "bin_1"}]}))
+            paths.append(str(path))
+        return ExportDiff(*paths, include_records=False).run()
+
+    def test_added_part_events_are_reported(self):
+        report = self.diff(
+            [part("p1", [event(1, 10)])],
+            [part("p1", [event(1, 10), event(2, -3)]), part("p2", [event(3, 5), event(4, 2)])]
+        )
+        by_part = {item["part_id"]: item for item in report["stock_events"]}
+
+        self.assertFalse(by_part["p1"]["added_part"])
+        self.assertEqual(by_part["p1"]["events"], [event(2, -3)])
+        self.assertTrue(by_part["p2"]["added_part"])
+        self.assertEqual(by_part["p2"]["events"], [event(3, 5), event(4, 2)])
+        self.assertEqual(report["parts"]["added"], ["p2"])
+        self.assertEqual(report["summary"]["new_stock_events"], 3)
+        self.assertEqual(report["summary"]["new_stock_events_of_added_parts"], 2)
+
+    def test_added_part_without_stock_has_no_entry(self):
+        report = self.diff([], [part("p1", [])])
+        self.assertEqual(report["stock_events"], [])
+        self.assertEqual(report["parts"]["added"], ["p1"])
+
+    def test_rewritten_history(self):
+        report = self.diff([part("p1", [event(1, 10)])], [part("p1", [event(1, 12), event(2, 1)])])
+        self.assertEqual(report["stock_events"], [])
+        self.assertEqual(report["stock_histories_rewritten"], ["p1"])
+
+
+if __name__ == "__main__":
+    unittest.main()
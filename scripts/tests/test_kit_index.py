@@ -0,0 +1,55 @@
+"""
+Table parsing tests for kit_index.py.
+
+Run from the repository root:
+    python -m pytest scripts/tests
+"""
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from kit_index import note_moq, parse_kit
+
+NOTES_TABLE = """# Capacitors
+
+| # | LCSC ID | MPN | Description | Qty | Supplier | Unit Price | Notes |
+|---|---------|-----|-------------|-----|----------|------------|-------|
+| 1 | C107107 | CC0805JRNPO9BN100 | 10pF ±5% 50V C0G | 100 | LCSC | $0.0056 | MOQ:100, price verified |
+| 2 | C1 | CC0805JRNPO9BN120 | 12pF ±5% 50V C0G | 25 | LCSC | $0.0061 | **SUB**: YAGEO, MOQ:1,000 |
+| 3 | C2 | CC0805JRNPO9BN150 | 15pF ±5% 50V C0G | 25 | LCSC | $0.006 | DK MOQ 5000 > Qty 100 |
+"""
+
+MOQ_COLUMN_TABLE = """| # | MPN | MOQ | Qty | Unit Price | Notes |
+|---|-----|-----|-----|------------|-------|
+| 1 | RC0805FR-0710KL | 10 | 100 | $0.01 | MOQ:500 |
+"""
+
+
+class ParseKitTest(unittest.TestCase):
+    def parse(self, text):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "Test_Kit.md"
+            path.write_text(text, encoding="utf-8")
+            return parse_kit(path)["rows"]
+
+    def test_moq_from_notes_without_moq_column(self):
+        rows = self.parse(NOTES_TABLE)
+        self.assertEqual(rows["moq"][:2], [100.0, 1000.0])
+        # Another supplier's MOQ in free text is not this row's
+        self.assertIsNone(rows["moq"][2])
+
+    def test_moq_column_wins_over_notes(self):
+        self.assertEqual(self.parse(MOQ_COLUMN_TABLE)["moq"], [10.0])
+
+    def test_note_moq(self):
+        self.assertEqual(note_moq("MOQ: 20"), 20.0)
+        self.assertIsNone(note_moq(""))
+        self.assertEqual(note_moq("price verified; MOQ:5"), 5.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+"""
+Supplier assignment tests for kit_optimizer.py.
+
+Run from the repository root:
+    python -m pytest scripts/tests
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from kit_index import NUMERIC_COLUMNS, TEXT_COLUMNS, KitIndex
+from kit_optimizer import KitOptimizer
+
+SHIPPING = {"LCSC": (8.0, None), "DigiKey": (6.99, 50.0)}
+
+
+def index_of(rows):
+    """rows: (mpn, supplier, unit price, quantity or None for an alternative offer[, MOQ])."""
+    columns = {name: [] for name in TEXT_COLUMNS + NUMERIC_COLUMNS}
+    for n, (mpn, supplier, price, quantity, *moq) in enumerate(rows):
+        for name in TEXT_COLUMNS:
+            columns[name].append("")
+        for name in NUMERIC_COLUMNS:
+            columns[name].append(None)
+        columns["kit"][-1] = "Test_Kit"
+        columns["row"][-1] = str(n)
+        columns["mpn"][-1] = mpn
+        columns["supplier"][-1] = supplier
+        columns["unit_price"][-1] = price
+        columns["quantity"][-1] = quantity
+        columns["stock"][-1] = 1000
+        columns["moq"][-1] = moq[0] if moq else 1
+        columns["price_tier"][-1] = 1
+    return KitIndex(columns)
+
+
+class KitOptimizerTest(unittest.TestCase):
+    def test_shipping_counts_toward_choice(self):
+        # LCSC is cheaper per unit, but its flat fee makes DigiKey cheaper overall
+        index = index_of([("A", "DigiKey", 40.0, 1), ("A", "LCSC", 39.5, None)])
+        report = KitOptimizer(index, ["Test_Kit"], shipping=SHIPPING).optimize()
+        self.assertEqual([a["supplier"] for a in report["assignments"]], ["DigiKey"])
+        self.assertEqual(report["total"], 46.99)
+
+    def test_line_moved_to_reach_free_shipping(self):
+        # Cheapest per line: A at DigiKey, B and C at LCSC = 55 + 6.99 + 8 shipping.
+        # Moving B to DigiKey (+2) lifts it to the $50 threshold: 57 + 8 shipping.
+        index = index_of([("A", "DigiKey", 40.0, 1), ("A", "LCSC", 45.0, None),
+                          ("B", "DigiKey", 12.0, 1), ("B", "LCSC", 10.0, None),
+                          ("C", "LCSC", 5.0, 1)])
+        report = KitOptimizer(index, ["Test_Kit"], shipping=SHIPPING).optimize()
+
+        self.assertEqual({a["mpn"]: a["supplier"] for a in report["assignments"]},
+                         {"A": "DigiKey", "B": "DigiKey", "C": "LCSC"})
+        self.assertEqual(report["suppliers"]["DigiKey"]["shipping"], 0.0)
+        self.assertEqual(report["total"], 65.0)
+
+
+    def test_unknown_moq_is_flagged(self):
+        index = index_of([("A", "LCSC", 0.01, 100, None), ("B", "LCSC", 0.02, 100)])
+        report = KitOptimizer(index, ["Test_Kit"], shipping=SHIPPING).optimize()
+        self.assertEqual({a["mpn"]: a["unverified"] for a in report["assignments"]}, {"A": ["MOQ"], "B": []})
+        self.assertEqual(report["unverified_count"], 1)
+
+    def test_strict_rejects_unknown_moq(self):
+        index = index_of([("A", "LCSC", 0.01, 100, None), ("A", "DigiKey", 0.05, None)])
+        report = KitOptimizer(index, ["Test_Kit"], shipping=SHIPPING, strict=True).optimize()
+        self.assertEqual([(a["mpn"], a["supplier"]) for a in report["assignments"]], [("A", "DigiKey")])
+
+        index = index_of([("A", "LCSC", 0.01, 100, None)])
+        report = KitOptimizer(index, ["Test_Kit"], shipping=SHIPPING, strict=True).optimize()
+        self.assertEqual(report["unfillable"][0]["reasons"], ["LCSC: MOQ unknown"])
+
+
+if __name__ == "__main__":
+    unittest.main()
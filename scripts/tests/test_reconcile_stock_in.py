@@ -0,0 +1,108 @@
+"""
+Operation tests for reconcile_stock_in.py.
+
+Run from the repository root:
+    python -m pytest scripts/tests
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from partsbox_export import PartsBoxExport
+from reconcile_stock_in import StockInReconciler
+
+RECEIVED_MS = 1767225600000  # 2026-01-01T00:00:00Z
+
+
+def export_with(events):
+    return PartsBoxExport({
+        "parts": [{"part/id": "p1", "part/name": "R 10k", "part/stock": events}],
+        "storage": [{"storage/id": "s-bin", "storage/name": "bin_1"},
+                    {"storage/id": "s-shelf", "storage/name": "shelf_1"}],
+    })
+
+
+def line(quantity, storage="bin_1"):
+    return {"receipt": "receipt-1", "line": 1, "received": "2026-01-01", "name": "R 10k", "mpn": "",
+            "part_id": "p1", "storage": storage, "storage_id": "", "quantity": quantity,
+            "order": "42", "price": 1.0, "stored": True}
+
+
+def operations(report):
+    return {group["endpoint"]: [op for batch in group["batches"] for op in batch]
+            for group in report["operations"]}
+
+
+class ReconcileOperationsTest(unittest.TestCase):
+    def test_mis_located_and_short_emits_move_and_add(self):
+        export = export_with([{"stock/timestamp": RECEIVED_MS, "stock/storage-id": "s-shelf",
+                               "stock/quantity": 60}])
+        report = StockInReconciler(export).reconcile([line(100)])
+
+        result = report["results"][0]
+        self.assertEqual(result["status"], "mis_located")
+        self.assertEqual(result["missing_quantity"], 40)
+
+        ops = operations(report)
+        self.assertEqual(len(ops["stock/move"]), 1)
+        move = ops["stock/move"][0]
+        self.assertEqual((move["stock/storage-id"], move["stock/target-storage-id"], move["stock/quantity"]),
+                         ("s-shelf", "s-bin", 60))
+        self.assertEqual(len(ops["stock/add"]), 1)
+        add = ops["stock/add"][0]
+        self.assertEqual((add["stock/storage-id"], add["stock/quantity"]), ("s-bin", 40))
+        self.assertEqual(add["stock/price"], 0.01)
+
+    def test_fully_mis_located_emits_only_move(self):
+        export = export_with([{"stock/timestamp": RECEIVED_MS, "stock/storage-id": "s-shelf",
+                               "stock/quantity": 100}])
+        ops = operations(StockInReconciler(export).reconcile([line(100)]))
+        self.assertEqual(len(ops["stock/move"]), 1)
+        self.assertEqual(ops["stock/add"], [])
+
+    def test_moved_to_receipt_location_after_stock_in_is_ok(self):
+        export = export_with([
+            {"stock/timestamp": RECEIVED_MS, "stock/storage-id": "s-shelf", "stock/quantity": 100},
+            {"stock/timestamp": RECEIVED_MS + 1, "stock/storage-id": "s-shelf", "stock/quantity": -100,
+             "stock/linked?": True},
+            {"stock/timestamp": RECEIVED_MS + 2, "stock/storage-id": "s-bin", "stock/quantity": 100,
+             "stock/linked?": True},
+        ])
+        report = StockInReconciler(export).reconcile([line(100)])
+
+        result = report["results"][0]
+        self.assertEqual(result["status"], "ok")
+        self.assertEqual(result["recorded"], {"bin_1": 100})
+        self.assertEqual(operations(report), {"stock/add": [], "stock/move": []})
+
+    def test_partly_moved_reports_remaining_move(self):
+        export = export_with([
+            {"stock/timestamp": RECEIVED_MS, "stock/storage-id": "s-shelf", "stock/quantity": 100},
+            {"stock/timestamp": RECEIVED_MS + 1, "stock/storage-id": "s-shelf", "stock/quantity": -60,
+             "stock/linked?": True},
+            {"stock/timestamp": RECEIVED_MS + 2, "stock/storage-id": "s-bin", "stock/quantity": 60,
+             "stock/linked?": True},
+        ])
+        report = StockInReconciler(export).reconcile([line(100)])
+
+        self.assertEqual(report["results"][0]["status"], "mis_located")
+        ops = operations(report)
+        self.assertEqual([(op["stock/storage-id"], op["stock/quantity"]) for op in ops["stock/move"]],
+                         [("s-shelf", 40)])
+        self.assertEqual(ops["stock/add"], [])
+
+    def test_short_at_location_emits_only_add(self):
+        export = export_with([{"stock/timestamp": RECEIVED_MS, "stock/storage-id": "s-bin",
+                               "stock/quantity": 30}])
+        report = StockInReconciler(export).reconcile([line(100)])
+        self.assertEqual(report["results"][0]["status"], "short")
+        ops = operations(report)
+        self.assertEqual([op["stock/quantity"] for op in ops["stock/add"]], [70])
+        self.assertEqual(ops["stock/move"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
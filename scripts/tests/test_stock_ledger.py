@@ -0,0 +1,70 @@
+"""
+Incremental update tests for stock_ledger.py.
+
+Run from the repository root:
+    python -m pytest scripts/tests
+"""
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from stock_ledger import StockLedger
+
+
+def event(timestamp, quantity, storage="s1"):
+    return {"stock/timestamp": timestamp, "stock/storage-id": storage, "stock/quantity": quantity}
+
+
+def export(**histories):
+    return {"parts": [{"part/id": part_id, "part/stock": events} for part_id, events in histories.items()]}
+
+
+class StockLedgerTest(unittest.TestCase):
+    def setUp(self):
+        self.ledger = StockLedger()
+        self.ledger.apply_export(export(p1=[event(1, 10), event(2, -3)], p2=[event(3, 5, "s2")], p3=[]))
+
+    def test_unchanged_export_folds_nothing(self):
+        stats = self.ledger.apply_export(export(p1=[event(1, 10), event(2, -3)], p2=[event(3, 5, "s2")], p3=[]))
+        self.assertEqual((stats["unchanged"], stats["events_applied"]), (3, 0))
+        self.assertEqual(self.ledger.on_hand("p1"), {"s1": 7})
+        self.assertEqual(self.ledger.high_water, 3)
+
+    def test_appended_events_fold_incrementally(self):
+        stats = self.ledger.apply_export(export(p1=[event(1, 10), event(2, -3), event(4, -7), event(5, 2, "s2")],
+                                                p2=[event(3, 5, "s2")], p3=[event(6, 1)]))
+        self.assertEqual((stats["incremental"], stats["refolded"], stats["events_applied"]), (2, 0, 3))
+        self.assertEqual(self.ledger.on_hand("p1"), {"s2": 2})
+        self.assertEqual(self.ledger.on_hand("p3"), {"s1": 1})
+        self.assertEqual(self.ledger.high_water, 6)
+
+    def test_edited_tail_and_inserted_events_refold(self):
+        stats = self.ledger.apply_export(export(p1=[event(1, 10), event(2, -4)],
+                                                p2=[event(3, 5, "s2"), event(0, 1, "s2")], p3=[]))
+        self.assertEqual(stats["refolded"], 2)
+        self.assertEqual(self.ledger.on_hand("p1"), {"s1": 6})
+        self.assertEqual(self.ledger.on_hand("p2"), {"s2": 6})
+
+    def test_removed_part_is_dropped(self):
+        stats = self.ledger.apply_export(export(p1=[event(1, 10), event(2, -3)]))
+        self.assertEqual(stats["removed"], 2)
+        self.assertEqual(sorted(self.ledger.parts), ["p1"])
+
+    def test_snapshot_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = str(Path(tmp) / "snapshot.json")
+            self.ledger.save(path)
+            loaded = StockLedger.load(path)
+        self.assertEqual(loaded.high_water, 3)
+        stats = loaded.apply_export(export(p1=[event(1, 10), event(2, -3), event(7, 1)],
+                                           p2=[event(3, 5, "s2")], p3=[]))
+        self.assertEqual((stats["unchanged"], stats["incremental"]), (2, 1))
+        self.assertEqual(sorted(loaded.balances()), [("p1", "s1", 8), ("p2", "s2", 5)])
+
+
+if __name__ == "__main__":
+    unittest.main()
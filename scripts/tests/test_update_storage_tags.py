@@ -0,0 +1,220 @@
+"""
+Batch runner tests for update_storage_tags.py against the in-process stub api_client.
+
+Run from the repository root:
+    python -m pytest scripts/tests
+"""
+
+import contextlib
+import io
+import json
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+SCRIPTS = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SCRIPTS))
+sys.path.insert(0, str(SCRIPTS / "benchmarks"))
+
+from stub_api_client import StubAPIClient
+
+StubAPIClient([]).install()
+
+from update_storage_tags import (CheckpointJournal, CircuitBreaker, RetryPolicy, StorageMetadataUpdater,
+                                 TokenBucket)
+
+CONFIG = str(SCRIPTS / "storage_metadata.json")
+EXPORT = sorted((SCRIPTS.parent / "partsbox-backup").glob("partsbox-export-*.json"))[0]
+LOCATIONS = json.loads(EXPORT.read_bytes())["storage"]
+
+
+def quietly(fn, *args, **kwargs):
+    with contextlib.redirect_stderr(io.StringIO()):
+        return fn(*args, **kwargs)
+
+
+class CheckpointJournalTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "journal.jsonl"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_new_run_keeps_previous_journal(self):
+        journal = CheckpointJournal(str(self.path))
+        journal.record("storage/update", {"id": "s1", "name": "SMD-Box-A1"})
+        journal._file.close()
+
+        CheckpointJournal(str(self.path))._file.close()
+        self.assertEqual(self.path.read_text(), "")
+        self.assertIn('"key": "s1"', Path(f"{self.path}.prev").read_text())
+
+    def test_unfinished_until_marked_complete(self):
+        self.assertFalse(CheckpointJournal.is_unfinished(str(self.path)))
+        journal = CheckpointJournal(str(self.path))
+        journal.record("storage/create", {"name": "SMD-Box2-A1"})
+        self.assertTrue(CheckpointJournal.is_unfinished(str(self.path)))
+        journal.mark_complete()
+        journal._file.close()
+        self.assertFalse(CheckpointJournal.is_unfinished(str(self.path)))
+
+        resumed = CheckpointJournal(str(self.path), resume=True)
+        self.assertTrue(resumed.is_done("storage/create", {"name": "SMD-Box2-A1"}))
+        resumed._file.close()
+
+    def test_resume_skips_journaled_locations_before_planning(self):
+        stub = StubAPIClient(LOCATIONS)
+        journal = CheckpointJournal(str(self.path))
+        for location in LOCATIONS[:100]:
+            journal.record("storage/update", {"id": location["storage/id"], "name": location["storage/name"]})
+        journal._file.close()
+
+        updater = StorageMetadataUpdater(CONFIG, api_request=stub.api_request, bulk_request=stub.api_bulk_request)
+        updater.journal = CheckpointJournal(str(self.path), resume=True)
+        planned = []
+        plan_location = updater._plan_location
+        updater._plan_location = lambda location: planned.append(location["storage/id"]) or plan_location(location)
+
+        results = quietly(updater.execute_updates, interactive=False)
+        updater.journal._file.close()
+
+        self.assertEqual(len(planned), len(LOCATIONS) - 100)
+        self.assertFalse({location["storage/id"] for location in LOCATIONS[:100]} & set(planned))
+        self.assertEqual(results["success"], len(LOCATIONS) - 100)
+
+
+class ConcurrentUpdateTest(unittest.TestCase):
+    RATE = 100.0
+
+    def run_updates(self, concurrency, latency=0.0):
+        stub = StubAPIClient(LOCATIONS[:40], latency=latency)
+        sent, in_flight, peak = [], [0], [0]
+        lock = threading.Lock()
+
+        def api_request(endpoint, params):
+            with lock:
+                sent.append(time.monotonic())
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            try:
+                return stub.api_request(endpoint, params)
+            finally:
+                with lock:
+                    in_flight[0] -= 1
+
+        updater = StorageMetadataUpdater(CONFIG, concurrency=concurrency,
+                                         api_request=api_request, bulk_request=None)
+        updater.rate_limiter = TokenBucket(self.RATE, capacity=1)
+        results = quietly(updater.execute_updates, interactive=False)
+        return stub, results, sorted(sent), peak[0]
+
+    def test_concurrent_run_matches_serial_run(self):
+        serial, serial_results, _, _ = self.run_updates(concurrency=1)
+        stub, results, sent, peak = self.run_updates(concurrency=4, latency=0.02)
+
+        self.assertGreater(results["success"], 0)
+        self.assertEqual(results, serial_results)
+        self.assertEqual(results["failed"], 0)
+        self.assertEqual(stub.calls, serial.calls)
+        self.assertEqual(stub.calls["storage/update"], results["success"])
+        self.assertEqual(stub.storage, serial.storage)
+        self.assertGreater(peak, 1)
+
+        # capacity 1: every call waits for its own token
+        gaps = [later - earlier for earlier, later in zip(sent, sent[1:])]
+        self.assertGreaterEqual(min(gaps), 0.8 / self.RATE)
+        self.assertGreaterEqual(sent[-1] - sent[0], 0.9 * (len(sent) - 1) / self.RATE)
+
+
+class RetryTest(unittest.TestCase):
+    def updater(self, errors, breaker=None):
+        """An updater whose api_request raises errors (in order) before reaching the stub."""
+        self.stub = StubAPIClient(LOCATIONS[:1])
+        self.attempts = 0
+        errors = list(errors)
+
+        def api_request(endpoint, params):
+            self.attempts += 1
+            if errors:
+                raise errors.pop(0)
+            return self.stub.api_request(endpoint, params)
+
+        return StorageMetadataUpdater(CONFIG, api_request=api_request, bulk_request=None,
+                                      retry_policy=RetryPolicy(max_attempts=4, base=0, max_delay=0),
+                                      breaker=breaker or CircuitBreaker(threshold=0))
+
+    def test_retries_transient_errors_until_success(self):
+        updater = self.updater([Exception("HTTP 503"), ConnectionResetError("reset")])
+        location = LOCATIONS[0]
+        response = quietly(updater._call, "storage/update",
+                           {"storage/id": location["storage/id"], "storage/tags": ["retried"]})
+
+        self.assertEqual(response["data"]["storage/tags"], ["retried"])
+        self.assertEqual(self.attempts, 3)
+        self.assertEqual(updater.metrics.counters["retries"], 2)
+        self.assertEqual(updater.metrics.counters["errors unavailable"], 1)
+        self.assertEqual(updater.metrics.counters["errors network"], 1)
+
+    def test_client_errors_are_not_retried(self):
+        updater = self.updater([Exception("HTTP 404 Not Found")])
+        with self.assertRaises(Exception):
+            quietly(updater._call, "storage/update", {"storage/id": "missing"})
+        self.assertEqual(self.attempts, 1)
+        self.assertNotIn("retries", updater.metrics.counters)
+
+    def test_create_is_not_retried_after_it_may_have_been_applied(self):
+        updater = self.updater([Exception("HTTP 500")])
+        with self.assertRaises(Exception):
+            quietly(updater._call, "storage/create", {"storage/name": "SMD-Box2-A1"})
+        self.assertEqual(self.attempts, 1)
+        self.assertEqual(self.stub.calls, {})
+
+    def test_interrupted_probe_releases_the_breaker(self):
+        breaker = CircuitBreaker(threshold=1, cooldown=0)
+        breaker.record_failure(True)
+        updater = self.updater([KeyboardInterrupt()], breaker=breaker)
+        with self.assertRaises(KeyboardInterrupt):
+            updater._call("storage/all", {"limit": 1})
+        self.assertEqual(breaker.state, "half_open")
+
+        other = threading.Thread(target=breaker.before_call, daemon=True)
+        other.start()
+        other.join(1)
+        self.assertFalse(other.is_alive())
+
+
+class CircuitBreakerTest(unittest.TestCase):
+    def test_opens_half_opens_and_closes(self):
+        opened = []
+        breaker = CircuitBreaker(threshold=2, cooldown=0.05, on_open=opened.append)
+        breaker.record_failure(True)
+        self.assertEqual(breaker.state, "closed")
+        breaker.record_failure(True)
+        self.assertEqual(breaker.state, "open")
+
+        self.assertGreaterEqual(breaker.before_call(), 0.04)
+        self.assertEqual(breaker.state, "half_open")
+        breaker.record_failure(True)  # the probe failed: reopen, cooldown doubled
+        self.assertEqual(breaker.state, "open")
+        self.assertEqual(opened, [0.05, 0.1])
+
+        self.assertGreaterEqual(breaker.before_call(), 0.09)
+        breaker.record_success()
+        self.assertEqual(breaker.state, "closed")
+        self.assertEqual(breaker.trips, 2)
+        self.assertLess(breaker.before_call(), 0.01)
+
+    def test_non_retryable_failures_do_not_open(self):
+        breaker = CircuitBreaker(threshold=1, cooldown=10)
+        breaker.record_failure(False)
+        breaker.record_failure(False)
+        self.assertEqual(breaker.state, "closed")
+        self.assertEqual(breaker.trips, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
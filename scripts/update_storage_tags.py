@@ -11,14 +11,28 @@ Usage:
     python update_storage_tags.py --mode update-existing --batch-size 20
     python update_storage_tags.py --mode create-new --batch-size 20
     python update_storage_tags.py --mode full --batch-size 20
+    python update_storage_tags.py --mode full --concurrency 8 --rate-limit 10
+    python update_storage_tags.py --mode full --resume
+    python update_storage_tags.py --mode full --metrics-out temp/metrics.prom
 """
 
 import argparse
 import json
 import sys
 import os
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from itertools import islice
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional
+from typing import Callable, Dict, Iterable, Iterator, List, TextIO, Tuple, Optional
+
+from storage_types import PrefixIndex
 
 # Add the partsbox-api scripts directory to Python path
 scripts_dir = Path(__file__).parent.parent / ".claude" / "skills" / "partsbox-api" / "scripts"
@@ -26,13 +40,552 @@ sys.path.insert(0, str(scripts_dir))
 
 from api_client import api_request
 
+try:
+    # Optional multi-item transport; older api_client versions only send one item per call
+    from api_client import api_bulk_request
+except ImportError:
+    api_bulk_request = None
+
+
+class TokenBucket:
+    """
+    Thread-safe token-bucket rate limiter.
+
+    Tokens refill at `rate` per second up to `capacity`; each API call
+    consumes one. A rate of 0 disables limiting.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a token is available, then consume it."""
+        if self.rate <= 0:
+            return
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+RETRYABLE = {"rate_limited", "unavailable", "server", "network", "connect"}
+
+# Endpoints that can be repeated safely. Creates are only retried when the
+# request cannot have been applied (429, 503, refused connection), so a retry
+# never creates a location twice.
+IDEMPOTENT_ENDPOINTS = {"storage/all", "storage/get", "storage/update"}
+NEVER_APPLIED = {"rate_limited", "unavailable", "connect"}
+
+
+def parse_retry_after(value) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)."""
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(str(value)).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def classify_error(error: BaseException) -> Tuple[str, Optional[float]]:
+    """
+    Classify an api_request exception as (category, retry_after seconds).
+
+    Works with requests' HTTPError (error.response.status_code/.headers),
+    urllib's HTTPError (error.code/.headers) and plain exceptions whose
+    message carries the status ("HTTP 503"). Categories:
+    rate_limited (429), unavailable (503), server (500/502/504/408),
+    client (other 4xx, not retried), connect (refused before sending),
+    network (timeouts and dropped connections), error (anything else).
+    """
+    response = getattr(error, "response", None)
+    status = getattr(response, "status_code", None) or getattr(error, "status_code", None) \
+        or getattr(error, "code", None) or getattr(error, "status", None)
+    if not isinstance(status, int):
+        match = re.search(r"\b(?:HTTP|status)\s*:?\s*([45]\d\d)\b", str(error), re.IGNORECASE)
+        status = int(match.group(1)) if match else None
+
+    headers = getattr(response, "headers", None) or getattr(error, "headers", None) or {}
+    retry_after = parse_retry_after(headers.get("Retry-After") if hasattr(headers, "get") else None)
+
+    if status == 429:
+        return "rate_limited", retry_after
+    if status == 503:
+        return "unavailable", retry_after
+    if status in (408, 500, 502, 504):
+        return "server", retry_after
+    if status is not None and 400 <= status < 600:
+        return "client", None
+    reason = getattr(error, "reason", None)  # urllib's URLError wraps the socket error
+    if isinstance(error, ConnectionRefusedError) or isinstance(reason, ConnectionRefusedError) \
+            or type(error).__name__ == "ConnectTimeout":
+        return "connect", None
+    if isinstance(error, (ConnectionError, TimeoutError, OSError)) \
+            or type(error).__name__ in ("ConnectionError", "Timeout", "ReadTimeout", "ChunkedEncodingError"):
+        return "network", None
+    return "error", None
+
+
+class RetryPolicy:
+    """
+    Capped exponential backoff with full jitter.
+
+    The delay before retry n (0-based) is uniform in
+    [0, min(max_delay, base * 2**n)], but never shorter than the server's
+    Retry-After. max_attempts counts the first call.
+    """
+
+    def __init__(self, max_attempts: int = 5, base: float = 0.5, max_delay: float = 30.0,
+                 rng: Optional[random.Random] = None):
+        self.max_attempts = max(1, max_attempts)
+        self.base = base
+        self.max_delay = max_delay
+        self._rng = rng or random.Random()
+
+    def should_retry(self, endpoint: str, category: str, attempt: int) -> bool:
+        if attempt + 1 >= self.max_attempts or category not in RETRYABLE:
+            return False
+        return endpoint in IDEMPOTENT_ENDPOINTS or category in NEVER_APPLIED
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        backoff = self._rng.uniform(0, min(self.max_delay, self.base * 2 ** attempt))
+        return max(backoff, retry_after or 0.0)
+
+
+class CircuitBreaker:
+    """
+    Pauses all workers while the API is degraded.
+
+    After `threshold` consecutive retryable failures the breaker opens and
+    every caller waits in before_call() for `cooldown` seconds. Then one
+    probe call is let through (half-open): success closes the breaker,
+    failure reopens it with the cooldown doubled, up to max_cooldown.
+    pause() holds all callers for a server-requested Retry-After without
+    opening the breaker. release() gives up a probe that ended without a
+    recorded result. A threshold of 0 disables it.
+    """
+
+    def __init__(self, threshold: int = 5, cooldown: float = 30.0, max_cooldown: float = 300.0,
+                 on_open: Optional[Callable[[float], None]] = None):
+        self.threshold = threshold
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.on_open = on_open
+        self.state = "closed"
+        self.trips = 0
+        self._failures = 0
+        self._cooldown = cooldown
+        self._open_until = 0.0
+        self._paused_until = 0.0
+        self._probing = False
+        self._prober: Optional[int] = None
+        self._condition = threading.Condition()
+
+    def before_call(self) -> float:
+        """Block while open, paused or another probe is in flight. Returns seconds waited."""
+        start = time.monotonic()
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                hold = max(self._paused_until, self._open_until if self.state == "open" else 0.0)
+                if hold > now:
+                    self._condition.wait(hold - now)
+                    continue
+                if self.state == "open":
+                    self.state = "half_open"
+                if self.state == "half_open":
+                    if self._probing:
+                        self._condition.wait()
+                        continue
+                    self._probing = True
+                    self._prober = threading.get_ident()
+                return time.monotonic() - start
+
+    def pause(self, seconds: float) -> None:
+        with self._condition:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def release(self) -> None:
+        """Let another caller probe if this thread's probe was interrupted (no-op otherwise)."""
+        with self._condition:
+            if self._probing and self._prober == threading.get_ident():
+                self._probing = False
+                self._condition.notify_all()
+
+    def record_success(self) -> None:
+        with self._condition:
+            self._failures = 0
+            if self.state != "closed":
+                self.state = "closed"
+                self._cooldown = self.base_cooldown
+            self._probing = False
+            self._condition.notify_all()
+
+    def record_failure(self, retryable: bool) -> None:
+        """Count a failed call; only retryable (transient) failures can open the breaker."""
+        with self._condition:
+            probe = self._probing
+            self._probing = False
+            if not retryable:
+                if probe:
+                    self.state = "closed"
+                self._condition.notify_all()
+                return
+            self._failures += 1
+            if self.threshold and (probe or self._failures >= self.threshold):
+                if probe:
+                    self._cooldown = min(self.max_cooldown, self._cooldown * 2)
+                self.state = "open"
+                self.trips += 1
+                self._failures = 0
+                self._open_until = time.monotonic() + self._cooldown
+                if self.on_open:
+                    self.on_open(self._cooldown)
+            self._condition.notify_all()
+
+
+class RunMetrics:
+    """
+    Thread-safe timing and throughput counters for one run.
+
+    Phases accumulate wall time (a phase entered twice adds up). Each API
+    call records its latency under its endpoint; latencies are kept so
+    exact percentiles can be reported, and bucketed for the Prometheus
+    histogram. Named counters (bulk_splits, results, ...) are plain totals.
+    """
+
+    BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+    def __init__(self):
+        self.started = time.time()
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+        self.phases: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+        self._requests: Dict[str, Dict] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def add_time(self, phase: str, seconds: float) -> None:
+        with self._lock:
+            self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def record_request(self, endpoint: str, start: float, seconds: float, ok: bool, items: int = 1) -> None:
+        """Record one API call that began at perf_counter() time start."""
+        with self._lock:
+            stats = self._requests.setdefault(endpoint, {
+                "latencies": [], "failed": 0, "items": 0, "first": start, "last": start
+            })
+            stats["latencies"].append(seconds)
+            stats["items"] += items
+            stats["failed"] += 0 if ok else 1
+            stats["first"] = min(stats["first"], start)
+            stats["last"] = max(stats["last"], start + seconds)
+
+    @staticmethod
+    def percentile(ordered: List[float], fraction: float) -> float:
+        """Nearest-rank percentile of an ascending list."""
+        if not ordered:
+            return 0.0
+        rank = max(1, -(-len(ordered) * fraction // 1))
+        return ordered[int(rank) - 1]
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            requests = {}
+            for endpoint, stats in sorted(self._requests.items()):
+                ordered = sorted(stats["latencies"])
+                window = stats["last"] - stats["first"]
+                requests[endpoint] = {
+                    "count": len(ordered),
+                    "failed": stats["failed"],
+                    "items": stats["items"],
+                    "seconds": round(sum(ordered), 6),
+                    "per_second": round(len(ordered) / window, 3) if window > 0 else None,
+                    "items_per_second": round(stats["items"] / window, 3) if window > 0 else None,
+                    "latency": {
+                        "mean": round(sum(ordered) / len(ordered), 6),
+                        "p50": round(self.percentile(ordered, 0.50), 6),
+                        "p95": round(self.percentile(ordered, 0.95), 6),
+                        "p99": round(self.percentile(ordered, 0.99), 6),
+                        "max": round(ordered[-1], 6)
+                    },
+                    "histogram": {
+                        str(bound): sum(1 for latency in ordered if latency <= bound)
+                        for bound in self.BUCKETS
+                    }
+                }
+            return {
+                "started": datetime.fromtimestamp(self.started, timezone.utc).isoformat(),
+                "wall_seconds": round(time.perf_counter() - self._start, 6),
+                "phases": {name: round(seconds, 6) for name, seconds in self.phases.items()},
+                "requests": requests,
+                "counters": dict(self.counters)
+            }
+
+    def to_prometheus(self, prefix: str = "partsbox_storage_tags") -> str:
+        """Render as Prometheus text exposition format (for node_exporter's textfile collector)."""
+        data = self.to_dict()
+        lines = [
+            f"# HELP {prefix}_wall_seconds Wall time of the run.",
+            f"# TYPE {prefix}_wall_seconds gauge",
+            f"{prefix}_wall_seconds {data['wall_seconds']}",
+            f"# HELP {prefix}_phase_seconds Accumulated wall time per phase.",
+            f"# TYPE {prefix}_phase_seconds gauge"
+        ]
+        lines += [f'{prefix}_phase_seconds{{phase="{name}"}} {seconds}' for name, seconds in data["phases"].items()]
+
+        lines += [f"# HELP {prefix}_request_duration_seconds API call latency.",
+                  f"# TYPE {prefix}_request_duration_seconds histogram"]
+        for endpoint, stats in data["requests"].items():
+            label = f'endpoint="{endpoint}"'
+            for bound, count in stats["histogram"].items():
+                lines.append(f'{prefix}_request_duration_seconds_bucket{{{label},le="{bound}"}} {count}')
+            lines.append(f'{prefix}_request_duration_seconds_bucket{{{label},le="+Inf"}} {stats["count"]}')
+            lines.append(f'{prefix}_request_duration_seconds_sum{{{label}}} {stats["seconds"]}')
+            lines.append(f'{prefix}_request_duration_seconds_count{{{label}}} {stats["count"]}')
+
+        lines += [f"# HELP {prefix}_request_latency_seconds API call latency percentiles.",
+                  f"# TYPE {prefix}_request_latency_seconds gauge"]
+        for endpoint, stats in data["requests"].items():
+            for quantile in ("p50", "p95", "p99"):
+                lines.append(f'{prefix}_request_latency_seconds{{endpoint="{endpoint}",'
+                             f'quantile="0.{quantile[1:]}"}} {stats["latency"][quantile]}')
+
+        lines += [f"# HELP {prefix}_requests_failed_total Failed API calls.",
+                  f"# TYPE {prefix}_requests_failed_total counter"]
+        lines += [f'{prefix}_requests_failed_total{{endpoint="{endpoint}"}} {stats["failed"]}'
+                  for endpoint, stats in data["requests"].items()]
+
+        lines += [f"# HELP {prefix}_events_total Run counters (retries, bulk splits, results).",
+                  f"# TYPE {prefix}_events_total counter"]
+        lines += [f'{prefix}_events_total{{event="{name}"}} {value}' for name, value in sorted(data["counters"].items())]
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str) -> None:
+        """Write metrics to path: Prometheus text for .prom/.txt, JSON otherwise."""
+        text = self.to_prometheus() if path.endswith((".prom", ".txt")) else json.dumps(self.to_dict(), indent=2) + "\n"
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(text)
+
+    def report(self) -> str:
+        """Short human-readable summary for stderr."""
+        data = self.to_dict()
+        lines = [f"Wall time: {data['wall_seconds']:.2f}s"]
+        lines += [f"  {name}: {seconds:.2f}s" for name, seconds in data["phases"].items()]
+        for endpoint, stats in data["requests"].items():
+            latency = stats["latency"]
+            rate = f"{stats['per_second']:.1f} req/s" if stats["per_second"] else "- req/s"
+            lines.append(f"{endpoint}: {stats['count']} calls ({stats['failed']} failed), {rate}, "
+                         f"p50 {latency['p50'] * 1000:.0f} ms, p95 {latency['p95'] * 1000:.0f} ms, "
+                         f"p99 {latency['p99'] * 1000:.0f} ms")
+        if data["counters"]:
+            lines.append(", ".join(f"{name}: {value}" for name, value in sorted(data["counters"].items())))
+        return "\n".join(lines)
+
+
+class CheckpointJournal:
+    """
+    Append-only JSONL journal of completed storage writes.
+
+    Each successful storage/update is recorded by storage id and each
+    storage/create by location name, so an interrupted run can be resumed
+    without repeating finished work. A run that ends without failures
+    appends a "complete" entry; a journal without one is unfinished.
+    """
+
+    _KEYS = {"storage/update": "id", "storage/create": "name"}
+    COMPLETE = "complete"
+
+    def __init__(self, path: str, resume: bool = False):
+        """
+        Open the journal, loading prior entries when resuming.
+
+        Otherwise a new journal is started and an existing one is kept as
+        <path>.prev rather than truncated.
+        """
+        self.path = Path(path)
+        self.completed: Dict[str, set] = {endpoint: set() for endpoint in self._KEYS}
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if resume and self.path.exists():
+            self._load()
+        elif self.path.exists():
+            os.replace(self.path, f"{self.path}.prev")
+        self._file = open(self.path, 'a' if resume else 'w')
+
+    @classmethod
+    def is_unfinished(cls, path: str) -> bool:
+        """True if path holds a journal whose last run did not complete."""
+        last = None
+        try:
+            with open(path, 'rb') as f:
+                for line in f:
+                    if line.endswith(b"\n") and line.strip():
+                        last = line
+        except FileNotFoundError:
+            return False
+        if last is None:
+            return False
+        try:
+            return json.loads(last).get("endpoint") != cls.COMPLETE
+        except json.JSONDecodeError:
+            return True
+
+    def _load(self) -> None:
+        """Read completed keys, dropping a partial final line left by a crash."""
+        valid_bytes = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                valid_bytes += len(line)
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if entry.get("endpoint") in self.completed:
+                    self.completed[entry["endpoint"]].add(entry["key"])
+
+        if valid_bytes < self.path.stat().st_size:
+            os.truncate(self.path, valid_bytes)
+
+    def is_done(self, endpoint: str, item: Dict) -> bool:
+        """Return True if the item was completed in a previous run."""
+        return item[self._KEYS[endpoint]] in self.completed[endpoint]
+
+    def record(self, endpoint: str, item: Dict) -> None:
+        """Append a completed item and flush it to disk."""
+        key = item[self._KEYS[endpoint]]
+        self.completed[endpoint].add(key)
+        self._file.write(json.dumps({
+            "endpoint": endpoint,
+            "key": key,
+            "name": item["name"],
+            "timestamp": time.time()
+        }) + "\n")
+        self._file.flush()
+
+    def sync(self) -> None:
+        """Force journaled entries to stable storage."""
+        os.fsync(self._file.fileno())
+
+    def mark_complete(self) -> None:
+        """Record that the run finished without failures."""
+        self._file.write(json.dumps({"endpoint": self.COMPLETE, "timestamp": time.time()}) + "\n")
+        self._file.flush()
+        self.sync()
+
+
+class _JSONObjectWriter:
+    """
+    Write a top-level JSON object key by key, streaming array members.
+
+    Output matches json.dumps(obj, indent=2) for the same keys, but array
+    members are serialized and written one at a time, so arbitrarily long
+    arrays can be produced from generators.
+    """
+
+    def __init__(self, out: TextIO):
+        self.out = out
+        self._first_key = True
+        out.write("{")
+
+    def _key(self, key: str) -> None:
+        self.out.write(("\n" if self._first_key else ",\n") + f"  {json.dumps(key)}: ")
+        self._first_key = False
+
+    def value(self, key: str, value) -> None:
+        self._key(key)
+        self.out.write(json.dumps(value, indent=2).replace("\n", "\n  "))
+
+    def array(self, key: str, items: Iterable) -> int:
+        """Write items as a JSON array member by member. Returns the number written."""
+        self._key(key)
+        count = 0
+        for item in items:
+            self.out.write(("[\n    " if count == 0 else ",\n    ")
+                           + json.dumps(item, indent=2).replace("\n", "\n    "))
+            if count == 0:
+                self.out.flush()
+            count += 1
+        self.out.write("\n  ]" if count else "[]")
+        self.out.flush()
+        return count
+
+    def close(self) -> None:
+        self.out.write("\n}\n" if not self._first_key else "}\n")
+        self.out.flush()
+
 
 class StorageMetadataUpdater:
-    def __init__(self, config_path: str, batch_size: int = 20):
-        """Initialize the updater with configuration."""
+    def __init__(self, config_path: str, batch_size: int = 20, concurrency: int = 1,
+                 rate_limit: float = 0.0,
+                 api_request: Callable[[str, Dict], Dict] = api_request,
+                 bulk_request: Optional[Callable[[str, List[Dict]], Dict]] = api_bulk_request,
+                 journal: Optional[CheckpointJournal] = None,
+                 metrics: Optional[RunMetrics] = None,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 breaker: Optional[CircuitBreaker] = None):
+        """
+        Initialize the updater with configuration.
+
+        concurrency is the number of API calls in flight per batch and
+        rate_limit caps calls per second across all workers (0 = unlimited).
+        api_request can be replaced with a stub for testing. bulk_request,
+        when available, sends a whole batch of payloads in one call; pass
+        None to force per-item calls. journal, if given, records completed
+        writes and is used to skip work finished by an earlier run.
+        metrics collects phase timings and per-call latencies (a fresh
+        RunMetrics by default). retry_policy and breaker control retries of
+        transient API failures (RetryPolicy() and CircuitBreaker() by default).
+        """
         self.config_path = config_path
         self.batch_size = batch_size
+        self.concurrency = max(1, concurrency)
+        self.rate_limiter = TokenBucket(rate_limit)
+        self.api_request = api_request
+        self.bulk_request = bulk_request
+        self.journal = journal
+        self.metrics = metrics or RunMetrics()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self._unconfirmed_creates: set = set()
+        self._unconfirmed_lock = threading.Lock()
+        self.breaker = breaker or CircuitBreaker()
+        if self.breaker.on_open is None:
+            self.breaker.on_open = self._circuit_opened
         self.metadata = self._load_metadata()
+        self.prefix_index = PrefixIndex(self.metadata['storage_types'])
+
+    def _circuit_opened(self, cooldown: float) -> None:
+        self.metrics.count("circuit_trips")
+        print(f"API degraded: pausing all calls for {cooldown:g}s", file=sys.stderr)
 
     def _load_metadata(self) -> Dict:
         """Load storage metadata from JSON configuration."""
@@ -43,144 +596,296 @@ class StorageMetadataUpdater:
         """
         Match a storage location name to its storage type configuration.
 
+        The longest matching prefix wins, so "SMD-Box2-A1" resolves to
+        SMD-Box2 rather than SMD-Box.
+
         Returns (prefix, config) or None if no match.
         """
-        for prefix, config in self.metadata['storage_types'].items():
-            if storage_name.startswith(prefix):
-                return (prefix, config)
-        return None
+        prefix = self.prefix_index.longest_match(storage_name)
+        if prefix is None:
+            return None
+        return (prefix, self.metadata['storage_types'][prefix])
+
+    def _call(self, endpoint: str, payload, items: int = 1) -> Dict:
+        """
+        Make one rate-limited API call, retrying transient failures.
+
+        Each attempt waits for the circuit breaker and the rate limiter,
+        and both waits are accumulated separately from the call latency.
+        Failures are classified (classify_error). Transient ones are retried
+        with jittered exponential backoff, at least Retry-After, which also
+        pauses every other worker. Non-idempotent creates are retried only
+        when the request cannot have been applied. A half-open probe that
+        ends without a result (KeyboardInterrupt) is released. payload is a
+        list for bulk calls, which are recorded as "<endpoint> (bulk)".
+        """
+        bulk = isinstance(payload, list)
+        name = f"{endpoint} (bulk)" if bulk else endpoint
+        request = self.bulk_request if bulk else self.api_request
+
+        attempt = 0
+        try:
+            while True:
+                self.metrics.add_time("circuit_wait", self.breaker.before_call())
+                start = time.perf_counter()
+                self.rate_limiter.acquire()
+                sent = time.perf_counter()
+                self.metrics.add_time("rate_limit_wait", sent - start)
+
+                try:
+                    response = request(endpoint, payload)
+                except Exception as e:
+                    self.metrics.record_request(name, sent, time.perf_counter() - sent, False, items)
+                    category, retry_after = classify_error(e)
+                    self.metrics.count(f"errors {category}")
+                    self.breaker.record_failure(category in RETRYABLE)
+                    if not self.retry_policy.should_retry(endpoint, category, attempt):
+                        raise
+                    delay = self.retry_policy.delay(attempt, retry_after)
+                    if retry_after:
+                        self.breaker.pause(retry_after)
+                    self.metrics.count("retries")
+                    print(f"{name} failed ({category}: {e}), retry {attempt + 1} in {delay:.1f}s",
+                          file=sys.stderr)
+                    with self.metrics.phase("backoff_wait"):
+                        time.sleep(delay)
+                    attempt += 1
+                    continue
+
+                self.metrics.record_request(name, sent, time.perf_counter() - sent, True, items)
+                self.breaker.record_success()
+                return response
+        finally:
+            # a probe interrupted by Ctrl-C must not hold every other worker
+            self.breaker.release()
+
+    def iter_existing_locations(self, page_size: int = 1000) -> Iterator[Dict]:
+        """
+        Stream all existing storage locations from PartsBox.
+
+        Follows meta.cursor until the last page, yielding locations one at a
+        time. The next page is requested on a background thread while the
+        current page is being consumed.
+        """
+        print("Fetching existing storage locations from PartsBox...", file=sys.stderr)
+
+        def fetch_page(cursor: Optional[str]) -> Dict:
+            params = {"limit": page_size}
+            if cursor:
+                params["cursor"] = cursor
+            return self._call("storage/all", params)
+
+        count = 0
+        pages = 0
+        with ThreadPoolExecutor(max_workers=1) as prefetcher:
+            pending = prefetcher.submit(fetch_page, None)
+            while pending is not None:
+                with self.metrics.phase("fetch_wait"):
+                    response = pending.result()
+                pages += 1
+
+                cursor = response.get("meta", {}).get("cursor")
+                pending = prefetcher.submit(fetch_page, cursor) if cursor else None
+
+                for location in response.get("data", []):
+                    count += 1
+                    yield location
+
+        print(f"Found {count} storage locations ({pages} page(s))", file=sys.stderr)
 
     def fetch_existing_locations(self) -> List[Dict]:
         """Fetch all existing storage locations from PartsBox."""
-        print("Fetching existing storage locations from PartsBox...", file=sys.stderr)
+        return list(self.iter_existing_locations())
 
-        response = api_request("storage/all", {"limit": 1000})
+    @staticmethod
+    def _diff_location(current_tags: Optional[List[str]], current_description: Optional[str],
+                       config: Dict) -> Dict:
+        """
+        Compare a location's current metadata against its storage type config.
 
-        if response.get("meta", {}).get("cursor"):
-            print("WARNING: More than 1000 storage locations exist. May need pagination.",
-                  file=sys.stderr)
+        Tags are compared as sets of stripped strings and descriptions after
+        stripping surrounding whitespace. Returns a dict of per-field changes,
+        empty when the location is already up to date.
+        """
+        changes = {}
+
+        old_tags = {tag.strip() for tag in current_tags or []}
+        new_tags = {tag.strip() for tag in config["tags"]}
+        if old_tags != new_tags:
+            changes["tags"] = {
+                "old": current_tags or [],
+                "new": config["tags"],
+                "added": sorted(new_tags - old_tags),
+                "removed": sorted(old_tags - new_tags)
+            }
+
+        old_description = (current_description or "").strip()
+        new_description = config["description"].strip()
+        if old_description != new_description:
+            changes["description"] = {
+                "old": current_description or "",
+                "new": config["description"],
+                "reason": "missing" if not old_description else "differs"
+            }
+
+        return changes
 
-        locations = response.get("data", [])
-        print(f"Found {len(locations)} storage locations", file=sys.stderr)
+    def _plan_location(self, location: Dict) -> Tuple[str, Dict]:
+        """
+        Classify one existing location against its storage type config.
 
-        return locations
+        Returns ("matched", item) when its tags or description need updating,
+        ("unchanged", item) when it already matches, or ("unmatched", location)
+        when no storage type prefix applies.
+        """
+        name = location.get("storage/name", "")
+        match = self._match_storage_type(name)
+        if not match:
+            return "unmatched", location
+
+        prefix, config = match
+        current_tags = location.get("storage/tags", [])
+        current_description = location.get("storage/description",
+                                            location.get("storage/comments", ""))
+        item = {
+            "id": location.get("storage/id"),
+            "name": name,
+            "prefix": prefix,
+            "config": config,
+            "current_tags": current_tags,
+            "current_description": current_description,
+            "changes": self._diff_location(current_tags, current_description, config)
+        }
+        return ("matched" if item["changes"] else "unchanged"), item
 
-    def generate_update_plan(self, locations: List[Dict]) -> Dict:
+    def generate_update_plan(self, locations: Iterable[Dict]) -> Dict:
         """
         Generate update plan for existing locations.
 
+        Locations are consumed incrementally, so a generator such as
+        iter_existing_locations() can be passed without materializing it.
+        Only locations whose tags or description differ from their config
+        are scheduled for update.
+
         Returns dict with:
-        - matched: List of (location, storage_type, config) tuples
+        - matched: List of location specs that need updating, with per-field changes
+        - unchanged: List of location specs already matching their config
         - unmatched: List of location dicts that didn't match any type
         """
-        matched = []
-        unmatched = []
-
+        plan = {"matched": [], "unchanged": [], "unmatched": []}
+        planning = 0.0
         for location in locations:
-            name = location.get("storage/name", "")
-            storage_id = location.get("storage/id")
-
-            match = self._match_storage_type(name)
-            if match:
-                prefix, config = match
-                matched.append({
-                    "id": storage_id,
-                    "name": name,
-                    "prefix": prefix,
-                    "config": config,
-                    "current_tags": location.get("storage/tags", []),
-                    "current_comments": location.get("storage/comments", "")
-                })
-            else:
-                unmatched.append(location)
-
-        return {
-            "matched": matched,
-            "unmatched": unmatched
-        }
+            start = time.perf_counter()
+            status, item = self._plan_location(location)
+            planning += time.perf_counter() - start
+            plan[status].append(item)
+        self.metrics.add_time("plan", planning)
+        return plan
+
+    def _new_storage_types(self) -> Iterator[Tuple[str, Dict]]:
+        """Storage types marked as not existing yet that define a grid."""
+        for prefix, config in self.metadata['storage_types'].items():
+            if not config.get("exists", True) and "grid" in config:
+                yield prefix, config
 
-    def generate_create_plan(self) -> List[Dict]:
+    def generate_create_plan(self) -> Iterator[Dict]:
         """
         Generate plan for creating new locations.
 
-        Returns list of location specs to create.
+        Yields one location spec per {prefix}-{row}{col} of each new storage
+        type's grid. Specs are produced on demand, so memory does not grow
+        with grid size; call again for a second pass.
         """
-        create_list = []
-
-        for prefix, config in self.metadata['storage_types'].items():
-            if not config.get("exists", True):  # Only process non-existing types
-                if "grid" in config:
-                    # Generate grid-based locations
-                    rows = config["grid"]["rows"]
-                    cols = config["grid"]["cols"]
-
-                    for row in rows:
-                        for col in cols:
-                            name = f"{prefix}-{row}{col}"
-                            create_list.append({
-                                "name": name,
-                                "prefix": prefix,
-                                "config": config
-                            })
-
-        return create_list
-
-    def dry_run(self) -> Dict:
-        """
-        Generate complete preview of all changes without executing.
-
-        Returns JSON-serializable dict with update and create plans.
-        """
-        locations = self.fetch_existing_locations()
-        update_plan = self.generate_update_plan(locations)
-        create_plan = self.generate_create_plan()
-
-        # Format for JSON output
-        updates = []
-        for item in update_plan["matched"]:
-            updates.append({
-                "action": "UPDATE",
-                "id": item["id"],
-                "name": item["name"],
-                "storage_type": item["prefix"],
-                "changes": {
-                    "tags": {
-                        "old": item["current_tags"],
-                        "new": item["config"]["tags"]
-                    },
-                    "description": {
-                        "old": item["current_comments"],
-                        "new": item["config"]["description"]
+        for prefix, config in self._new_storage_types():
+            for row in config["grid"]["rows"]:
+                for col in config["grid"]["cols"]:
+                    yield {
+                        "name": f"{prefix}-{row}{col}",
+                        "prefix": prefix,
+                        "config": config
                     }
-                }
-            })
 
-        creates = []
-        for item in create_plan:
-            creates.append({
+    def count_create_plan(self) -> int:
+        """Number of locations generate_create_plan() will yield, without expanding the grids."""
+        return sum(len(config["grid"]["rows"]) * len(config["grid"]["cols"])
+                   for _, config in self._new_storage_types())
+
+    def dry_run(self, out: TextIO = sys.stdout) -> Dict:
+        """
+        Stream a preview of all changes as JSON without executing.
+
+        Creates are written first, straight from the grid expansion, then
+        updates as the existing locations are fetched, the unmatched
+        locations and finally the summary. Nothing but the (small) list of
+        unmatched locations is held in memory. Returns the summary.
+        """
+        with self.metrics.phase("dry_run"):
+            return self._write_preview(_JSONObjectWriter(out))
+
+    def _write_preview(self, writer: "_JSONObjectWriter") -> Dict:
+        """Write the creates, updates, unmatched locations and summary to writer; return the summary."""
+        total_creates = writer.array("creates", (
+            {
                 "action": "CREATE",
                 "name": item["name"],
                 "storage_type": item["prefix"],
                 "tags": item["config"]["tags"],
                 "description": item["config"]["description"]
-            })
+            }
+            for item in self.generate_create_plan()
+        ))
+
+        counts = {"matched": 0, "unchanged": 0, "unmatched": 0}
+        unmatched = []
+
+        def updates() -> Iterator[Dict]:
+            for location in self.iter_existing_locations():
+                start = time.perf_counter()
+                status, item = self._plan_location(location)
+                self.metrics.add_time("plan", time.perf_counter() - start)
+                counts[status] += 1
+                if status == "unmatched":
+                    unmatched.append({"id": location.get("storage/id"), "name": location.get("storage/name")})
+                elif status == "matched":
+                    yield {
+                        "action": "UPDATE",
+                        "id": item["id"],
+                        "name": item["name"],
+                        "storage_type": item["prefix"],
+                        "changes": item["changes"]
+                    }
+
+        writer.array("updates", updates())
+        writer.array("unmatched_locations", unmatched)
 
         summary = {
-            "summary": {
-                "total_updates": len(updates),
-                "total_creates": len(creates),
-                "unmatched_locations": len(update_plan["unmatched"])
-            },
-            "updates": updates,
-            "creates": creates,
-            "unmatched_locations": [
-                {"id": loc.get("@id"), "name": loc.get("storage/name")}
-                for loc in update_plan["unmatched"]
-            ]
+            "total_updates": counts["matched"],
+            "total_creates": total_creates,
+            "unchanged_locations": counts["unchanged"],
+            "unmatched_locations": counts["unmatched"]
         }
-
+        writer.value("summary", summary)
+        writer.close()
         return summary
 
+    @staticmethod
+    def _update_payload(storage_id: str, tags: List[str], description: str) -> Dict:
+        """Build the storage/update payload for one location."""
+        return {
+            "storage/id": storage_id,
+            "storage/tags": tags,
+            "storage/description": description
+        }
+
+    @staticmethod
+    def _create_payload(name: str, tags: List[str], description: str) -> Dict:
+        """Build the storage/create payload for one location."""
+        return {
+            "storage/name": name,
+            "storage/tags": tags,
+            "storage/description": description
+        }
+
     def update_location(self, storage_id: str, tags: List[str], description: str) -> bool:
         """
         Update a single storage location.
@@ -188,13 +893,9 @@ class StorageMetadataUpdater:
         Returns True on success, False on failure.
         """
         try:
-            payload = {
-                "storage/id": storage_id,
-                "storage/tags": tags,
-                "storage/description": description
-            }
+            payload = self._update_payload(storage_id, tags, description)
 
-            response = api_request("storage/update", payload)
+            self._call("storage/update", payload)
             return True
         except Exception as e:
             print(f"ERROR updating {storage_id}: {e}", file=sys.stderr)
@@ -207,115 +908,260 @@ class StorageMetadataUpdater:
         Returns True on success, False on failure.
         """
         try:
-            payload = {
-                "storage/name": name,
-                "storage/tags": tags,
-                "storage/description": description
-            }
+            payload = self._create_payload(name, tags, description)
 
-            response = api_request("storage/create", payload)
+            self._call("storage/create", payload)
             return True
         except Exception as e:
+            if classify_error(e)[0] in RETRYABLE:
+                # May have been applied before failing; execute_creates checks before retrying
+                with self._unconfirmed_lock:
+                    self._unconfirmed_creates.add(name)
             print(f"ERROR creating {name}: {e}", file=sys.stderr)
             return False
 
-    def execute_updates(self, interactive: bool = True) -> Dict:
+    def _write_bulk(self, endpoint: str, batch: List[Dict], payload: Callable[[Dict], Dict],
+                    operation: Callable[[Dict], bool]) -> Iterator[Tuple[Dict, bool]]:
         """
-        Execute updates on existing locations in batches.
-
-        Returns summary of results.
+        Send a batch as a single bulk request, bisecting on failure.
+
+        If the bulk call fails the batch is split in half and each half is
+        retried, down to per-item calls, so one bad location only fails
+        itself. A create batch is only split when it cannot have been
+        applied (NEVER_APPLIED); after any other failure its locations are
+        reported failed and left for execute_creates to check before
+        recreating them. Yields (item, success) for each item.
         """
-        locations = self.fetch_existing_locations()
-        update_plan = self.generate_update_plan(locations)
-        matched = update_plan["matched"]
+        if len(batch) == 1:
+            yield batch[0], operation(batch[0])
+            return
 
-        total = len(matched)
-        batches = [matched[i:i + self.batch_size] for i in range(0, total, self.batch_size)]
+        try:
+            self._call(endpoint, [payload(item) for item in batch], items=len(batch))
+        except Exception as e:
+            if endpoint == "storage/create" and classify_error(e)[0] not in NEVER_APPLIED:
+                with self._unconfirmed_lock:
+                    self._unconfirmed_creates.update(item["name"] for item in batch)
+                print(f"Bulk {endpoint} of {len(batch)} locations failed ({e}), "
+                      f"checking which exist before retrying", file=sys.stderr)
+                for item in batch:
+                    yield item, False
+                return
+
+            self.metrics.count("bulk_splits")
+            print(f"Bulk {endpoint} of {len(batch)} locations failed ({e}), splitting",
+                  file=sys.stderr)
+            mid = len(batch) // 2
+            yield from self._write_bulk(endpoint, batch[:mid], payload, operation)
+            yield from self._write_bulk(endpoint, batch[mid:], payload, operation)
+            return
 
-        results = {"success": 0, "failed": 0, "skipped": 0}
+        for item in batch:
+            yield item, True
 
-        for batch_num, batch in enumerate(batches, 1):
-            print(f"\n{'='*60}", file=sys.stderr)
-            print(f"Batch {batch_num}/{len(batches)}: {len(batch)} locations", file=sys.stderr)
-            print(f"Progress: {results['success']}/{total} updated", file=sys.stderr)
-            print(f"{'='*60}", file=sys.stderr)
-
-            # Show preview of batch
-            names = [item["name"] for item in batch[:5]]
-            if len(batch) > 5:
-                names.append(f"... and {len(batch) - 5} more")
-            print(f"Locations: {', '.join(names)}", file=sys.stderr)
-
-            if interactive:
-                response = input("\nContinue with this batch? [y/N]: ")
-                if response.lower() != 'y':
-                    print("Skipping batch", file=sys.stderr)
-                    results["skipped"] += len(batch)
-                    continue
+    def _execute_batches(self, items: Iterable[Dict], total: int, endpoint: str,
+                         payload: Callable[[Dict], Dict], operation: Callable[[Dict], bool],
+                         label: str, verb: str, interactive: bool) -> Dict:
+        """
+        Run an operation over items in batches with optional confirmation prompts.
 
-            # Execute batch
-            for item in batch:
-                success = self.update_location(
-                    item["id"],
-                    item["config"]["tags"],
-                    item["config"]["description"]
-                )
+        items may be a generator; only one batch is taken from it at a time.
+        total is the number of items it will yield, used for progress output.
+        Each batch is sent as one bulk request when a bulk transport is
+        available, otherwise item by item (serially, or across the worker
+        pool when concurrency > 1). Returns summary of results.
+        """
+        items = iter(items)
+        batches = iter(lambda: list(islice(items, self.batch_size)), [])
+        batch_count = -(-total // self.batch_size)
 
-                if success:
-                    results["success"] += 1
-                    print(f"✓ {item['name']}", file=sys.stderr)
+        results = {"success": 0, "failed": 0, "skipped": 0}
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            for batch_num, batch in enumerate(batches, 1):
+                print(f"\n{'='*60}", file=sys.stderr)
+                print(f"Batch {batch_num}/{batch_count}: {len(batch)} {label}", file=sys.stderr)
+                print(f"Progress: {results['success']}/{total} {verb}", file=sys.stderr)
+                print(f"{'='*60}", file=sys.stderr)
+
+                # Show preview of batch
+                names = [item["name"] for item in batch[:5]]
+                if len(batch) > 5:
+                    names.append(f"... and {len(batch) - 5} more")
+                print(f"Locations: {', '.join(names)}", file=sys.stderr)
+
+                if interactive:
+                    with self.metrics.phase("prompt_wait"):
+                        response = input("\nContinue with this batch? [y/N]: ")
+                    if response.lower() != 'y':
+                        print("Skipping batch", file=sys.stderr)
+                        results["skipped"] += len(batch)
+                        self.metrics.count(f"{endpoint} skipped", len(batch))
+                        continue
+
+                # Execute batch
+                if self.bulk_request is not None:
+                    outcomes = self._write_bulk(endpoint, batch, payload, operation)
                 else:
-                    results["failed"] += 1
-                    print(f"✗ {item['name']}", file=sys.stderr)
+                    outcomes = self._run_batch(pool, batch, operation)
+
+                for item, success in outcomes:
+                    self.metrics.count(f"{endpoint} {'success' if success else 'failed'}")
+                    if success:
+                        results["success"] += 1
+                        if self.journal:
+                            self.journal.record(endpoint, item)
+                        print(f"✓ {item['name']}", file=sys.stderr)
+                    else:
+                        results["failed"] += 1
+                        print(f"✗ {item['name']}", file=sys.stderr)
+
+                if self.journal:
+                    self.journal.sync()
 
         return results
 
-    def execute_creates(self, interactive: bool = True) -> Dict:
+    def _run_batch(self, pool: ThreadPoolExecutor, batch: List[Dict],
+                   operation: Callable[[Dict], bool]) -> Iterator[Tuple[Dict, bool]]:
         """
-        Execute creation of new locations in batches.
+        Yield (item, success) for each item in the batch.
 
-        Returns summary of results.
+        Items are processed in order when concurrency is 1; otherwise they are
+        submitted to the pool and yielded as they complete.
         """
-        create_plan = self.generate_create_plan()
+        if self.concurrency <= 1:
+            for item in batch:
+                yield item, operation(item)
+            return
 
-        total = len(create_plan)
-        batches = [create_plan[i:i + self.batch_size] for i in range(0, total, self.batch_size)]
+        futures = {pool.submit(operation, item): item for item in batch}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
 
-        results = {"success": 0, "failed": 0, "skipped": 0}
+    def _skip_journaled(self, endpoint: str, items: Iterable[Dict]) -> Iterator[Dict]:
+        """Lazily drop items the journal records as completed by a previous run."""
+        if not self.journal:
+            return iter(items)
+        return (item for item in items if not self.journal.is_done(endpoint, item))
+
+    def _report_journaled(self, endpoint: str, completed: int) -> None:
+        if completed:
+            print(f"Resuming: {completed} {endpoint} operations already "
+                  f"completed per journal", file=sys.stderr)
+
+    def execute_updates(self, interactive: bool = True) -> Dict:
+        """
+        Execute updates on existing locations in batches.
 
-        for batch_num, batch in enumerate(batches, 1):
-            print(f"\n{'='*60}", file=sys.stderr)
-            print(f"Batch {batch_num}/{len(batches)}: {len(batch)} new locations", file=sys.stderr)
-            print(f"Progress: {results['success']}/{total} created", file=sys.stderr)
-            print(f"{'='*60}", file=sys.stderr)
-
-            # Show preview of batch
-            names = [item["name"] for item in batch[:5]]
-            if len(batch) > 5:
-                names.append(f"... and {len(batch) - 5} more")
-            print(f"Locations: {', '.join(names)}", file=sys.stderr)
-
-            if interactive:
-                response = input("\nContinue with this batch? [y/N]: ")
-                if response.lower() != 'y':
-                    print("Skipping batch", file=sys.stderr)
-                    results["skipped"] += len(batch)
+        Returns summary of results.
+        """
+        with self.metrics.phase("update"):
+            return self._execute_updates(interactive)
+
+    def _execute_updates(self, interactive: bool) -> Dict:
+        # storage/all is the only listing (paged, no id filter), so the listing is
+        # fetched in full; journaled locations are dropped before they are planned.
+        journaled = 0
+
+        def remaining(locations: Iterable[Dict]) -> Iterator[Dict]:
+            nonlocal journaled
+            for location in locations:
+                if self.journal and self.journal.is_done("storage/update", {"id": location.get("storage/id")}):
+                    journaled += 1
                     continue
+                yield location
+
+        update_plan = self.generate_update_plan(remaining(self.iter_existing_locations()))
+        pending = update_plan["matched"]
+        self._report_journaled("storage/update", journaled)
+        print(f"{len(update_plan['unchanged'])} locations already up to date, "
+              f"{len(pending)} need updating", file=sys.stderr)
+
+        return self._execute_batches(
+            pending,
+            len(pending),
+            "storage/update",
+            lambda item: self._update_payload(
+                item["id"],
+                item["config"]["tags"],
+                item["config"]["description"]
+            ),
+            lambda item: self.update_location(
+                item["id"],
+                item["config"]["tags"],
+                item["config"]["description"]
+            ),
+            label="locations",
+            verb="updated",
+            interactive=interactive
+        )
 
-            # Execute batch
-            for item in batch:
-                success = self.create_location(
+    def execute_creates(self, interactive: bool = True) -> Dict:
+        """
+        Execute creation of new locations in batches.
+
+        The create plan is streamed batch by batch rather than built up front.
+        Returns summary of results.
+        """
+        with self.metrics.phase("create"):
+            return self._execute_creates(interactive)
+
+    def _execute_creates(self, interactive: bool) -> Dict:
+        total = self.count_create_plan()
+        if self.journal:
+            completed = sum(1 for item in self.generate_create_plan()
+                            if self.journal.is_done("storage/create", item))
+            self._report_journaled("storage/create", completed)
+            total -= completed
+
+        def run(items: Iterable[Dict], count: int) -> Dict:
+            return self._execute_batches(
+                items,
+                count,
+                "storage/create",
+                lambda item: self._create_payload(
                     item["name"],
                     item["config"]["tags"],
                     item["config"]["description"]
-                )
-
-                if success:
+                ),
+                lambda item: self.create_location(
+                    item["name"],
+                    item["config"]["tags"],
+                    item["config"]["description"]
+                ),
+                label="new locations",
+                verb="created",
+                interactive=interactive
+            )
+
+        results = run(self._skip_journaled("storage/create", self.generate_create_plan()), total)
+
+        # Creates are not retried blindly after a transient failure that may have
+        # been applied (500, timeout). Check which of them exist, then create the rest.
+        for _ in range(1, self.retry_policy.max_attempts):
+            if not self._unconfirmed_creates:
+                break
+            unconfirmed, self._unconfirmed_creates = self._unconfirmed_creates, set()
+            existing = {location.get("storage/name") for location in self.iter_existing_locations()}
+            items = [item for item in self.generate_create_plan() if item["name"] in unconfirmed]
+
+            for item in items:
+                if item["name"] in existing:
+                    results["failed"] -= 1
                     results["success"] += 1
-                    print(f"✓ {item['name']}", file=sys.stderr)
-                else:
-                    results["failed"] += 1
-                    print(f"✗ {item['name']}", file=sys.stderr)
+                    self.metrics.count("storage/create confirmed")
+                    if self.journal:
+                        self.journal.record("storage/create", item)
+                    print(f"✓ {item['name']} (confirmed existing)", file=sys.stderr)
+
+            retry = [item for item in items if item["name"] not in existing]
+            if retry:
+                print(f"Retrying {len(retry)} creates confirmed missing", file=sys.stderr)
+                self.metrics.count("retries", len(retry))
+                again = run(retry, len(retry))
+                results["failed"] += again["failed"] - len(retry)
+                results["success"] += again["success"]
+                results["skipped"] += again["skipped"]
 
         return results
 
@@ -340,6 +1186,21 @@ Examples:
 
   # Non-interactive mode (no confirmation prompts)
   %(prog)s --mode full --batch-size 20 --no-interactive
+
+  # Run 8 API calls in parallel, capped at 10 calls/second
+  %(prog)s --mode full --batch-size 20 --concurrency 8 --rate-limit 10
+
+  # Continue an interrupted run, skipping work already journaled
+  %(prog)s --mode full --batch-size 20 --resume
+
+  # Start over although the last run did not finish
+  %(prog)s --mode full --batch-size 20 --fresh
+
+  # Retry transient API errors up to 8 times, pausing after 3 failures in a row
+  %(prog)s --mode full --no-interactive --max-attempts 8 --breaker-threshold 3
+
+  # Record phase timings and API latency percentiles (JSON, or Prometheus text for .prom)
+  %(prog)s --mode full --no-interactive --metrics-out temp/storage-update-metrics.json
         """
     )
 
@@ -357,6 +1218,84 @@ Examples:
         help="Number of locations to process per batch (default: 20)"
     )
 
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="Number of API calls to run in parallel within a batch (default: 1)"
+    )
+
+    parser.add_argument(
+        "--rate-limit",
+        type=float,
+        default=10.0,
+        help="Maximum API calls per second across all workers, 0 to disable (default: 10)"
+    )
+
+    parser.add_argument(
+        "--no-bulk",
+        action="store_true",
+        help="Send one API call per location even if the API client supports bulk writes"
+    )
+
+    parser.add_argument(
+        "--journal",
+        default="/workspace/temp/storage-update-journal.jsonl",
+        help="Checkpoint journal of completed writes (default: /workspace/temp/storage-update-journal.jsonl)"
+    )
+
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip locations recorded as completed in the journal by an interrupted run"
+    )
+    parser.add_argument(
+        "--fresh",
+        action="store_true",
+        help="Start a new journal even if the last run did not finish (the old one is kept as .prev)"
+    )
+
+    parser.add_argument(
+        "--max-attempts",
+        type=int,
+        default=5,
+        help="Attempts per API call for transient errors (429, 5xx, network), 1 disables retries (default: 5)"
+    )
+
+    parser.add_argument(
+        "--backoff",
+        type=float,
+        default=0.5,
+        help="Base backoff in seconds, doubled per retry with full jitter (default: 0.5)"
+    )
+
+    parser.add_argument(
+        "--max-backoff",
+        type=float,
+        default=30.0,
+        help="Maximum backoff in seconds, unless Retry-After asks for longer (default: 30)"
+    )
+
+    parser.add_argument(
+        "--breaker-threshold",
+        type=int,
+        default=5,
+        help="Consecutive transient failures that pause the whole run, 0 to disable (default: 5)"
+    )
+
+    parser.add_argument(
+        "--breaker-cooldown",
+        type=float,
+        default=30.0,
+        help="Seconds to pause before probing the API again, doubled while it keeps failing (default: 30)"
+    )
+
+    parser.add_argument(
+        "--metrics-out",
+        help="Write run metrics (phase times, latency percentiles, req/s, retries) to this file; "
+             "Prometheus text format if it ends in .prom or .txt, JSON otherwise"
+    )
+
     parser.add_argument(
         "--config",
         default="/workspace/scripts/storage_metadata.json",
@@ -377,13 +1316,28 @@ Examples:
         sys.exit(1)
 
     # Initialize updater
-    updater = StorageMetadataUpdater(args.config, args.batch_size)
+    updater = StorageMetadataUpdater(args.config, args.batch_size,
+                                     concurrency=args.concurrency,
+                                     rate_limit=args.rate_limit,
+                                     retry_policy=RetryPolicy(args.max_attempts, args.backoff,
+                                                              args.max_backoff),
+                                     breaker=CircuitBreaker(args.breaker_threshold, args.breaker_cooldown))
+    if args.no_bulk:
+        updater.bulk_request = None
+    if args.mode != "dry-run":
+        if args.resume and args.fresh:
+            parser.error("--resume and --fresh are mutually exclusive")
+        if not args.resume and not args.fresh and CheckpointJournal.is_unfinished(args.journal):
+            print(f"ERROR: {args.journal} is from a run that did not finish. Re-run with --resume "
+                  f"to continue it, or --fresh to start over (it is kept as {args.journal}.prev)",
+                  file=sys.stderr)
+            sys.exit(1)
+        updater.journal = CheckpointJournal(args.journal, resume=args.resume)
 
     try:
         if args.mode == "dry-run":
-            # Dry run: output JSON to stdout
-            preview = updater.dry_run()
-            print(json.dumps(preview, indent=2))
+            # Dry run: stream JSON to stdout
+            updater.dry_run(sys.stdout)
 
         elif args.mode == "update-existing":
             # Update existing locations only
@@ -392,6 +1346,7 @@ Examples:
             print("=" * 60, file=sys.stderr)
 
             results = updater.execute_updates(interactive=not args.no_interactive)
+            failed = results["failed"]
 
             print("\n" + "=" * 60, file=sys.stderr)
             print("RESULTS", file=sys.stderr)
@@ -407,6 +1362,7 @@ Examples:
             print("=" * 60, file=sys.stderr)
 
             results = updater.execute_creates(interactive=not args.no_interactive)
+            failed = results["failed"]
 
             print("\n" + "=" * 60, file=sys.stderr)
             print("RESULTS", file=sys.stderr)
@@ -426,6 +1382,7 @@ Examples:
 
             print("\nPhase 2: Creating new locations...", file=sys.stderr)
             create_results = updater.execute_creates(interactive=not args.no_interactive)
+            failed = update_results["failed"] + create_results["failed"]
 
             print("\n" + "=" * 60, file=sys.stderr)
             print("FINAL RESULTS", file=sys.stderr)
@@ -437,14 +1394,29 @@ Examples:
                   f"Failed: {create_results['failed']}, "
                   f"Skipped: {create_results['skipped']}", file=sys.stderr)
 
+        if updater.journal:
+            if failed:
+                print(f"{failed} operations failed; re-run with --resume to retry them", file=sys.stderr)
+            else:
+                updater.journal.mark_complete()
+
     except KeyboardInterrupt:
         print("\n\nInterrupted by user", file=sys.stderr)
+        if updater.journal:
+            print(f"Completed work saved to {args.journal}; re-run with --resume to continue",
+                  file=sys.stderr)
         sys.exit(1)
     except Exception as e:
         print(f"\nERROR: {e}", file=sys.stderr)
         import traceback
         traceback.print_exc(file=sys.stderr)
         sys.exit(1)
+    finally:
+        if args.mode != "dry-run":
+            print("\n" + updater.metrics.report(), file=sys.stderr)
+        if args.metrics_out:
+            updater.metrics.write(args.metrics_out)
+            print(f"Metrics written to {args.metrics_out}", file=sys.stderr)
 
 
 if __name__ == "__main__":
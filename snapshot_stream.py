@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Stream browser_snapshot results page by page instead of fetching them whole.
+
+A plain browser_snapshot call returns the entire ARIA tree of the page in
+one response, which on large supplier search pages is megabytes that are
+mostly discarded. iter_snapshot() asks the server for a flattened JSON
+snapshot in offset/limit pages, pushes an optional JMESPath filter down so
+only matching items cross the wire, and yields items as an async iterator.
+The next page is requested while the caller consumes the current one.
+
+Works with any client exposing call_tool(): fastmcp.Client, or the pool
+and daemon clients in mcp_pool.py.
+
+Usage:
+    from snapshot_stream import iter_snapshot
+
+    async with Client(config) as client:
+        async for item in iter_snapshot(client, jmespath_query="[?role == 'link']"):
+            print(item)
+
+    python snapshot_stream.py https://www.example.com --query "[?role == 'heading']"
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+SNAPSHOT_TOOL = "playwright-mcp-server_browser_snapshot"
+NAVIGATE_TOOL = "playwright-mcp-server_browser_navigate"
+DEFAULT_PAGE_SIZE = 200
+
+
+class SnapshotStats:
+    """Pages requested, items yielded and snapshot payload bytes received."""
+
+    def __init__(self):
+        self.pages = 0
+        self.items = 0
+        self.bytes = 0
+        self.total_items: Optional[int] = None
+
+
+def parse_snapshot_page(data: Dict) -> Tuple[List[Any], int]:
+    """Return (items, payload bytes) from a JSON-format browser_snapshot result."""
+    snapshot = data.get("snapshot")
+    if isinstance(snapshot, str):
+        size = len(snapshot.encode("utf-8"))
+        snapshot = json.loads(snapshot) if snapshot.strip() else []
+    else:
+        size = len(json.dumps(snapshot).encode("utf-8")) if snapshot is not None else 0
+
+    if snapshot is None:
+        return [], size
+    if isinstance(snapshot, dict):
+        snapshot = snapshot.get("items", [snapshot])
+    return snapshot, size
+
+
+async def iter_snapshot(client: Any, jmespath_query: Optional[str] = None,
+                        page_size: int = DEFAULT_PAGE_SIZE, max_items: Optional[int] = None,
+                        tool: str = SNAPSHOT_TOOL, stats: Optional[SnapshotStats] = None,
+                        extra_arguments: Optional[Dict] = None) -> AsyncIterator[Any]:
+    """
+    Yield snapshot items of the current page lazily.
+
+    Items are the flattened ARIA nodes, or whatever jmespath_query projects
+    them to. Paging stops at max_items, at total_items, at has_more=False or
+    at the first short page, whichever the server reports first.
+    """
+    stats = stats if stats is not None else SnapshotStats()
+
+    def fetch(offset: int) -> "asyncio.Task":
+        limit = page_size if max_items is None else min(page_size, max_items - offset)
+        arguments = {"flatten": True, "output_format": "json", "offset": offset, "limit": limit}
+        if jmespath_query:
+            arguments["jmespath_query"] = jmespath_query
+        arguments.update(extra_arguments or {})
+        return asyncio.create_task(client.call_tool(tool, arguments))
+
+    offset = 0
+    pending = fetch(offset)
+    try:
+        while pending is not None:
+            result = await pending
+            pending = None
+            if result.is_error:
+                raise RuntimeError(f"{tool} failed at offset {offset}: {result.content}")
+
+            data = result.data or {}
+            items, size = parse_snapshot_page(data)
+            stats.pages += 1
+            stats.bytes += size
+            if data.get("total_items") is not None:
+                stats.total_items = data["total_items"]
+
+            offset += len(items)
+            more = bool(items) and len(items) >= page_size and data.get("has_more", True)
+            if stats.total_items is not None and offset >= stats.total_items:
+                more = False
+            if max_items is not None and offset >= max_items:
+                more = False
+            if more:
+                # Prefetch the next page while this one is consumed
+                pending = fetch(offset)
+
+            for item in items:
+                stats.items += 1
+                yield item
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+
+async def collect_snapshot(client: Any, **kwargs) -> List[Any]:
+    """All items from iter_snapshot as a list."""
+    return [item async for item in iter_snapshot(client, **kwargs)]
+
+
+async def run(args: argparse.Namespace) -> None:
+    from fastmcp import Client
+
+    with open(args.config) as f:
+        config = json.load(f)
+
+    stats = SnapshotStats()
+    async with Client(config) as client:
+        if args.url:
+            await client.call_tool(NAVIGATE_TOOL, {"url": args.url, "silent_mode": True})
+        async for item in iter_snapshot(client, jmespath_query=args.query, page_size=args.page_size,
+                                        max_items=args.max_items, stats=stats):
+            print(json.dumps(item, ensure_ascii=False))
+
+    print(f"{stats.items} items in {stats.pages} page(s), {stats.bytes:,} snapshot bytes", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Stream a Playwright MCP browser_snapshot as JSON lines",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Every link on a page, 200 items per request
+  %(prog)s https://www.example.com --query "[?role == 'link']"
+
+  # First 50 items of the page already open in the browser
+  %(prog)s --max-items 50
+        """
+    )
+    parser.add_argument("url", nargs="?", help="Navigate here first (default: current page)")
+    parser.add_argument("--query", help="JMESPath filter applied server-side to the flattened snapshot")
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE,
+                        help=f"Items per request (default: {DEFAULT_PAGE_SIZE})")
+    parser.add_argument("--max-items", type=int, help="Stop after this many items")
+    parser.add_argument("--config", default=str(Path(__file__).parent / ".mcp.json"),
+                        help="MCP config (default: .mcp.json)")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        print("\nInterrupted by user", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()